@@ -1,44 +1,191 @@
-from .augmentations.add_background_noise import AddBackgroundNoise
-from .augmentations.add_gaussian_noise import AddGaussianNoise
-from .augmentations.add_gaussian_snr import AddGaussianSNR
-from .augmentations.add_color_noise import AddColorNoise, NOISE_COLOR_DECAYS
-from .augmentations.add_short_noises import AddShortNoises
-from .augmentations.adjust_duration import AdjustDuration
-from .augmentations.air_absorption import AirAbsorption
-from .augmentations.aliasing import Aliasing
-from .augmentations.apply_impulse_response import ApplyImpulseResponse
-from .augmentations.band_pass_filter import BandPassFilter
-from .augmentations.band_stop_filter import BandStopFilter
-from .augmentations.bit_crush import BitCrush
-from .augmentations.clip import Clip
-from .augmentations.clipping_distortion import ClippingDistortion
-from .augmentations.gain import Gain
-from .augmentations.gain_transition import GainTransition
-from .augmentations.high_pass_filter import HighPassFilter
-from .augmentations.high_shelf_filter import HighShelfFilter
-from .augmentations.lambda_transform import Lambda
-from .augmentations.limiter import Limiter
-from .augmentations.loudness_normalization import LoudnessNormalization
-from .augmentations.low_pass_filter import LowPassFilter
-from .augmentations.low_shelf_filter import LowShelfFilter
-from .augmentations.mp3_compression import Mp3Compression
-from .augmentations.normalize import Normalize
-from .augmentations.padding import Padding
-from .augmentations.peaking_filter import PeakingFilter
-from .augmentations.pitch_shift import PitchShift
-from .augmentations.polarity_inversion import PolarityInversion
-from .augmentations.repeat_part import RepeatPart
-from .augmentations.resample import Resample
-from .augmentations.reverse import Reverse
-from .augmentations.room_simulator import RoomSimulator
-from .augmentations.seven_band_parametric_eq import SevenBandParametricEQ
-from .augmentations.shift import Shift
-from .augmentations.tanh_distortion import TanhDistortion
-from .augmentations.time_mask import TimeMask
-from .augmentations.time_stretch import TimeStretch
-from .augmentations.trim import Trim
-from .core.composition import Compose, SpecCompose, OneOf, SomeOf
-from .spec_augmentations.spec_channel_shuffle import SpecChannelShuffle
-from .spec_augmentations.spec_frequency_mask import SpecFrequencyMask
+"""
+The public transforms are imported lazily, on first attribute access (PEP 562), so that
+`import CLAPForge` does not pull in librosa, scipy.signal, numba, python_stretch and the
+other dependencies of every transform up front. This keeps the startup of DataLoader
+worker processes and command line tools fast.
+"""
+import importlib
 
 __version__ = "0.39.0"
+
+# Public name -> (module relative to this package, attribute name)
+_LAZY_IMPORTS = {
+    "BackgroundNoiseAugment": (
+        ".augmentations.add_background_noise",
+        "BackgroundNoiseAugment",
+    ),
+    "GaussianNoiseAugment": (
+        ".augmentations.add_gaussian_noise",
+        "GaussianNoiseAugment",
+    ),
+    "GaussianSNRAugment": (".augmentations.add_gaussian_snr", "GaussianSNRAugment"),
+    "ColorNoiseAugment": (".augmentations.add_color_noise", "ColorNoiseAugment"),
+    "NOISE_COLOR_DECAYS": (".augmentations.add_color_noise", "NOISE_COLOR_DECAYS"),
+    "ShortNoisesAugment": (".augmentations.add_short_noises", "ShortNoisesAugment"),
+    "DurationAdjustAugment": (
+        ".augmentations.adjust_duration",
+        "DurationAdjustAugment",
+    ),
+    "AirAbsorptionAugment": (".augmentations.air_absorption", "AirAbsorptionAugment"),
+    "AliasingAugment": (".augmentations.aliasing", "AliasingAugment"),
+    "ImpulseResponseAugment": (
+        ".augmentations.apply_impulse_response",
+        "ImpulseResponseAugment",
+    ),
+    "AudioConcatMixAugment": (
+        ".augmentations.audio_concatenation_mixing",
+        "AudioConcatMixAugment",
+    ),
+    "BandPassFilterAugment": (
+        ".augmentations.band_pass_filter",
+        "BandPassFilterAugment",
+    ),
+    "BandStopFilterAugment": (
+        ".augmentations.band_stop_filter",
+        "BandStopFilterAugment",
+    ),
+    "BitCrushAugment": (".augmentations.bit_crush", "BitCrushAugment"),
+    "ClipAugment": (".augmentations.clip", "ClipAugment"),
+    "ClippingDistortionAugment": (
+        ".augmentations.clipping_distortion",
+        "ClippingDistortionAugment",
+    ),
+    "CodecAugment": (".augmentations.codec_augment", "CodecAugment"),
+    "DynamicRangeAugment": (
+        ".augmentations.dynamic_range_augment",
+        "DynamicRangeAugment",
+    ),
+    "EchoDelayAugment": (".augmentations.echo_delay_augment", "EchoDelayAugment"),
+    "GainAugment": (".augmentations.gain", "GainAugment"),
+    "GainTransitionAugment": (
+        ".augmentations.gain_transition",
+        "GainTransitionAugment",
+    ),
+    "HighPassFilterAugment": (
+        ".augmentations.high_pass_filter",
+        "HighPassFilterAugment",
+    ),
+    "HighShelfFilterAugment": (
+        ".augmentations.high_shelf_filter",
+        "HighShelfFilterAugment",
+    ),
+    "Lambda": (".augmentations.lambda_transform", "Lambda"),
+    "LimiterAugment": (".augmentations.limiter", "LimiterAugment"),
+    "LoudnessNormAugment": (
+        ".augmentations.loudness_normalization",
+        "LoudnessNormAugment",
+    ),
+    "LowPassFilterAugment": (".augmentations.low_pass_filter", "LowPassFilterAugment"),
+    "LowShelfFilterAugment": (
+        ".augmentations.low_shelf_filter",
+        "LowShelfFilterAugment",
+    ),
+    "MixupAugment": (".augmentations.mixup", "MixupAugment"),
+    "MP3CompressionAugment": (
+        ".augmentations.mp3_compression",
+        "MP3CompressionAugment",
+    ),
+    "NormalizeAugment": (".augmentations.normalize", "NormalizeAugment"),
+    "PaddingAugment": (".augmentations.padding", "PaddingAugment"),
+    "PeakingFilterAugment": (".augmentations.peaking_filter", "PeakingFilterAugment"),
+    "PitchShiftAugment": (".augmentations.pitch_shift", "PitchShiftAugment"),
+    "PolarityInvertAugment": (
+        ".augmentations.polarity_inversion",
+        "PolarityInvertAugment",
+    ),
+    "RepeatPartAugment": (".augmentations.repeat_part", "RepeatPartAugment"),
+    "ResampleAugment": (".augmentations.resample", "ResampleAugment"),
+    "ReverseAugment": (".augmentations.reverse", "ReverseAugment"),
+    "RoomSimulateAugment": (".augmentations.room_simulator", "RoomSimulateAugment"),
+    "SevenBandEQAugment": (
+        ".augmentations.seven_band_parametric_eq",
+        "SevenBandEQAugment",
+    ),
+    "ShiftAugment": (".augmentations.shift", "ShiftAugment"),
+    "SpecAugment": (".augmentations.spec_augment", "SpecAugment"),
+    "SpectralInversionAugment": (
+        ".augmentations.spectral_inversion_augment",
+        "SpectralInversionAugment",
+    ),
+    "TanhDistortionAugment": (
+        ".augmentations.tanh_distortion",
+        "TanhDistortionAugment",
+    ),
+    "TimeMaskAugment": (".augmentations.time_mask", "TimeMaskAugment"),
+    "TimeStretchAugment": (".augmentations.time_stretch", "TimeStretchAugment"),
+    "TrimAugment": (".augmentations.trim", "TrimAugment"),
+    "VTLPAugment": (".augmentations.VLTPAugment", "VTLPAugment"),
+    "Compose": (".core.composition", "Compose"),
+    "SpecCompose": (".core.composition", "SpecCompose"),
+    "OneOf": (".core.composition", "OneOf"),
+    "SomeOf": (".core.composition", "SomeOf"),
+    "SpecChannelShuffle": (
+        ".spec_augmentations.spec_channel_shuffle",
+        "SpecChannelShuffle",
+    ),
+    "SpecFrequencyMask": (
+        ".spec_augmentations.spec_frequency_mask",
+        "SpecFrequencyMask",
+    ),
+}
+
+# The names that this package exported before its transforms were renamed
+_LEGACY_NAMES = {
+    "AddBackgroundNoise": "BackgroundNoiseAugment",
+    "AddGaussianNoise": "GaussianNoiseAugment",
+    "AddGaussianSNR": "GaussianSNRAugment",
+    "AddColorNoise": "ColorNoiseAugment",
+    "AddShortNoises": "ShortNoisesAugment",
+    "AdjustDuration": "DurationAdjustAugment",
+    "AirAbsorption": "AirAbsorptionAugment",
+    "Aliasing": "AliasingAugment",
+    "ApplyImpulseResponse": "ImpulseResponseAugment",
+    "BandPassFilter": "BandPassFilterAugment",
+    "BandStopFilter": "BandStopFilterAugment",
+    "BitCrush": "BitCrushAugment",
+    "Clip": "ClipAugment",
+    "ClippingDistortion": "ClippingDistortionAugment",
+    "Gain": "GainAugment",
+    "GainTransition": "GainTransitionAugment",
+    "HighPassFilter": "HighPassFilterAugment",
+    "HighShelfFilter": "HighShelfFilterAugment",
+    "Limiter": "LimiterAugment",
+    "LoudnessNormalization": "LoudnessNormAugment",
+    "LowPassFilter": "LowPassFilterAugment",
+    "LowShelfFilter": "LowShelfFilterAugment",
+    "Mp3Compression": "MP3CompressionAugment",
+    "Normalize": "NormalizeAugment",
+    "Padding": "PaddingAugment",
+    "PeakingFilter": "PeakingFilterAugment",
+    "PitchShift": "PitchShiftAugment",
+    "PolarityInversion": "PolarityInvertAugment",
+    "RepeatPart": "RepeatPartAugment",
+    "Resample": "ResampleAugment",
+    "Reverse": "ReverseAugment",
+    "RoomSimulator": "RoomSimulateAugment",
+    "SevenBandParametricEQ": "SevenBandEQAugment",
+    "Shift": "ShiftAugment",
+    "TanhDistortion": "TanhDistortionAugment",
+    "TimeMask": "TimeMaskAugment",
+    "TimeStretch": "TimeStretchAugment",
+    "Trim": "TrimAugment",
+}
+
+__all__ = sorted(_LAZY_IMPORTS) + sorted(_LEGACY_NAMES)
+
+
+def __getattr__(name):
+    if name in _LEGACY_NAMES:
+        value = __getattr__(_LEGACY_NAMES[name])
+    elif name in _LAZY_IMPORTS:
+        module_name, attribute_name = _LAZY_IMPORTS[name]
+        value = getattr(importlib.import_module(module_name, __name__), attribute_name)
+    else:
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+    # Cache the value, so that later lookups don't go through __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -10,55 +10,119 @@ The transformation uses the following mapping for each frequency bin f:
 where f_max is the maximum frequency bin index (num_mel - 1) and alpha is sampled uniformly
 from [alpha_min, alpha_max].
 
-The transform interpolates along the frequency axis for each time frame using linear interpolation.
+The warp is a linear interpolation along the frequency axis. It is expressed as a
+(num_mel, num_mel) interpolation matrix, which is applied to all time frames at once with a single matrix product.
+Batches of mel-spectrograms with shape (..., time, num_mel) are supported. When alpha is
+rounded to buckets (see alpha_step), the matrices are cached per number of mel bins and
+alpha bucket.
 """
 
+import functools
+
 import numpy as np
 from CLAPForge.core.transforms_interface import BaseWaveformTransform
 
+
+def build_vtlp_warp_matrix(num_mel, alpha):
+    """
+    Return the (num_mel, num_mel) float32 matrix W such that `melspec @ W.T` is equal to
+    `np.interp(freq_bins, warped_freq, melspec[t, :])` for every time frame t. Each row
+    has at most two nonzero weights.
+
+    Parameters:
+        num_mel (int): Number of mel bins.
+        alpha (float): Warp factor.
+    """
+    warp_matrix = np.zeros((num_mel, num_mel), dtype=np.float32)
+    if num_mel == 1:
+        warp_matrix[0, 0] = 1.0
+        return warp_matrix
+
+    f_max = num_mel - 1
+    freq_bins = np.arange(num_mel)
+    warped_freq = f_max * (freq_bins / f_max) ** alpha
+
+    # For each output bin, find the pair of warped bins that surround it, like np.interp
+    right = np.clip(np.searchsorted(warped_freq, freq_bins, side="right"), 1, f_max)
+    left = right - 1
+    weight_right = np.clip(
+        (freq_bins - warped_freq[left]) / (warped_freq[right] - warped_freq[left]),
+        0.0,
+        1.0,
+    )
+    warp_matrix[freq_bins, left] = 1.0 - weight_right
+    warp_matrix[freq_bins, right] += weight_right
+    return warp_matrix
+
+
+@functools.lru_cache(maxsize=256)
+def get_vtlp_warp_matrix(num_mel, alpha):
+    """
+    Like build_vtlp_warp_matrix, but cached. Only worth it for alpha values that repeat.
+    The returned array is read-only, since it is shared through the cache.
+    """
+    warp_matrix = build_vtlp_warp_matrix(num_mel, alpha)
+    warp_matrix.flags.writeable = False
+    return warp_matrix
+
+
 class VTLPAugment(BaseWaveformTransform):
-    def __init__(self, alpha_min=0.9, alpha_max=1.1, p=1.0):
+    supports_multichannel = True
+
+    def __init__(self, alpha_min=0.9, alpha_max=1.1, alpha_step=None, p=1.0):
         """
         Initialize VTLPAugment.
 
         Parameters:
             alpha_min (float): Minimum warp factor (e.g., 0.9).
             alpha_max (float): Maximum warp factor (e.g., 1.1).
+            alpha_step (float, optional): If given, the sampled warp factor is rounded to
+                a multiple of this value (e.g. 0.01), and the warp matrices are cached per
+                alpha bucket. By default, alpha is not rounded, and the warp matrix is
+                built for each call, as caching it would never hit.
             p (float): Probability of applying this augmentation.
         """
         super().__init__(p=p)
         self.alpha_min = alpha_min
         self.alpha_max = alpha_max
+        self.alpha_step = alpha_step
+
+    def is_multichannel(self, samples):
+        # A 2D input is a single (time, num_mel) spectrogram, not multichannel audio.
+        # Higher-dimensional inputs are batches of spectrograms.
+        return samples.ndim > 2
+
+    def is_channels_last(self, samples):
+        # Spectrograms have the shape (time, num_mel), where time is usually the larger
+        # axis, so the channels-first check for waveforms doesn't apply
+        return False
+
+    def randomize_parameters(self, samples, sample_rate):
+        super().randomize_parameters(samples, sample_rate)
+        if self.parameters["should_apply"]:
+            # Sample a random warp factor from the range [alpha_min, alpha_max].
+            alpha = np.random.uniform(self.alpha_min, self.alpha_max)
+            if self.alpha_step:
+                alpha = round(alpha / self.alpha_step) * self.alpha_step
+            self.parameters["alpha"] = float(alpha)
 
     def apply(self, input_melspec, sample_rate=None):
         """
         Apply VTLP to a mel-spectrogram.
 
         Parameters:
-            input_melspec (np.ndarray): Input mel-spectrogram of shape (time, num_mel).
+            input_melspec (np.ndarray): Input mel-spectrogram of shape (time, num_mel), or
+                a batch of them with shape (..., time, num_mel).
             sample_rate (int, optional): Sample rate of the original audio (not used here).
 
         Returns:
             np.ndarray: The VTLP-warped mel-spectrogram with the same shape as input.
         """
-        # Get the dimensions of the mel-spectrogram.
-        time_steps, num_mel = input_melspec.shape
-        
-        # Sample a random warp factor from the range [alpha_min, alpha_max].
-        alpha = np.random.uniform(self.alpha_min, self.alpha_max)
-        
-        # Define the maximum frequency index.
-        f_max = num_mel - 1
-        
-        # Original frequency bin indices.
-        freq_bins = np.arange(num_mel)
-        # Compute warped frequency indices using the VTLP formula.
-        warped_freq = f_max * (freq_bins / f_max) ** alpha
-        
-        # Initialize the output array.
-        warped_melspec = np.empty_like(input_melspec)
-        # For each time frame, interpolate the mel-spectrogram along the frequency axis.
-        for t in range(time_steps):
-            warped_melspec[t, :] = np.interp(freq_bins, warped_freq, input_melspec[t, :])
-        
-        return warped_melspec
+        num_mel = input_melspec.shape[-1]
+        if self.alpha_step:
+            warp_matrix = get_vtlp_warp_matrix(num_mel, self.parameters["alpha"])
+        else:
+            warp_matrix = build_vtlp_warp_matrix(num_mel, self.parameters["alpha"])
+        return np.matmul(input_melspec, warp_matrix.T).astype(
+            input_melspec.dtype, copy=False
+        )
@@ -1,4 +1,3 @@
-import functools
 import random
 import warnings
 from pathlib import Path
@@ -7,7 +6,8 @@ from typing import Optional, List, Callable, Union
 import numpy as np
 from numpy.typing import NDArray
 
-from CLAPForge.core.audio_loading_utils import load_sound_file
+from CLAPForge.core.audio_cache import load_cached_sound_file
+from CLAPForge.core.prefetch import AudioPrefetcher
 from CLAPForge.core.transforms_interface import BaseWaveformTransform
 from CLAPForge.core.utils import (
     calculate_desired_noise_rms,
@@ -43,7 +43,8 @@ class BackgroundNoiseAugment(BaseWaveformTransform):
             Callable[[NDArray[np.float32], int], NDArray[np.float32]]
         ] = None,
         p: float = 0.5,
-        lru_cache_size: int = 2,
+        lru_cache_size: Optional[int] = None,
+        num_prefetched_files: int = 0,
     ):
         """
         :param sounds_path: A path or list of paths to audio file(s) and/or folder(s) with
@@ -65,7 +66,13 @@ class BackgroundNoiseAugment(BaseWaveformTransform):
             gets applied to the noise before it gets mixed in. The callable is expected
             to input audio waveform (numpy array) and sample rate (int).
         :param p: The probability of applying this transform
-        :param lru_cache_size: Maximum size of the LRU cache for storing noise files in memory
+        :param lru_cache_size: Deprecated and ignored. Noise files are kept in memory in the
+            process-wide, byte-budgeted cache of CLAPForge.core.audio_cache.
+        :param num_prefetched_files: If greater than 0, this many upcoming noise files are
+            drawn in advance and decoded into the audio cache on a background thread pool,
+            so that reading them is off the critical path. See
+            CLAPForge.core.prefetch.AudioPrefetcher, available as self.prefetcher, for the
+            hit statistics.
         """
         super().__init__(p)
         self.sounds_path = sounds_path
@@ -89,15 +96,23 @@ class BackgroundNoiseAugment(BaseWaveformTransform):
         self.max_absolute_rms_db = max_absolute_rms_db
 
         self.noise_rms = noise_rms
+        if lru_cache_size is not None:
+            warnings.warn(
+                "The lru_cache_size parameter is deprecated and has no effect. Noise"
+                " files are cached in CLAPForge.core.audio_cache.audio_cache, which has"
+                " a budget in bytes.",
+                DeprecationWarning,
+            )
         self.lru_cache_size = lru_cache_size
-        self._load_sound = functools.lru_cache(maxsize=self.lru_cache_size)(
-            BackgroundNoiseAugment._load_sound
-        )
+        self.num_prefetched_files = num_prefetched_files
+        self.prefetcher = AudioPrefetcher(self.draw_sound_file_path, num_prefetched_files)
         self.noise_transform = noise_transform
 
-    @staticmethod
-    def _load_sound(file_path, sample_rate):
-        return load_sound_file(file_path, sample_rate)
+    def draw_sound_file_path(self):
+        return random.choice(self.sound_file_paths)
+
+    def _load_sound(self, file_path, sample_rate):
+        return self.prefetcher.load(file_path, sample_rate)
 
     def randomize_parameters(self, input_samples: NDArray[np.float32], sample_rate: int):
         super().randomize_parameters(input_samples, sample_rate)
@@ -106,7 +121,7 @@ class BackgroundNoiseAugment(BaseWaveformTransform):
             self.parameters["rms_db"] = random.uniform(
                 self.min_absolute_rms_db, self.max_absolute_rms_db
             )
-            self.parameters["noise_file_path"] = random.choice(self.sound_file_paths)
+            self.parameters["noise_file_path"] = self.prefetcher.next_pick(sample_rate)
 
             num_samples = len(input_samples)
             noise_sound, _ = self._load_sound(
@@ -124,7 +139,9 @@ class BackgroundNoiseAugment(BaseWaveformTransform):
             )
 
     def apply(self, input_samples: NDArray[np.float32], sample_rate: int) -> NDArray[np.float32]:
-        noise_sound, _ = self._load_sound(
+        # The noise was loaded through the prefetcher in randomize_parameters, so it is in
+        # the audio cache, and this load is not counted in the prefetcher stats again
+        noise_sound, _ = load_cached_sound_file(
             self.parameters["noise_file_path"], sample_rate
         )
         noise_sound = noise_sound[
@@ -132,7 +149,9 @@ class BackgroundNoiseAugment(BaseWaveformTransform):
         ]
 
         if self.noise_transform:
-            noise_sound = self.noise_transform(noise_sound, sample_rate)
+            # The cached noise is read-only, and some transforms (e.g. the ones based on
+            # python_stretch) need a writable array
+            noise_sound = self.noise_transform(noise_sound.copy(), sample_rate)
 
         noise_rms = calculate_rms(noise_sound)
         if noise_rms < 1e-9:
@@ -170,13 +189,3 @@ class BackgroundNoiseAugment(BaseWaveformTransform):
 
         # Return a mix of the input sound and the background noise sound
         return input_samples + noise_sound
-
-    def __getstate__(self):
-        state = self.__dict__.copy()
-        warnings.warn(
-            "Warning: the LRU cache of BackgroundNoiseAugment gets discarded when pickling"
-            " it. E.g. this means the cache will not be used when using"
-            " BackgroundNoiseAugment together with multiprocessing on Windows"
-        )
-        del state["_load_sound"]
-        return state
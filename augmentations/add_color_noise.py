@@ -1,7 +1,8 @@
+import functools
 import random
 
 import numpy as np
-import scipy.signal as sp
+import scipy.fft
 from numpy.typing import NDArray
 
 from CLAPForge.core.transforms_interface import BaseWaveformTransform
@@ -34,6 +35,52 @@ def decay_to_beta(decay: float) -> float:
     return decay / (-10.0) / np.log10(2.0)
 
 
+@functools.lru_cache(maxsize=256)
+def get_decay_envelope(
+    beta: float, n_fft: int, sample_rate: int, apply_a_weighting: bool
+) -> NDArray[np.float32]:
+    """
+    Return the magnitude envelope of colored noise that decays by 1/f^beta in PSD, at the
+    n_fft // 2 + 1 frequencies of an n_fft-point rFFT, optionally A-weighted. The envelopes
+    are cached per color, n_fft, sample rate and weighting. The returned array is
+    read-only.
+    """
+    f = np.fft.rfftfreq(n_fft, 1.0 / sample_rate)
+    f[0] = 1
+    # Decay is in PSD, for magnitude, take sqrt
+    envelope = np.sqrt(1 / f**beta)
+    if apply_a_weighting:
+        envelope *= a_weighting_frequency_envelope(n_fft, sample_rate)
+    envelope = envelope.astype(np.float32)
+    envelope.flags.writeable = False
+    return envelope
+
+
+@functools.lru_cache(maxsize=16)
+def get_interpolated_decay_envelope(
+    beta: float, n_fft: int, sample_rate: int, apply_a_weighting: bool, num_samples: int
+) -> NDArray[np.float32]:
+    """
+    Return the envelope of get_decay_envelope, interpolated to the num_samples // 2 + 1
+    frequencies of a num_samples-point rFFT. The interpolation is done in log-log space,
+    where the decay is a straight line, so that the slope is kept between the n_fft
+    points. The envelopes are as long as the signal, so only a few of them are cached.
+    The returned array is read-only.
+    """
+    freqs = np.fft.rfftfreq(num_samples, 1.0 / sample_rate)
+    envelope_freqs = np.fft.rfftfreq(n_fft, 1.0 / sample_rate)
+    envelope_freqs[0] = 1
+    envelope = np.exp(
+        np.interp(
+            np.log(np.maximum(freqs, 1.0)),
+            np.log(envelope_freqs),
+            np.log(get_decay_envelope(beta, n_fft, sample_rate, apply_a_weighting)),
+        )
+    ).astype(np.float32)
+    envelope.flags.writeable = False
+    return envelope
+
+
 def generate_decaying_white_noise(
     size,
     beta,
@@ -41,6 +88,7 @@ def generate_decaying_white_noise(
     apply_a_weighting=False,
     n_fft=64,
     in_db_per_octave=True,
+    rng: np.random.Generator = None,
 ):
     """
     Generates a white noise signal decaying linearly by 1/f^beta
@@ -59,55 +107,51 @@ def generate_decaying_white_noise(
     | violet         |                    -2.0 |                  6.02 |
     | white          |                     0.0 |                   0.0 |
 
+    The noise is shaped directly in the frequency domain: a white complex spectrum is
+    drawn in float32, multiplied by the decay envelope, which is interpolated from
+    n_fft // 2 + 1 points to the frequencies of the whole signal (both are cached), and
+    is transformed back with one inverse rFFT along the last axis, for all channels at
+    once.
+
     Note that you can get away with low n_fft (e.g. 128 points) values
     if you are not using a_weighting, but keep it higher otherwise.
-    """
 
-    sig = np.random.normal(0, 1, size=size)
+    :param size: The shape of the noise, e.g. (samples,) or (channels, samples)
+    :param rng: The random generator to draw from. By default, one is seeded from
+        np.random.
+    :return: float32 noise with unit RMS
+    """
+    if rng is None:
+        rng = np.random.default_rng(np.random.randint(0, 2**31))
+    size = (size,) if np.isscalar(size) else tuple(size)
 
     if beta == 0.0 and not apply_a_weighting:
         # No decay, return white noise
-        return sig.astype(np.float32)
-
-    # Compute the decay in fft domain (ignore phase)
-    f = np.fft.rfftfreq(n_fft, 1.0 / sample_rate)
-    f[0] = 1
-    decay = np.ones(n_fft // 2 + 1, dtype=complex)
+        return rng.standard_normal(size, dtype=np.float32)
 
     # If beta is given as decay in db/octave, convert it to a
     # decay exponent.
     if in_db_per_octave:
         beta = decay_to_beta(beta)
 
-    # Decay is in PSD, for magnitude, take sqrt and add random phase
-    decay = np.sqrt(1 / f**beta) * np.exp(
-        1j * np.random.uniform(0, 2 * np.pi, len(decay))
+    num_samples = size[-1]
+    envelope = get_interpolated_decay_envelope(
+        float(beta), n_fft, sample_rate, apply_a_weighting, num_samples
     )
 
-    # Optionally apply a-weighting
-    if apply_a_weighting:
-        weighting = a_weighting_frequency_envelope(n_fft, sample_rate)
-        decay *= weighting
-
-    # Compute the impulse response of the decay
-    decay_ir = np.fft.irfft(decay)
-
-    # Convolve the white noise with the decay impulse response
-
-    # Calculate number of channels
-    if len(sig.shape) > 1:
-        n_channels = sig.shape[0]
-        fsig = np.zeros_like(sig).astype(np.float32)
-        for chn_idx in range(n_channels):
-            fsig[chn_idx] = sp.oaconvolve(sig[chn_idx], decay_ir, "same")
-    else:
-        n_channels = 1
-        fsig = sp.oaconvolve(sig, decay_ir, "same")
+    # Standard normal real and imaginary parts give a white spectrum with random phase
+    spectrum = (
+        rng.standard_normal(size[:-1] + (envelope.shape[0], 2), dtype=np.float32)
+        .view(np.complex64)
+        .reshape(size[:-1] + (envelope.shape[0],))
+    )
+    spectrum *= envelope
+    fsig = scipy.fft.irfft(spectrum, n=num_samples, axis=-1)
 
     # NormalizeAugment to unit energy
     fsig /= np.sqrt(np.mean(fsig**2))
 
-    return fsig.astype(np.float32)
+    return fsig.astype(np.float32, copy=False)
 
 
 class ColorNoiseAugment(BaseWaveformTransform):
@@ -191,6 +235,7 @@ class ColorNoiseAugment(BaseWaveformTransform):
             self.parameters["desired_noise_rms"] = desired_noise_rms
             self.parameters["f_decay"] = f_decay
             self.parameters["apply_a_weighting"] = apply_a_weighting
+            self.parameters["noise_seed"] = int(np.random.randint(0, 2**31))
 
     def apply(
         self, input_samples: NDArray[np.float32], sample_rate: int
@@ -208,6 +253,7 @@ class ColorNoiseAugment(BaseWaveformTransform):
             sample_rate=sample_rate,
             apply_a_weighting=self.parameters["apply_a_weighting"],
             n_fft=self.n_fft,
+            rng=np.random.default_rng(self.parameters["noise_seed"]),
         )
 
         if n_channels > 1:
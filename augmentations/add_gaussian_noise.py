@@ -1,22 +1,39 @@
 import random
+from typing import Optional
 
 import numpy as np
 from numpy.typing import NDArray
 
+from CLAPForge.core.noise import GaussianNoisePool, generate_gaussian_noise
 from CLAPForge.core.transforms_interface import BaseWaveformTransform
 
 
 class GaussianNoiseAugment(BaseWaveformTransform):
-    """Add gaussian noise to the input_samples"""
+    """
+    Add gaussian noise to the input_samples. The noise is drawn from a generator that is
+    seeded per call, in time-major order, so that a stream of chunks gets the same noise
+    as the whole recording would. Optionally, the noise is read from a pool of
+    pregenerated noise blocks instead (see CLAPForge.core.noise.GaussianNoisePool).
+    """
 
     supports_multichannel = True
+    supports_inplace = True
+    supports_streaming = True
 
-    def __init__(self, min_amplitude=0.001, max_amplitude=0.015, p=0.5):
+    def __init__(
+        self,
+        min_amplitude=0.001,
+        max_amplitude=0.015,
+        p=0.5,
+        noise_pool: Optional[GaussianNoisePool] = None,
+    ):
         """
 
         :param min_amplitude: Minimum noise amplification factor
         :param max_amplitude: Maximum noise amplification factor
         :param p:
+        :param noise_pool: If given, the noise is sliced from this pool of pregenerated
+            noise blocks at random offsets, which is faster than drawing fresh noise
         """
         super().__init__(p)
         assert min_amplitude > 0.0
@@ -24,6 +41,7 @@ class GaussianNoiseAugment(BaseWaveformTransform):
         assert max_amplitude >= min_amplitude
         self.min_amplitude = min_amplitude
         self.max_amplitude = max_amplitude
+        self.noise_pool = noise_pool
 
     def randomize_parameters(self, input_samples: NDArray[np.float32], sample_rate: int):
         super().randomize_parameters(input_samples, sample_rate)
@@ -31,8 +49,39 @@ class GaussianNoiseAugment(BaseWaveformTransform):
             self.parameters["amplitude"] = random.uniform(
                 self.min_amplitude, self.max_amplitude
             )
+            self.parameters["noise_seed"] = int(np.random.randint(0, 2**31))
 
-    def apply(self, input_samples: NDArray[np.float32], sample_rate: int) -> NDArray[np.float32]:
-        noise = np.random.randn(*input_samples.shape).astype(np.float32)
-        input_samples = input_samples + self.parameters["amplitude"] * noise
-        return input_samples
+    def apply(
+        self, input_samples: NDArray[np.float32], sample_rate: int, out=None
+    ) -> NDArray[np.float32]:
+        noise = self.generate_noise(
+            np.random.default_rng(self.parameters["noise_seed"]), input_samples.shape
+        )
+        return np.add(input_samples, noise, out=out)
+
+    def generate_noise(self, rng: np.random.Generator, shape) -> NDArray[np.float32]:
+        return generate_gaussian_noise(
+            rng, shape, self.parameters["amplitude"], self.noise_pool
+        )
+
+    def apply_chunk(self, chunk: NDArray[np.float32], state: dict) -> NDArray[np.float32]:
+        if "rng" not in state:
+            state["rng"] = np.random.default_rng(self.parameters["noise_seed"])
+            if self.noise_pool is not None:
+                # Keep reading each row of noise from where the previous chunk stopped
+                num_rows = int(np.prod(chunk.shape[:-1]))
+                state["block_indices"], state["offsets"] = (
+                    self.noise_pool.draw_read_positions(state["rng"], num_rows)
+                )
+        if self.noise_pool is None:
+            return chunk + self.generate_noise(state["rng"], chunk.shape)
+
+        noise = np.empty(chunk.shape, dtype=np.float32)
+        self.noise_pool.read(
+            state["block_indices"],
+            state["offsets"],
+            noise.reshape((-1, chunk.shape[-1])),
+            self.parameters["amplitude"],
+        )
+        state["offsets"] = state["offsets"] + chunk.shape[-1]
+        return chunk + noise
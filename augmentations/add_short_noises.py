@@ -1,4 +1,3 @@
-import functools
 import random
 import warnings
 from pathlib import Path
@@ -7,7 +6,8 @@ from typing import Optional, List, Union, Callable
 import numpy as np
 from numpy.typing import NDArray
 
-from CLAPForge.core.audio_loading_utils import load_sound_file
+from CLAPForge.core.audio_loading_utils import load_audio_duration_index
+from CLAPForge.core.prefetch import AudioPrefetcher
 from CLAPForge.core.transforms_interface import BaseWaveformTransform
 from CLAPForge.core.utils import (
     calculate_desired_noise_rms,
@@ -50,7 +50,9 @@ class ShortNoisesAugment(BaseWaveformTransform):
             Callable[[NDArray[np.float32], int], NDArray[np.float32]]
         ] = None,
         p: float = 0.5,
-        lru_cache_size: Optional[int] = 64,
+        lru_cache_size: Optional[int] = None,
+        noise_index_path: Optional[Union[Path, str]] = None,
+        num_prefetched_files: int = 0,
     ):
         """
         :param sounds_path: A path or list of paths to audio file(s) and/or folder(s) with
@@ -113,13 +115,29 @@ class ShortNoisesAugment(BaseWaveformTransform):
         :param noise_transform: A callable waveform transform (or composition of transforms) that
             gets applied to noises before they get mixed in.
         :param p: The probability of applying this transform
-        :param lru_cache_size: Maximum size of the LRU cache for storing noise files in memory
+        :param lru_cache_size: Deprecated and ignored. Noise files are kept in memory in the
+            process-wide, byte-budgeted cache of CLAPForge.core.audio_cache.
+        :param noise_index_path: Optional path of a JSON sidecar file with the durations
+            of the noise files. The durations are read from the file headers when the
+            transform is created, so that randomizing the parameters does not need to
+            decode any audio. With a sidecar file, they are only read once and then
+            stored in it, along with the modification time and size of each file, so
+            that changed files are read again.
+        :param num_prefetched_files: If greater than 0, this many upcoming noise files are
+            drawn in advance and decoded into the audio cache on a background thread pool,
+            so that reading them is off the critical path. See
+            CLAPForge.core.prefetch.AudioPrefetcher, available as self.prefetcher, for the
+            hit statistics.
         """
         super().__init__(p)
         self.sounds_path = sounds_path
         self.sound_file_paths = find_audio_files_in_paths(self.sounds_path)
         self.sound_file_paths = [str(p) for p in self.sound_file_paths]
         assert len(self.sound_file_paths) > 0
+        self.noise_index_path = noise_index_path
+        self.sound_durations = load_audio_duration_index(
+            self.sound_file_paths, noise_index_path
+        )
 
         assert min_time_between_sounds <= max_time_between_sounds
         assert 0.0 < burst_probability <= 1.0
@@ -187,14 +205,22 @@ class ShortNoisesAugment(BaseWaveformTransform):
         )
         self.add_all_noises_with_same_level = add_all_noises_with_same_level
         self.noise_transform = noise_transform
+        if lru_cache_size is not None:
+            warnings.warn(
+                "The lru_cache_size parameter is deprecated and has no effect. Noise"
+                " files are cached in CLAPForge.core.audio_cache.audio_cache, which has"
+                " a budget in bytes.",
+                DeprecationWarning,
+            )
         self.lru_cache_size = lru_cache_size
-        self._load_sound = functools.lru_cache(maxsize=lru_cache_size)(
-            ShortNoisesAugment.__load_sound
-        )
+        self.num_prefetched_files = num_prefetched_files
+        self.prefetcher = AudioPrefetcher(self.draw_sound_file_path, num_prefetched_files)
+
+    def draw_sound_file_path(self):
+        return random.choice(self.sound_file_paths)
 
-    @staticmethod
-    def __load_sound(file_path, sample_rate):
-        return load_sound_file(file_path, sample_rate)
+    def _load_sound(self, file_path, sample_rate):
+        return self.prefetcher.load(file_path, sample_rate)
 
     def randomize_parameters(self, input_samples: NDArray[np.float32], sample_rate: int):
         super().randomize_parameters(input_samples, sample_rate)
@@ -214,9 +240,8 @@ class ShortNoisesAugment(BaseWaveformTransform):
             )
 
             while current_time < input_sound_duration:
-                sound_file_path = random.choice(self.sound_file_paths)
-                sound, _ = self.__load_sound(sound_file_path, sample_rate)
-                sound_duration = len(sound) / sample_rate
+                sound_file_path = self.prefetcher.next_pick(sample_rate)
+                sound_duration = self.sound_durations[sound_file_path]
 
                 # Ensure that the fade time is not longer than the duration of the sound
                 fade_in_time = min(
@@ -261,9 +286,8 @@ class ShortNoisesAugment(BaseWaveformTransform):
                     if current_time >= input_sound_duration:
                         break
 
-                    sound_file_path = random.choice(self.sound_file_paths)
-                    sound, _ = self.__load_sound(sound_file_path, sample_rate)
-                    sound_duration = len(sound) / sample_rate
+                    sound_file_path = self.prefetcher.next_pick(sample_rate)
+                    sound_duration = self.sound_durations[sound_file_path]
 
                     fade_in_time = min(
                         sound_duration,
@@ -318,10 +342,12 @@ class ShortNoisesAugment(BaseWaveformTransform):
                 # Skip a sound if it ended before the start of the input sound
                 continue
 
-            noise_samples, _ = self.__load_sound(sound_params["file_path"], sample_rate)
+            noise_samples, _ = self._load_sound(sound_params["file_path"], sample_rate)
 
             if self.noise_transform:
-                noise_samples = self.noise_transform(noise_samples, sample_rate)
+                # The cached noise is read-only, and some transforms (e.g. the ones based
+                # on python_stretch) need a writable array
+                noise_samples = self.noise_transform(noise_samples.copy(), sample_rate)
 
             # Apply fade in and fade out
             noise_gain = np.ones_like(noise_samples)
@@ -397,13 +423,3 @@ class ShortNoisesAugment(BaseWaveformTransform):
         else:
             # Return a mix of the input sound and the added sounds
             return input_samples + noise_placeholder
-
-    def __getstate__(self):
-        state = self.__dict__.copy()
-        warnings.warn(
-            "Warning: the LRU cache of ShortNoisesAugment gets discarded when pickling it."
-            " E.g. this means the cache will not be used when using ShortNoisesAugment"
-            " together with multiprocessing on Windows"
-        )
-        del state["_load_sound"]
-        return state
@@ -7,6 +7,7 @@ from CLAPForge.core.transforms_interface import BaseWaveformTransform
 from CLAPForge.core.utils import (
     convert_frequency_to_mel,
     convert_mel_to_frequency,
+    interpolate_along_last_axis,
 )
 
 
@@ -51,12 +52,6 @@ class AliasingAugment(BaseWaveformTransform):
         x = np.linspace(0, n, num=n)
         dwn_n = round(n * float(self.parameters["new_sample_rate"]) / sample_rate)
         dwn_x = np.linspace(0, n, num=dwn_n)
-        if len(input_samples.shape) > 1:
-            distorted_samples = np.zeros((input_samples.shape[0], n), dtype=np.float32)
-            for i in range(input_samples.shape[0]):
-                dwn_samples = np.interp(dwn_x, x, input_samples[i])
-                distorted_samples[i] = np.interp(x, dwn_x, dwn_samples)
-        else:
-            dwn_samples = np.interp(dwn_x, x, input_samples)
-            distorted_samples = np.interp(x, dwn_x, dwn_samples).astype(np.float32)
-        return distorted_samples
+        # All channels (and batch items) are interpolated at once
+        dwn_samples = interpolate_along_last_axis(dwn_x, x, input_samples)
+        return interpolate_along_last_axis(x, dwn_x, dwn_samples).astype(np.float32)
@@ -6,10 +6,10 @@ from typing import List, Union
 
 import numpy as np
 from numpy.typing import NDArray
-from scipy.signal import convolve
-import itertools
 
-from CLAPForge.core.audio_loading_utils import load_sound_file
+from CLAPForge.core.audio_cache import load_cached_sound_file
+from CLAPForge.core.convolution import choose_fft_size, fft_convolve, get_ir_spectrum
+from CLAPForge.core.prefetch import AudioPrefetcher
 from CLAPForge.core.transforms_interface import BaseWaveformTransform
 from CLAPForge.core.utils import find_audio_files_in_paths
 
@@ -18,6 +18,15 @@ class ImpulseResponseAugment(BaseWaveformTransform):
     """Convolve the audio with a randomly selected impulse response.
     Impulse responses can be created using e.g. http://tulrich.com/recording/ir_capture/
     Impulse responses are represented as audio (ideally wav) files in the given ir_path.
+
+    The convolution is done with FFTs (overlap-save for long inputs), and the spectra of
+    the impulse responses are cached per file, sample rate and FFT size. Only the output
+    samples that are kept get computed. By default, the output is normalized to a peak of
+    0.5.
+
+    With normalize_output=False, the transform also supports streaming (see
+    process_chunk()), with overlap-add of the reverb tail from one chunk into the next.
+    The streamed output matches the one-shot output up to float rounding.
     """
 
     supports_multichannel = True
@@ -28,39 +37,67 @@ class ImpulseResponseAugment(BaseWaveformTransform):
         p=0.5,
         lru_cache_size=128,
         leave_length_unchanged: bool = True,
+        normalize_output: bool = True,
+        num_prefetched_files: int = 0,
     ):
         """
         :param ir_path: A path or list of paths to audio file(s) and/or folder(s) with
             audio files. Can be str or Path instance(s). The audio files given here are
             supposed to be impulse responses.
         :param p: The probability of applying this transform
-        :param lru_cache_size: Maximum size of the LRU cache for storing impulse response files
-        in memory.
+        :param lru_cache_size: Maximum size of the LRU cache for storing the spectra of the
+            impulse responses in memory. The decoded impulse responses themselves are kept
+            in the process-wide, byte-budgeted cache of CLAPForge.core.audio_cache.
         :param leave_length_unchanged: When set to True, the tail of the sound (e.g. reverb at
             the end) will be chopped off so that the length of the output is equal to the
             length of the input.
+        :param normalize_output: When set to True, the output is scaled to a peak of 0.5.
+            This needs the whole output at once, so streaming is only supported when it
+            is set to False.
+        :param num_prefetched_files: If greater than 0, this many upcoming impulse response files are
+            drawn in advance and decoded into the audio cache on a background thread pool,
+            so that reading them is off the critical path. See
+            CLAPForge.core.prefetch.AudioPrefetcher, available as self.prefetcher, for the
+            hit statistics.
         """
         super().__init__(p)
         self.ir_path = ir_path
         self.ir_files = [str(p) for p in find_audio_files_in_paths(self.ir_path)]
         assert self.ir_files, "No impulse response files found at the specified path."
         self.lru_cache_size = lru_cache_size
-        self.__load_ir = functools.lru_cache(maxsize=self.lru_cache_size)(self.__load_ir)
+        self.num_prefetched_files = num_prefetched_files
+        self.prefetcher = AudioPrefetcher(self.draw_ir_file_path, num_prefetched_files)
+        self.__get_ir_spectrum = functools.lru_cache(maxsize=self.lru_cache_size)(
+            self.__get_ir_spectrum
+        )
         self.leave_length_unchanged = leave_length_unchanged
+        self.normalize_output = normalize_output
+
+    @property
+    def supports_streaming(self):
+        return not self.normalize_output
+
+    def draw_ir_file_path(self):
+        return random.choice(self.ir_files)
+
+    def __load_ir(self, file_path, sample_rate, mono):
+        return self.prefetcher.load(file_path, sample_rate, mono=mono)
 
-    @staticmethod
-    def __load_ir(file_path, sample_rate, mono):
-        return load_sound_file(file_path, sample_rate, mono=mono)
+    def __get_ir_spectrum(self, file_path, sample_rate, mono, fft_size):
+        # Called after load_ir(), so the impulse response is in the audio cache, and this
+        # load is not counted in the prefetcher stats again
+        ir, _ = load_cached_sound_file(file_path, sample_rate, mono=mono)
+        return get_ir_spectrum(ir, fft_size)
 
     def randomize_parameters(self, input_samples: NDArray[np.float32], sample_rate: int):
         super().randomize_parameters(input_samples, sample_rate)
         if self.parameters["should_apply"]:
-            self.parameters["ir_file_path"] = random.choice(self.ir_files)
+            self.parameters["ir_file_path"] = self.prefetcher.next_pick(
+                sample_rate, mono=input_samples.ndim == 1
+            )
 
-    def apply(self, input_samples: NDArray[np.float32], sample_rate: int) -> NDArray[np.float32]:
-        # Determine if the impulse response should be loaded as mono
-        load_mono_ir = input_samples.ndim == 1
-        ir, sample_rate2 = self.__load_ir(self.parameters["ir_file_path"], sample_rate, mono=load_mono_ir)
+    def load_ir(self, sample_rate: int, mono: bool) -> NDArray[np.float32]:
+        ir, sample_rate2 = self.__load_ir(self.parameters["ir_file_path"], sample_rate, mono=mono)
         if sample_rate != sample_rate2:
             # This will typically not happen, as librosa should automatically resample the
             # impulse response sound to the desired sample rate
@@ -68,25 +105,35 @@ class ImpulseResponseAugment(BaseWaveformTransform):
                 "Recording sample rate {} did not match Impulse Response signal"
                 " sample rate {}!".format(sample_rate, sample_rate2)
             )
+        return ir
+
+    def apply(self, input_samples: NDArray[np.float32], sample_rate: int) -> NDArray[np.float32]:
+        # Determine if the impulse response should be loaded as mono
+        load_mono_ir = input_samples.ndim == 1
+        ir = self.load_ir(sample_rate, load_mono_ir)
 
         # Expand dimensions to match
         samples_original_dim = input_samples.ndim
-        input_samples, ir = np.atleast_2d(input_samples), np.atleast_2d(ir)
-
-        # Preallocate the output array
-        output_shape = (input_samples.shape[0], input_samples.shape[1] + ir.shape[1] - 1)
-        signal_ir = np.empty(output_shape, dtype=input_samples.dtype)
+        input_samples = np.atleast_2d(input_samples)
+        ir_length = ir.shape[-1]
 
-        # Loop over all input_samples channels for channelwise convolution
-        for i, (sample, impulse_response) in enumerate(zip(input_samples, itertools.cycle(ir))):
-            signal_ir[i, :] = convolve(sample, impulse_response)
-
-        max_value = max(np.amax(signal_ir), -np.amin(signal_ir))
-        if max_value > 0.0:
-            scale = 0.5 / max_value
-            signal_ir *= scale
         if self.leave_length_unchanged:
-            signal_ir = signal_ir[..., : input_samples.shape[-1]]
+            num_output_samples = input_samples.shape[1]
+        else:
+            num_output_samples = input_samples.shape[1] + ir_length - 1
+        fft_size = choose_fft_size(ir_length, num_output_samples)
+        ir_spectrum = self.__get_ir_spectrum(
+            self.parameters["ir_file_path"], sample_rate, load_mono_ir, fft_size
+        )
+        signal_ir = fft_convolve(
+            input_samples, ir_spectrum, ir_length, fft_size, num_output_samples
+        )
+
+        if self.normalize_output:
+            max_value = max(np.amax(signal_ir), -np.amin(signal_ir))
+            if max_value > 0.0:
+                scale = 0.5 / max_value
+                signal_ir *= scale
 
         # reshape if mono input
         if samples_original_dim == 1:
@@ -94,6 +141,37 @@ class ImpulseResponseAugment(BaseWaveformTransform):
 
         return signal_ir
 
+    def apply_chunk(self, chunk: NDArray[np.float32], state: dict) -> NDArray[np.float32]:
+        sample_rate = state["sample_rate"]
+        if "tail" not in state:
+            state["is_mono"] = chunk.ndim == 1
+            state["ir_length"] = self.load_ir(sample_rate, state["is_mono"]).shape[-1]
+            state["tail"] = np.zeros(
+                (np.atleast_2d(chunk).shape[0], state["ir_length"] - 1), dtype=np.float32
+            )
+        ir_length = state["ir_length"]
+        chunk = np.atleast_2d(chunk)
+        num_samples = chunk.shape[1]
+
+        # Overlap-add: the full convolution of this chunk, plus the tail of the previous
+        # ones. The part that reaches past the end of the chunk becomes the new tail.
+        fft_size = choose_fft_size(ir_length, num_samples + ir_length - 1)
+        ir_spectrum = self.__get_ir_spectrum(
+            self.parameters["ir_file_path"], sample_rate, state["is_mono"], fft_size
+        )
+        signal_ir = fft_convolve(
+            chunk, ir_spectrum, ir_length, fft_size, num_samples + ir_length - 1
+        )
+        signal_ir[:, : ir_length - 1] += state["tail"]
+        state["tail"] = signal_ir[:, num_samples:]
+        processed_chunk = signal_ir[:, :num_samples]
+        return processed_chunk[0] if state["is_mono"] else processed_chunk
+
+    def flush_stream(self, state: dict):
+        if self.leave_length_unchanged or "tail" not in state:
+            return None
+        return state["tail"][0] if state["is_mono"] else state["tail"]
+
     def __getstate__(self):
         state = self.__dict__.copy()
         warnings.warn(
@@ -101,5 +179,5 @@ class ImpulseResponseAugment(BaseWaveformTransform):
             " E.g. this means the cache will be not be used when using ImpulseResponseAugment"
             " together with multiprocessing on Windows"
         )
-        del state["_ApplyImpulseResponse__load_ir"]
+        del state["_ImpulseResponseAugment__get_ir_spectrum"]
         return state
@@ -12,9 +12,19 @@ Decibel-based loudness adjustments ensure that one audio source is dominant over
 
 import os
 import random
+
 import numpy as np
 from CLAPForge.core.transforms_interface import BaseWaveformTransform
-from CLAPForge.core.audio_loading_utils import load_sound_file
+from CLAPForge.core.prefetch import AudioPrefetcher
+from CLAPForge.core.utils import find_audio_files_in_paths
+
+# The (primary, secondary) category of each mixing scenario
+SCENARIOS = {
+    "speech_sound_effects": ("speech", "sound_effects"),
+    "speech_music": ("speech", "music"),
+    "sound_effects_music": ("sound_effects", "music"),
+}
+
 
 class AudioConcatMixAugment(BaseWaveformTransform):
     def __init__(self,
@@ -22,39 +32,89 @@ class AudioConcatMixAugment(BaseWaveformTransform):
                  sound_effects_dir="audio/sound_effects",
                  music_dir="audio/music",
                  p=0.5,
-                 mix_method="overlay"):
+                 mix_method="overlay",
+                 num_prefetched_picks=0):
         """
         Initialize the Audio Concatenation & Mixing Augmentation.
 
+        The three category directories are indexed (recursively) once, here. The chosen
+        clips are loaded at the sample rate of the input through the shared audio cache
+        of CLAPForge.core.audio_cache.
+
         Parameters:
             speech_dir (str): Directory containing speech audio files.
             sound_effects_dir (str): Directory containing sound effects audio files.
             music_dir (str): Directory containing music audio files.
             p (float): Probability of applying the augmentation.
             mix_method (str): 'overlay' to mix audio sources, 'concatenate' to join sequentially.
+            num_prefetched_picks (int): If greater than 0, the clips of this many upcoming
+                picks are drawn in advance and decoded into the audio cache on a
+                background thread pool. See CLAPForge.core.prefetch.AudioPrefetcher,
+                available as self.prefetcher, for the hit statistics.
         """
         super().__init__(p=p)
         self.speech_dir = speech_dir
         self.sound_effects_dir = sound_effects_dir
         self.music_dir = music_dir
         self.mix_method = mix_method
+        self.num_prefetched_picks = num_prefetched_picks
+
+        self.category_dirs = {
+            "speech": speech_dir,
+            "sound_effects": sound_effects_dir,
+            "music": music_dir,
+        }
+        self.sound_file_paths = {
+            category: [str(p) for p in find_audio_files_in_paths(directory)]
+            if os.path.isdir(directory)
+            else []
+            for category, directory in self.category_dirs.items()
+        }
+        self.prefetcher = AudioPrefetcher(
+            self.draw_pick, num_prefetched_picks, get_file_paths=self.get_pick_file_paths
+        )
+
+    def draw_pick(self):
+        """
+        Draw a mixing scenario and a file from each of its two categories. A file path is
+        None if its category has no audio files.
+        """
+        scenario = random.choice(list(SCENARIOS))
+        file_paths = [
+            random.choice(self.sound_file_paths[category])
+            if self.sound_file_paths[category]
+            else None
+            for category in SCENARIOS[scenario]
+        ]
+        return scenario, file_paths[0], file_paths[1]
+
+    @staticmethod
+    def get_pick_file_paths(pick):
+        return pick[1:]
 
-    def get_random_audio(self, directory):
+    def randomize_parameters(self, input_samples, sample_rate):
+        super().randomize_parameters(input_samples, sample_rate)
+        if self.parameters["should_apply"]:
+            pick = self.prefetcher.next_pick(sample_rate)
+            (
+                self.parameters["scenario"],
+                self.parameters["primary_file_path"],
+                self.parameters["secondary_file_path"],
+            ) = pick
+            # Make primary dominant and reduce secondary by a random value between 6dB and 15dB.
+            self.parameters["reduction_db"] = random.uniform(6, 15)
+
+    def get_random_audio(self, file_path, sample_rate):
         """
-        Load a random audio file from the specified directory.
+        Load the given audio file at the given sample rate through the audio cache.
         
         Returns:
-            samples (np.ndarray): The audio samples.
+            samples (np.ndarray): The audio samples (read-only), or None if file_path is None.
             sample_rate (int): The sample rate.
         """
-        if not os.path.isdir(directory):
-            return None, None
-        files = [f for f in os.listdir(directory) if f.lower().endswith(('.wav', '.flac', '.ogg', '.mp3'))]
-        if not files:
+        if file_path is None:
             return None, None
-        file_path = os.path.join(directory, random.choice(files))
-        samples, sr = load_sound_file(file_path)
-        return samples, sr
+        return self.prefetcher.load(file_path, sample_rate)
 
     def apply(self, input_samples, sample_rate):
         """
@@ -67,28 +127,18 @@ class AudioConcatMixAugment(BaseWaveformTransform):
         Returns:
             np.ndarray: The mixed audio samples.
         """
-        # Choose a random mixing scenario.
-        scenarios = ["speech_sound_effects", "speech_music", "sound_effects_music"]
-        scenario = random.choice(scenarios)
-
-        if scenario == "speech_sound_effects":
-            primary_dir = self.speech_dir
-            secondary_dir = self.sound_effects_dir
-        elif scenario == "speech_music":
-            primary_dir = self.speech_dir
-            secondary_dir = self.music_dir
-        else:  # "sound_effects_music"
-            primary_dir = self.sound_effects_dir
-            secondary_dir = self.music_dir
-
-        primary_audio, sr_primary = self.get_random_audio(primary_dir)
-        secondary_audio, sr_secondary = self.get_random_audio(secondary_dir)
+        primary_audio, _ = self.get_random_audio(
+            self.parameters["primary_file_path"], sample_rate
+        )
+        secondary_audio, _ = self.get_random_audio(
+            self.parameters["secondary_file_path"], sample_rate
+        )
 
         # If either audio is missing, return the original input.
         if primary_audio is None or secondary_audio is None:
             return input_samples
 
-        # Assume sample rates match; in a full implementation, you might resample if needed.
+        # Both clips were resampled to the sample rate of the input when loading.
         # Adjust lengths: use the length of the primary audio.
         len_primary = len(primary_audio)
         len_secondary = len(secondary_audio)
@@ -99,9 +149,7 @@ class AudioConcatMixAugment(BaseWaveformTransform):
             secondary_audio = secondary_audio[:len_primary]
 
         # Apply decibel-based loudness adjustment.
-        # Make primary dominant and reduce secondary by a random value between 6dB and 15dB.
-        reduction_db = random.uniform(6, 15)
-        secondary_gain = 10 ** (-reduction_db / 20.0)
+        secondary_gain = 10 ** (-self.parameters["reduction_db"] / 20.0)
         secondary_audio = secondary_audio * secondary_gain
 
         # Mix audio based on the chosen method.
@@ -114,6 +162,8 @@ class AudioConcatMixAugment(BaseWaveformTransform):
         elif self.mix_method == "concatenate":
             mixed_audio = np.concatenate([primary_audio, secondary_audio])
         else:
-            mixed_audio = primary_audio
+            # The cached audio is read-only
+            mixed_audio = primary_audio.copy()
 
         return mixed_audio
+
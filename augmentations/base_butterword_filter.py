@@ -1,9 +1,12 @@
 import random
+import threading
+from collections import OrderedDict
 
 import numpy as np
 from numpy.typing import NDArray
-from scipy.signal import butter, sosfilt, sosfiltfilt, sosfilt_zi
+from scipy.signal import butter, sosfiltfilt
 
+from CLAPForge.core.filter_utils import sosfilt_from_steady_state
 from CLAPForge.core.transforms_interface import BaseWaveformTransform
 from CLAPForge.core.utils import (
     convert_frequency_to_mel,
@@ -11,9 +14,70 @@ from CLAPForge.core.utils import (
 )
 
 
+MAX_CACHED_FILTER_DESIGNS = 1024
+
+# (order, critical_freqs, filter_type, sample_rate) -> sos, ordered from least to most
+# recently used
+_filter_design_cache = OrderedDict()
+_filter_design_cache_lock = threading.Lock()
+
+
+def design_butterworth_sos(
+    order: int,
+    critical_freqs: tuple,
+    filter_type: str,
+    sample_rate: int,
+    stats: dict = None,
+) -> NDArray[np.float64]:
+    """
+    Design a digital Butterworth filter as second-order sections. The designs are cached,
+    since designing a filter can take about as long as running it on a short clip. The
+    returned array is read-only, as it is shared between callers. Copy it before passing it
+    to scipy.signal.sosfilt, which needs a writable array.
+
+    :param order: The order of the filter
+    :param critical_freqs: Tuple with the cutoff frequency, or the low and high critical
+        frequencies of a band filter, in hertz
+    :param filter_type: One of the `btype` values of `scipy.signal.butter`
+    :param sample_rate: The sample rate of the audio
+    :param stats: Optional dict with "hits" and "misses" counts, one of which gets
+        incremented depending on whether the design was already cached
+    """
+    key = (order, critical_freqs, filter_type, sample_rate)
+    with _filter_design_cache_lock:
+        sos = _filter_design_cache.get(key)
+        if sos is not None:
+            _filter_design_cache.move_to_end(key)
+        if stats is not None:
+            stats["hits" if sos is not None else "misses"] += 1
+    if sos is not None:
+        return sos
+
+    sos = butter(
+        order,
+        critical_freqs[0] if len(critical_freqs) == 1 else list(critical_freqs),
+        btype=filter_type,
+        analog=False,
+        fs=sample_rate,
+        output="sos",
+    )
+    sos.flags.writeable = False
+    with _filter_design_cache_lock:
+        _filter_design_cache[key] = sos
+        if len(_filter_design_cache) > MAX_CACHED_FILTER_DESIGNS:
+            _filter_design_cache.popitem(last=False)
+    return sos
+
+
 class BaseButterworthFilter(BaseWaveformTransform):
     """
     A `scipy.signal.butter`-based generic filter class.
+
+    Filter designs are cached (see design_butterworth_sos). To get more cache hits, the
+    critical frequencies can be snapped to a grid in hertz or mels with the
+    `cutoff_freq_grid` and `cutoff_freq_grid_step` arguments. By default, they are used
+    as they are. The hits and misses of the cache are counted in
+    `filter_design_cache_stats`.
     """
 
     supports_multichannel = True
@@ -23,6 +87,7 @@ class BaseButterworthFilter(BaseWaveformTransform):
     ALLOWED_ONE_SIDE_FILTER_TYPES = ("lowpass", "highpass")
     ALLOWED_TWO_SIDE_FILTER_TYPES = ("bandpass", "bandstop")
     ALLOWED_FILTER_TYPES = ALLOWED_ONE_SIDE_FILTER_TYPES + ALLOWED_TWO_SIDE_FILTER_TYPES
+    ALLOWED_CUTOFF_FREQ_GRIDS = ("hz", "mel")
 
     def __init__(self, **kwargs):
         assert "p" in kwargs
@@ -37,6 +102,20 @@ class BaseButterworthFilter(BaseWaveformTransform):
         self.min_rolloff = kwargs["min_rolloff"]
         self.max_rolloff = kwargs["max_rolloff"]
         self.zero_phase = kwargs["zero_phase"]
+        self.cutoff_freq_grid = kwargs.get("cutoff_freq_grid")
+        self.cutoff_freq_grid_step = kwargs.get("cutoff_freq_grid_step", 10.0)
+        self.filter_design_cache_stats = {"hits": 0, "misses": 0}
+
+        if self.cutoff_freq_grid is not None:
+            assert (
+                self.cutoff_freq_grid in BaseButterworthFilter.ALLOWED_CUTOFF_FREQ_GRIDS
+            ), "cutoff_freq_grid must be None, " + " or ".join(
+                '"{}"'.format(grid)
+                for grid in BaseButterworthFilter.ALLOWED_CUTOFF_FREQ_GRIDS
+            )
+            assert (
+                self.cutoff_freq_grid_step > 0.0
+            ), "cutoff_freq_grid_step must be a positive number"
 
         if self.zero_phase:
             assert (
@@ -181,64 +260,81 @@ class BaseButterworthFilter(BaseWaveformTransform):
                 self.parameters["center_freq"] * bandwidth_fraction
             )
 
-    def apply(self, input_samples: NDArray[np.float32], sample_rate: int = None) -> NDArray[np.float32]:
-        assert input_samples.dtype == np.float32
+    @property
+    def supports_sos_fusion(self):
+        # Zero-phase filtering runs the filter both forwards and backwards, so it can't
+        # be merged with other filters into a single causal filter pass
+        return not self.zero_phase
+
+    @property
+    def supports_streaming(self):
+        # Zero-phase filtering needs the whole signal at once
+        return not self.zero_phase
 
+    def quantize_freq(self, freq: float) -> float:
+        """Snap a critical frequency to the grid given by cutoff_freq_grid, if any."""
+        step = self.cutoff_freq_grid_step
+        if self.cutoff_freq_grid == "hz":
+            quantized_freq = round(freq / step) * step
+        elif self.cutoff_freq_grid == "mel":
+            quantized_freq = convert_mel_to_frequency(
+                round(convert_frequency_to_mel(freq) / step) * step
+            )
+        else:
+            return freq
+        # Never snap to 0 Hz, which is not a valid critical frequency
+        return quantized_freq if quantized_freq > 0.0 else freq
+
+    def get_filter_design_cache_hit_rate(self) -> float:
+        """Return the fraction of filter designs of this transform that were cache hits."""
+        num_designs = (
+            self.filter_design_cache_stats["hits"]
+            + self.filter_design_cache_stats["misses"]
+        )
+        if num_designs == 0:
+            return 0.0
+        return self.filter_design_cache_stats["hits"] / num_designs
+
+    def get_sos(self, sample_rate: int) -> NDArray[np.float64]:
+        nyquist_freq = sample_rate // 2
         if self.filter_type in BaseButterworthFilter.ALLOWED_ONE_SIDE_FILTER_TYPES:
-            cutoff_freq = self.parameters["cutoff_freq"]
-            nyquist_freq = sample_rate // 2
+            cutoff_freq = self.quantize_freq(self.parameters["cutoff_freq"])
             if cutoff_freq > nyquist_freq:
                 # Ensure that the cutoff frequency does not exceed the Nyquist
                 # frequency to avoid an exception from scipy
                 cutoff_freq = nyquist_freq * 0.9999
-            sos = butter(
-                self.parameters["rolloff"] // (12 if self.zero_phase else 6),
-                cutoff_freq,
-                btype=self.filter_type,
-                analog=False,
-                fs=sample_rate,
-                output="sos",
-            )
-        elif self.filter_type in BaseButterworthFilter.ALLOWED_TWO_SIDE_FILTER_TYPES:
-            low_freq = self.parameters["center_freq"] - self.parameters["bandwidth"] / 2
-            high_freq = (
-                self.parameters["center_freq"] + self.parameters["bandwidth"] / 2
+            critical_freqs = (cutoff_freq,)
+        else:
+            band_freqs = (
+                self.parameters["center_freq"] - self.parameters["bandwidth"] / 2,
+                self.parameters["center_freq"] + self.parameters["bandwidth"] / 2,
             )
-            nyquist_freq = sample_rate // 2
+            low_freq, high_freq = (self.quantize_freq(freq) for freq in band_freqs)
+            if high_freq <= low_freq or low_freq >= nyquist_freq * 0.9999:
+                # The band is narrower than the grid step, or its lower edge snapped
+                # above the Nyquist frequency. Use the band edges as they are.
+                low_freq, high_freq = band_freqs
             if high_freq > nyquist_freq:
                 # Ensure that the upper critical frequency does not exceed the Nyquist
                 # frequency to avoid an exception from scipy
                 high_freq = nyquist_freq * 0.9999
-            sos = butter(
-                self.parameters["rolloff"] // (12 if self.zero_phase else 6),
-                [low_freq, high_freq],
-                btype=self.filter_type,
-                analog=False,
-                fs=sample_rate,
-                output="sos",
-            )
+            critical_freqs = (low_freq, high_freq)
+
+        return design_butterworth_sos(
+            self.parameters["rolloff"] // (12 if self.zero_phase else 6),
+            tuple(float(freq) for freq in critical_freqs),
+            self.filter_type,
+            sample_rate,
+            stats=self.filter_design_cache_stats,
+        ).copy()
+
+    def apply(self, input_samples: NDArray[np.float32], sample_rate: int = None) -> NDArray[np.float32]:
+        assert input_samples.dtype == np.float32
+
+        sos = self.get_sos(sample_rate)
 
         # The actual processing takes place here
-        if len(input_samples.shape) == 1:
-            if self.zero_phase:
-                processed_samples = sosfiltfilt(sos, input_samples)
-            else:
-                processed_samples, _ = sosfilt(
-                    sos, input_samples, zi=sosfilt_zi(sos) * input_samples[0]
-                )
-            processed_samples = processed_samples.astype(np.float32)
-        else:
-            processed_samples = np.zeros_like(input_samples, dtype=np.float32)
-            if self.zero_phase:
-                for chn_idx in range(input_samples.shape[0]):
-                    processed_samples[chn_idx, :] = sosfiltfilt(
-                        sos, input_samples[chn_idx, :]
-                    )
-            else:
-                zi = sosfilt_zi(sos)
-                for chn_idx in range(input_samples.shape[0]):
-                    processed_samples[chn_idx, :], _ = sosfilt(
-                        sos, input_samples[chn_idx, :], zi=zi * input_samples[chn_idx, 0]
-                    )
-
-        return processed_samples
+        if not self.zero_phase:
+            return sosfilt_from_steady_state(sos, input_samples)
+
+        return sosfiltfilt(sos, input_samples, axis=-1).astype(np.float32)
@@ -15,6 +15,7 @@ class BitCrushAugment(BaseWaveformTransform):
     """
 
     supports_multichannel = True
+    supports_inplace = True
 
     def __init__(self, min_bit_depth: int = 5, max_bit_depth: int = 10, p: float = 0.5):
         """
@@ -42,6 +43,10 @@ class BitCrushAugment(BaseWaveformTransform):
                 self.min_bit_depth, self.max_bit_depth
             )
 
-    def apply(self, input_samples: NDArray[np.float32], sample_rate: int) -> NDArray[np.float32]:
+    def apply(
+        self, input_samples: NDArray[np.float32], sample_rate: int, out=None
+    ) -> NDArray[np.float32]:
         q = (2 ** self.parameters["bit_depth"] / 2) + 1
-        return np.round(input_samples * q) / q
+        crushed_samples = np.multiply(input_samples, q, out=out)
+        np.round(crushed_samples, out=crushed_samples)
+        return np.divide(crushed_samples, q, out=crushed_samples)
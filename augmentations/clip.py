@@ -22,6 +22,7 @@ class ClipAugment(BaseWaveformTransform):
     """
 
     supports_multichannel = True
+    supports_inplace = True
 
     def __init__(self, a_min: float = -1.0, a_max: float = 1.0, p: float = 0.5):
         """
@@ -34,5 +35,7 @@ class ClipAugment(BaseWaveformTransform):
         self.a_min = a_min
         self.a_max = a_max
 
-    def apply(self, input_samples: NDArray[np.float32], sample_rate: int) -> NDArray[np.float32]:
-        return np.clip(input_samples, self.a_min, self.a_max)
+    def apply(
+        self, input_samples: NDArray[np.float32], sample_rate: int, out=None
+    ) -> NDArray[np.float32]:
+        return np.clip(input_samples, self.a_min, self.a_max, out=out)
@@ -15,6 +15,7 @@ class ClippingDistortionAugment(BaseWaveformTransform):
     """
 
     supports_multichannel = True
+    supports_inplace = True
 
     def __init__(
         self,
@@ -43,10 +44,11 @@ class ClippingDistortionAugment(BaseWaveformTransform):
                 self.min_percentile_threshold, self.max_percentile_threshold
             )
 
-    def apply(self, input_samples: NDArray[np.float32], sample_rate: int) -> NDArray[np.float32]:
+    def apply(
+        self, input_samples: NDArray[np.float32], sample_rate: int, out=None
+    ) -> NDArray[np.float32]:
         lower_percentile_threshold = int(self.parameters["percentile_threshold"] / 2)
         lower_threshold, upper_threshold = np.percentile(
             input_samples, [lower_percentile_threshold, 100 - lower_percentile_threshold]
         )
-        input_samples = np.clip(input_samples, lower_threshold, upper_threshold)
-        return input_samples
+        return np.clip(input_samples, lower_threshold, upper_threshold, out=out)
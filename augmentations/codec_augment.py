@@ -0,0 +1,183 @@
+import random
+from collections import OrderedDict
+from typing import Optional, Sequence
+
+import numpy as np
+from numpy.typing import NDArray
+
+from CLAPForge.core.ffmpeg_utils import FFMPEG_CODECS, FFmpegCodecWorker, find_ffmpeg
+from CLAPForge.core.transforms_interface import BaseWaveformTransform
+from CLAPForge.core.utils import get_max_abs_amplitude
+
+
+class CodecAugment(BaseWaveformTransform):
+    """
+    Degrade the audio by encoding and decoding it with a lossy codec (MP3, AAC, Opus or
+    Vorbis) at a random bitrate. This may help machine learning models deal with audio
+    that was distributed in compressed formats.
+
+    The work is done by a small pool of long-lived ffmpeg processes that take raw PCM on
+    stdin and return degraded PCM on stdout (see FFmpegCodecWorker), so a clip costs
+    milliseconds instead of a process launch. One worker is kept per combination of codec,
+    bitrate, sample rate and number of channels. By default, the pool has room for every
+    combination of codec and bitrate, so that starting a worker (and measuring its codec
+    delay) only happens once per combination. With a smaller max_workers, the least
+    recently used worker is shut down when the pool is full. The output has the same length as the input, with the
+    codec delay compensated for.
+
+    This transform depends on an ffmpeg executable that was built with the encoders in
+    question (libmp3lame, aac, libopus and libvorbis).
+    """
+
+    supports_multichannel = True
+
+    def __init__(
+        self,
+        codecs: Sequence[str] = ("mp3", "aac", "opus", "vorbis"),
+        min_bitrate: int = 16,
+        max_bitrate: int = 64,
+        bitrate_step: int = 16,
+        max_workers: Optional[int] = None,
+        ffmpeg_path: Optional[str] = None,
+        p: float = 0.5,
+    ):
+        """
+        :param codecs: The codecs to pick from. Supported: "mp3", "aac", "opus", "vorbis"
+        :param min_bitrate: Minimum bitrate in kbps
+        :param max_bitrate: Maximum bitrate in kbps
+        :param bitrate_step: The bitrate is picked from the multiples of this value (in
+            kbps) in the range [min_bitrate, max_bitrate]. A coarser step means fewer
+            distinct workers.
+        :param max_workers: Maximum number of ffmpeg encoder/decoder pipelines to keep
+            alive at the same time. Each one is a pair of ffmpeg processes. By default,
+            one per combination of codec and bitrate. If this is smaller than the number
+            of combinations, workers get restarted often, which is slow.
+        :param ffmpeg_path: Path to the ffmpeg executable. If None, ffmpeg is looked up
+            on PATH.
+        :param p: The probability of applying this transform
+        """
+        super().__init__(p)
+        codecs = tuple(codecs)
+        if len(codecs) == 0:
+            raise ValueError("codecs must not be empty")
+        for codec in codecs:
+            if codec not in FFMPEG_CODECS:
+                raise ValueError(
+                    "Unsupported codec: {}. Choose from: {}".format(
+                        codec, ", ".join(sorted(FFMPEG_CODECS))
+                    )
+                )
+        if min_bitrate <= 0:
+            raise ValueError("min_bitrate must be a positive number")
+        if max_bitrate < min_bitrate:
+            raise ValueError("max_bitrate must be >= min_bitrate")
+        if max_workers is not None and max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        self.bitrate_choices = [
+            bitrate
+            for bitrate in range(
+                bitrate_step * -(-min_bitrate // bitrate_step),
+                max_bitrate + 1,
+                bitrate_step,
+            )
+        ]
+        if not self.bitrate_choices:
+            raise ValueError(
+                "There is no multiple of bitrate_step between min_bitrate and max_bitrate"
+            )
+
+        self.codecs = codecs
+        self.min_bitrate = min_bitrate
+        self.max_bitrate = max_bitrate
+        self.bitrate_step = bitrate_step
+        self.max_workers = (
+            len(codecs) * len(self.bitrate_choices) if max_workers is None else max_workers
+        )
+        self.ffmpeg_path = ffmpeg_path
+        self._workers = OrderedDict()
+
+    def randomize_parameters(self, samples: NDArray[np.float32], sample_rate: int):
+        super().randomize_parameters(samples, sample_rate)
+        if self.parameters["should_apply"]:
+            self.parameters["codec"] = random.choice(self.codecs)
+            self.parameters["bitrate"] = random.choice(self.bitrate_choices)
+
+    def get_worker(self, codec: str, bitrate: int, sample_rate: int, num_channels: int):
+        """Return a running worker for the given settings, starting one if needed."""
+        key = (codec, bitrate, sample_rate, num_channels)
+        worker = self._workers.pop(key, None)
+        if worker is not None and (
+            worker.encoder.poll() is not None or worker.decoder.poll() is not None
+        ):
+            worker.close()
+            worker = None
+        if worker is None:
+            while len(self._workers) >= self.max_workers:
+                _, least_recently_used_worker = self._workers.popitem(last=False)
+                least_recently_used_worker.close()
+            worker = FFmpegCodecWorker(
+                codec,
+                bitrate,
+                sample_rate,
+                num_channels,
+                ffmpeg_path=find_ffmpeg(self.ffmpeg_path),
+            )
+        self._workers[key] = worker
+        return worker
+
+    def apply(self, samples: NDArray[np.float32], sample_rate: int) -> NDArray[np.float32]:
+        is_mono = samples.ndim == 1
+        if is_mono:
+            samples = samples[np.newaxis, :]
+
+        # Gain loud audio down to avoid clipping in the encoder, and back up afterwards
+        greatest_abs_sample = get_max_abs_amplitude(samples)
+        if greatest_abs_sample > 1.0:
+            samples = samples * (1.0 / greatest_abs_sample)
+
+        worker = self.get_worker(
+            self.parameters["codec"],
+            self.parameters["bitrate"],
+            sample_rate,
+            samples.shape[0],
+        )
+        try:
+            degraded_samples = worker.process(samples)
+        except Exception:
+            # The stream position of a failed worker can't be trusted, so restart it next
+            # time
+            self._workers.pop(
+                (
+                    self.parameters["codec"],
+                    self.parameters["bitrate"],
+                    sample_rate,
+                    samples.shape[0],
+                )
+            )
+            worker.close()
+            raise
+
+        if greatest_abs_sample > 1.0:
+            degraded_samples *= greatest_abs_sample
+        if is_mono:
+            degraded_samples = degraded_samples[0]
+        return degraded_samples
+
+    def close(self):
+        """Shut down all ffmpeg workers."""
+        while self._workers:
+            _, worker = self._workers.popitem()
+            worker.close()
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+    def __getstate__(self):
+        # ffmpeg processes can't be pickled. Each copy (e.g. each DataLoader worker)
+        # starts its own.
+        state = self.__dict__.copy()
+        state["_workers"] = OrderedDict()
+        return state
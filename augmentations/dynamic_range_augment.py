@@ -1,43 +1,114 @@
 import numpy as np
+from numba import njit
+
 from CLAPForge.core.transforms_interface import BaseWaveformTransform
+from CLAPForge.core.utils import get_writable_copy
+
+
+@njit(cache=True)
+def _follow_envelope(rectified_samples, attack_coefficient, release_coefficient):
+    """
+    One-pole envelope follower with separate attack and release coefficients. Runs along
+    the last axis of a 2D (channels, samples) array of absolute sample values.
+    """
+    envelope = np.empty_like(rectified_samples)
+    for chn_idx in range(rectified_samples.shape[0]):
+        level = rectified_samples[chn_idx, 0]
+        for i in range(rectified_samples.shape[1]):
+            value = rectified_samples[chn_idx, i]
+            if value > level:
+                coefficient = attack_coefficient
+            else:
+                coefficient = release_coefficient
+            level = coefficient * level + (1.0 - coefficient) * value
+            envelope[chn_idx, i] = level
+    return envelope
+
 
 class DynamicRangeAugment(BaseWaveformTransform):
-    def __init__(self, threshold=0.5, ratio=2.0, mode='compress', p=1.0):
+    supports_multichannel = True
+    supports_inplace = True
+
+    def __init__(
+        self,
+        threshold=0.5,
+        ratio=2.0,
+        mode='compress',
+        attack_ms=0.0,
+        release_ms=0.0,
+        p=1.0,
+    ):
         """
         Initialize dynamic range augmentation.
-        
+
         Parameters:
             threshold (float): The amplitude threshold above which dynamic range is adjusted.
             ratio (float): Compression (ratio > 1) or expansion factor.
             mode (str): Either 'compress' or 'expand'.
+            attack_ms (float): Attack time of the envelope follower in milliseconds.
+            release_ms (float): Release time of the envelope follower in milliseconds.
+                If both attack_ms and release_ms are 0, each sample is processed based on
+                its own amplitude, without envelope smoothing.
             p (float): Probability of applying this augmentation.
         """
         super().__init__(p=p)
+        if mode not in ('compress', 'expand'):
+            raise ValueError("mode must be either 'compress' or 'expand'")
+        if attack_ms < 0 or release_ms < 0:
+            raise ValueError("attack_ms and release_ms must not be negative")
         self.threshold = threshold
         self.ratio = ratio
         self.mode = mode
+        self.attack_ms = attack_ms
+        self.release_ms = release_ms
 
-    def apply(self, input_samples, sample_rate):
+    def _get_smoothing_coefficient(self, time_ms, sample_rate):
+        if time_ms == 0:
+            return 0.0
+        return float(np.exp(-1.0 / (time_ms * 0.001 * sample_rate)))
+
+    def _map_level(self, level):
+        excess = level - self.threshold
+        if self.mode == 'compress':
+            return self.threshold + excess / self.ratio
+        return self.threshold + excess * self.ratio
+
+    def apply(self, input_samples, sample_rate, out=None):
         """
         Apply dynamic range compression or expansion.
-        
+
         Parameters:
-            input_samples (np.ndarray): Input audio waveform.
-            sample_rate (int): Sample rate (unused, included for interface consistency).
-        
+            input_samples (np.ndarray): Input audio waveform, mono or (channels, samples).
+            sample_rate (int): Sample rate, used for the attack and release times.
+            out (np.ndarray): Optional array to write the result into. May be input_samples.
+
         Returns:
             np.ndarray: Audio after dynamic range processing.
         """
-        output = np.copy(input_samples)
-        # Process sample-wise (a simplified approach)
-        for i in range(len(output)):
-            abs_val = abs(output[i])
-            if abs_val > self.threshold:
-                excess = abs_val - self.threshold
-                if self.mode == 'compress':
-                    output[i] = np.sign(output[i]) * (self.threshold + excess / self.ratio)
-                elif self.mode == 'expand':
-                    output[i] = np.sign(output[i]) * (self.threshold + excess * self.ratio)
+        rectified_samples = np.abs(input_samples)
+
+        if self.attack_ms == 0 and self.release_ms == 0:
+            # Each sample above the threshold gets its amplitude mapped directly
+            is_above_threshold = rectified_samples > self.threshold
+            mapped_samples = np.copysign(
+                self._map_level(rectified_samples), input_samples
+            )
+            output = get_writable_copy(input_samples, out)
+            np.copyto(output, mapped_samples, where=is_above_threshold)
+        else:
+            envelope = _follow_envelope(
+                rectified_samples.reshape((-1, rectified_samples.shape[-1])),
+                self._get_smoothing_coefficient(self.attack_ms, sample_rate),
+                self._get_smoothing_coefficient(self.release_ms, sample_rate),
+            ).reshape(input_samples.shape)
+            # Apply the gain that maps the envelope level to the target level
+            gain = np.ones_like(envelope)
+            is_above_threshold = envelope > self.threshold
+            np.divide(
+                self._map_level(envelope), envelope, out=gain, where=is_above_threshold
+            )
+            output = np.multiply(input_samples, gain, out=out)
+
         # Clip to [-1, 1] range
-        output = np.clip(output, -1.0, 1.0)
+        np.clip(output, -1.0, 1.0, out=output)
         return output
@@ -18,6 +18,8 @@ class GainAugment(BaseWaveformTransform):
     """
 
     supports_multichannel = True
+    supports_inplace = True
+    supports_streaming = True
 
     def __init__(
         self,
@@ -44,5 +46,10 @@ class GainAugment(BaseWaveformTransform):
                 random.uniform(self.min_gain_db, self.max_gain_db)
             )
 
-    def apply(self, input_samples: NDArray[np.float32], sample_rate: int) -> NDArray[np.float32]:
-        return input_samples * self.parameters["amplitude_ratio"]
+    def apply(
+        self, input_samples: NDArray[np.float32], sample_rate: int, out=None
+    ) -> NDArray[np.float32]:
+        return np.multiply(input_samples, self.parameters["amplitude_ratio"], out=out)
+
+    def apply_chunk(self, chunk: NDArray[np.float32], state: dict) -> NDArray[np.float32]:
+        return np.multiply(chunk, self.parameters["amplitude_ratio"])
@@ -5,7 +5,7 @@ import numpy as np
 from numpy.typing import NDArray
 
 from CLAPForge.core.transforms_interface import BaseWaveformTransform
-from CLAPForge.core.utils import convert_decibels_to_amplitude_ratio
+from CLAPForge.core.utils import convert_decibels_to_amplitude_ratio, get_writable_copy
 
 
 def get_fade_mask(
@@ -45,6 +45,7 @@ class GainTransitionAugment(BaseWaveformTransform):
     """
 
     supports_multichannel = True
+    supports_inplace = True
 
     def __init__(
         self,
@@ -114,7 +115,9 @@ class GainTransitionAugment(BaseWaveformTransform):
                 self.min_gain_db, self.max_gain_db
             )
 
-    def apply(self, input_samples: NDArray[np.float32], sample_rate: int) -> NDArray[np.float32]:
+    def apply(
+        self, input_samples: NDArray[np.float32], sample_rate: int, out=None
+    ) -> NDArray[np.float32]:
         num_samples = input_samples.shape[-1]
         fade_mask = get_fade_mask(
             start_level_db=self.parameters["start_gain_db"],
@@ -135,7 +138,7 @@ class GainTransitionAugment(BaseWaveformTransform):
             fade_mask = fade_mask[: fade_mask.shape[-1] - num_samples_to_shave_off]
             end_sample_index = num_samples
 
-        input_samples = np.copy(input_samples)
+        input_samples = get_writable_copy(input_samples, out)
 
         input_samples[..., start_sample_index:end_sample_index] *= fade_mask
         if start_sample_index > 0:
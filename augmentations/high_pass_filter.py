@@ -1,3 +1,5 @@
+from typing import Optional
+
 from CLAPForge.augmentations.base_butterword_filter import BaseButterworthFilter
 
 
@@ -16,6 +18,8 @@ class HighPassFilterAugment(BaseButterworthFilter):
         min_rolloff: int = 12,
         max_rolloff: int = 24,
         zero_phase: bool = False,
+        cutoff_freq_grid: Optional[str] = None,
+        cutoff_freq_grid_step: float = 10.0,
         p: float = 0.5,
     ):
         """
@@ -32,6 +36,10 @@ class HighPassFilterAugment(BaseButterworthFilter):
             it is twice as slow as the non-zero phase case. If you
             absolutely want no phase distortions (e.g. want to augment a
             drum track), set this to `True`.
+        :param cutoff_freq_grid: None, "hz" or "mel". If given, the critical frequencies
+            of the filter are snapped to a grid in this unit before the filter is
+            designed, so that more filter designs can be reused from the cache.
+        :param cutoff_freq_grid_step: The spacing of the grid, in hertz or mels
         :param p: The probability of applying this transform
         """
         if min_cutoff_freq <= 0:
@@ -44,6 +52,8 @@ class HighPassFilterAugment(BaseButterworthFilter):
             min_rolloff=min_rolloff,
             max_rolloff=max_rolloff,
             zero_phase=zero_phase,
+            cutoff_freq_grid=cutoff_freq_grid,
+            cutoff_freq_grid_step=cutoff_freq_grid_step,
             p=p,
             filter_type="highpass",
         )
@@ -2,8 +2,8 @@ import random
 
 import numpy as np
 from numpy.typing import NDArray
-from scipy.signal import sosfilt, sosfilt_zi
 
+from CLAPForge.core.filter_utils import sosfilt_from_steady_state
 from CLAPForge.core.transforms_interface import BaseWaveformTransform
 from CLAPForge.core.utils import (
     convert_frequency_to_mel,
@@ -21,6 +21,8 @@ class HighShelfFilterAugment(BaseWaveformTransform):
     """
 
     supports_multichannel = True
+    supports_sos_fusion = True
+    supports_streaming = True
 
     def __init__(
         self,
@@ -116,7 +118,7 @@ class HighShelfFilterAugment(BaseWaveformTransform):
         self.parameters["gain_db"] = random.uniform(self.min_gain_db, self.max_gain_db)
         self.parameters["q_factor"] = random.uniform(self.min_q, self.max_q)
 
-    def apply(self, input_samples: NDArray[np.float32], sample_rate: int) -> NDArray[np.float32]:
+    def get_sos(self, sample_rate: int) -> NDArray[np.float64]:
         nyquist_freq = sample_rate // 2
         center_freq = self.parameters["center_freq"]
         if center_freq > nyquist_freq:
@@ -124,23 +126,12 @@ class HighShelfFilterAugment(BaseWaveformTransform):
             # frequency to avoid filter instability
             center_freq = nyquist_freq * 0.9999
 
-        sos = self._get_biquad_coefficients_from_input_parameters(
+        return self._get_biquad_coefficients_from_input_parameters(
             center_freq,
             self.parameters["gain_db"],
             self.parameters["q_factor"],
             sample_rate,
         )
 
-        # The processing takes place here
-        zi = sosfilt_zi(sos)
-        if len(input_samples.shape) == 1:
-            processed_samples, _ = sosfilt(sos, input_samples, zi=zi * input_samples[0])
-            processed_samples = processed_samples.astype(np.float32)
-        else:
-            processed_samples = np.zeros_like(input_samples, dtype=np.float32)
-            for chn_idx in range(input_samples.shape[0]):
-                processed_samples[chn_idx, :], _ = sosfilt(
-                    sos, input_samples[chn_idx, :], zi=zi * input_samples[chn_idx, 0]
-                )
-
-        return processed_samples
+    def apply(self, input_samples: NDArray[np.float32], sample_rate: int) -> NDArray[np.float32]:
+        return sosfilt_from_steady_state(self.get_sos(sample_rate), input_samples)
@@ -1,8 +1,8 @@
 import math
 import random
-import sys
 
 import numpy as np
+from numba import njit
 from numpy.typing import NDArray
 
 from CLAPForge.core.transforms_interface import BaseWaveformTransform
@@ -12,12 +12,63 @@ from CLAPForge.core.utils import (
 )
 
 
+@njit(cache=True)
+def _limit(
+    samples,
+    out,
+    num_steps,
+    num_skipped_samples,
+    delay_lines,
+    envelopes,
+    gains,
+    delay_index,
+    attack,
+    release,
+    threshold,
+):
+    """
+    Lookahead limiter that runs along the last axis of a 2D (rows, samples) array. It
+    follows the algorithm of cylimiter: a peak envelope with instant attack and
+    exponential release sets a target gain, the gain moves towards it with the attack
+    coefficient, and it is applied to the signal delayed by the length of the delay line
+    minus one.
+
+    Each of the num_steps steps consumes one input sample (zero past the end of
+    samples), and its output is written to out[:, step - num_skipped_samples] when that
+    index is not negative. Writing never gets ahead of reading, so out may be samples
+    itself. The delay lines, envelopes and gains are updated in place, and the new
+    position in the delay lines is returned.
+    """
+    delay = delay_lines.shape[1]
+    num_input_samples = samples.shape[1]
+    for row_idx in range(samples.shape[0]):
+        delay_line = delay_lines[row_idx]
+        envelope = envelopes[row_idx]
+        gain = gains[row_idx]
+        index = delay_index
+        for step in range(num_steps):
+            sample = samples[row_idx, step] if step < num_input_samples else 0.0
+            delay_line[index] = sample
+            index += 1
+            if index == delay:
+                index = 0
+            envelope = max(abs(sample), envelope * release)
+            target_gain = threshold / envelope if envelope > threshold else 1.0
+            gain = gain * attack + target_gain * (1.0 - attack)
+            if step >= num_skipped_samples:
+                out[row_idx, step - num_skipped_samples] = delay_line[index] * gain
+        envelopes[row_idx] = envelope
+        gains[row_idx] = gain
+    return (delay_index + num_steps) % delay
+
+
 class LimiterAugment(BaseWaveformTransform):
     """
     A simple audio limiter (dynamic range compression).
     """
 
     supports_multichannel = True
+    supports_inplace = True
 
     def __init__(
         self,
@@ -110,45 +161,116 @@ class LimiterAugment(BaseWaveformTransform):
                 "threshold"
             ] = threshold_factor * convert_decibels_to_amplitude_ratio(threshold_db)
 
-    def apply(self, input_samples: NDArray[np.float32], sample_rate: int) -> NDArray[np.float32]:
+    @property
+    def supports_streaming(self):
+        # A threshold relative to the signal peak needs the whole signal up front
+        return self.threshold_mode == "absolute"
+
+    def create_limiter_state(self, num_rows: int) -> dict:
+        """
+        Create the state of the limiter for num_rows independent rows (channels or
+        batch items): a delay line, an envelope and a gain per row, and the shared
+        position in the delay lines.
+        """
+        return {
+            "delay_lines": np.zeros(
+                (num_rows, self.parameters["delay"]), dtype=np.float32
+            ),
+            "envelopes": np.zeros(num_rows, dtype=np.float32),
+            "gains": np.ones(num_rows, dtype=np.float32),
+            "delay_index": 0,
+        }
+
+    def run_limiter(
+        self,
+        rows: NDArray[np.float32],
+        out: NDArray[np.float32],
+        num_steps: int,
+        num_skipped_samples: int,
+        limiter_state: dict,
+    ):
+        limiter_state["delay_index"] = _limit(
+            rows,
+            out,
+            num_steps,
+            num_skipped_samples,
+            limiter_state["delay_lines"],
+            limiter_state["envelopes"],
+            limiter_state["gains"],
+            limiter_state["delay_index"],
+            self.parameters["attack"],
+            self.parameters["release"],
+            self.parameters["threshold"],
+        )
+
+    def apply(
+        self, input_samples: NDArray[np.float32], sample_rate: int, out=None
+    ) -> NDArray[np.float32]:
         if self.parameters["threshold"] == 0.0:
             # Digital silence input can cause this to happen
             return input_samples
-        try:
-            from cylimiter import LimiterAugment as CyLimiter
-        except ImportError:
-            print(
-                "Failed to import cylimiter. Maybe it is not installed? "
-                "To install the optional cylimiter dependency of CLAPForge,"
-                " run `pip install cylimiter` or `pip install CLAPForge[extras]`",
-                file=sys.stderr,
-            )
-            raise
 
-        limiter = CyLimiter(
-            attack=self.parameters["attack"],
-            release=self.parameters["release"],
-            delay=self.parameters["delay"],
-            threshold=self.parameters["threshold"],
+        # All channels (and batch items) run through the limiter in one call. By
+        # default, there is no interchannel linking, so each row is limited on its own.
+        # The kernel feeds delay - 1 zeros after the end of the input and drops the
+        # first delay - 1 output samples, so no padded copy of the input is needed.
+        if out is None:
+            out = np.empty_like(input_samples, dtype=np.float32)
+        num_samples = input_samples.shape[-1]
+        rows = input_samples.reshape((-1, num_samples))
+        # Reshaping a non-contiguous out (e.g. a strided view) would give a copy, so the
+        # kernel writes into a contiguous array that gets copied into out afterwards
+        if out.flags.c_contiguous:
+            out_rows = out.reshape((-1, num_samples))
+        else:
+            out_rows = np.empty(rows.shape, dtype=np.float32)
+        delay = self.parameters["delay"]
+        self.run_limiter(
+            rows,
+            out_rows,
+            num_samples + delay - 1,
+            delay - 1,
+            self.create_limiter_state(rows.shape[0]),
         )
+        if not out.flags.c_contiguous:
+            np.copyto(out, out_rows.reshape(out.shape))
+        return out
 
-        if input_samples.ndim == 1:
-            processed_samples = np.pad(input_samples, (0, self.parameters["delay"]))
-            limiter.limit_inplace(processed_samples)
-            processed_samples = processed_samples[self.parameters["delay"] - 1 : -1]
-        else:
-            # By default, there is no interchannel linking. The channels are processed
-            # independently. Support for linking may be added in the future:
-            # https://github.com/pzelasko/cylimiter/issues/4
-            processed_samples = np.copy(input_samples)
-            for chn_idx in range(input_samples.shape[0]):
-                limiter.reset()
-                channel = np.ascontiguousarray(
-                    np.pad(processed_samples[chn_idx, :], (0, self.parameters["delay"]))
-                )
-                limiter.limit_inplace(channel)
-                processed_samples[chn_idx, :] = channel[
-                    self.parameters["delay"] - 1 : -1
-                ]
-
-        return processed_samples
+    def apply_chunk(self, chunk: NDArray[np.float32], state: dict) -> NDArray[np.float32]:
+        rows = np.atleast_2d(chunk)
+        if "limiter_state" not in state:
+            # The channels are processed independently, each with its own state
+            state["limiter_state"] = self.create_limiter_state(rows.shape[0])
+            state["is_mono"] = chunk.ndim == 1
+            # The limiter delays the signal by delay - 1 samples, which get dropped
+            state["num_samples_to_skip"] = self.parameters["delay"] - 1
+        processed_chunk = np.empty(rows.shape, dtype=np.float32)
+        self.run_limiter(
+            rows, processed_chunk, rows.shape[1], 0, state["limiter_state"]
+        )
+        return self.drop_skipped_samples(processed_chunk, state)
+
+    def flush_stream(self, state: dict) -> NDArray[np.float32]:
+        if "limiter_state" not in state:
+            return None
+        # Push delay - 1 zeros through the limiter to get the delayed samples out. Like
+        # in apply(), the output of a last zero would not be used.
+        limiter_state = state["limiter_state"]
+        num_rows = limiter_state["envelopes"].shape[0]
+        num_tail_samples = self.parameters["delay"] - 1
+        processed_tail = np.empty((num_rows, num_tail_samples), dtype=np.float32)
+        self.run_limiter(
+            np.zeros((num_rows, 0), dtype=np.float32),
+            processed_tail,
+            num_tail_samples,
+            0,
+            limiter_state,
+        )
+        return self.drop_skipped_samples(processed_tail, state)
+
+    @staticmethod
+    def drop_skipped_samples(processed_chunk: NDArray[np.float32], state: dict):
+        num_skipped_samples = min(state["num_samples_to_skip"], processed_chunk.shape[1])
+        state["num_samples_to_skip"] -= num_skipped_samples
+        processed_chunk = processed_chunk[:, num_skipped_samples:]
+        return processed_chunk[0] if state["is_mono"] else processed_chunk
@@ -1,16 +1,18 @@
 import random
-import sys
 
 import numpy as np
 from numpy.typing import NDArray
 
+from CLAPForge.core.loudness import calculate_integrated_loudness
 from CLAPForge.core.transforms_interface import BaseWaveformTransform
+from CLAPForge.core.utils import convert_decibels_to_amplitude_ratio
 
 
 class LoudnessNormAugment(BaseWaveformTransform):
     """
     Apply a constant amount of gain to match a specific loudness (in LUFS). This is an
-    implementation of ITU-R BS.1770-4.
+    implementation of ITU-R BS.1770-4. The loudness is measured with the built-in meter in
+    CLAPForge.core.loudness, which gives the same results as pyloudnorm.
 
     For an explanation on LUFS, see https://en.wikipedia.org/wiki/LUFS
 
@@ -40,51 +42,21 @@ class LoudnessNormAugment(BaseWaveformTransform):
         self.max_lufs = max_lufs
 
     def randomize_parameters(self, input_samples: NDArray[np.float32], sample_rate: int):
-        try:
-            import pyloudnorm
-        except ImportError:
-            print(
-                (
-                    "Failed to import pyloudnorm. Maybe it is not installed? "
-                    "To install the optional pyloudnorm dependency of CLAPForge,"
-                    " do `pip install CLAPForge[extras]` or simply "
-                    " `pip install pyloudnorm`"
-                ),
-                file=sys.stderr,
-            )
-            raise
-
         super().randomize_parameters(input_samples, sample_rate)
         if self.parameters["should_apply"]:
-            meter = pyloudnorm.Meter(sample_rate)  # create BS.1770 meter
-            # Transpose because pyloudnorm expects shape like (smp, chn), not (chn, smp)
-            self.parameters["loudness"] = meter.integrated_loudness(input_samples.transpose())
+            self.parameters["loudness"] = calculate_integrated_loudness(
+                input_samples, sample_rate
+            )
             self.parameters["lufs"] = float(
                 random.uniform(self.min_lufs, self.max_lufs)
             )
 
     def apply(self, input_samples: NDArray[np.float32], sample_rate: int) -> NDArray[np.float32]:
-        try:
-            import pyloudnorm
-        except ImportError:
-            print(
-                (
-                    "Failed to import pyloudnorm. Maybe it is not installed? "
-                    "To install the optional pyloudnorm dependency of CLAPForge,"
-                    " do `pip install CLAPForge[extras]` or simply "
-                    " `pip install pyloudnorm`"
-                ),
-                file=sys.stderr,
-            )
-            raise
-
         # Guard against digital silence
         if self.parameters["loudness"] > float("-inf"):
-            # Transpose because pyloudnorm expects shape like (smp, chn), not (chn, smp)
-            return pyloudnorm.normalize.loudness(
-                input_samples.transpose(),
-                self.parameters["loudness"],
-                self.parameters["lufs"],
-            ).transpose()
+            gain = convert_decibels_to_amplitude_ratio(
+                self.parameters["lufs"] - self.parameters["loudness"]
+            )
+            return input_samples * np.float32(gain)
         else:
             return input_samples
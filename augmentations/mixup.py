@@ -1,4 +1,5 @@
-import torch
+import sys
+
 import numpy as np
 from CLAPForge.core.transforms_interface import BaseWaveformTransform
 
@@ -35,6 +36,17 @@ class MixupAugment(BaseWaveformTransform):
         original_melspecs = input_dict["melspecs"]
         original_labels = input_dict["labels"]
         
+        try:
+            import torch
+        except ImportError:
+            print(
+                "Failed to import torch. Maybe it is not installed? MixupAugment"
+                " needs the optional torch dependency, which can be installed with"
+                " `pip install torch`",
+                file=sys.stderr,
+            )
+            raise
+
         # Generate a random permutation of the batch indices.
         indices = torch.randperm(original_melspecs.size(0))
         
@@ -1,13 +1,12 @@
-import os
+import functools
 import random
-import tempfile
-import uuid
+import subprocess
 
-import librosa
 import numpy as np
 import sys
 from numpy.typing import NDArray
 
+from CLAPForge.core.audio_loading_utils import decode_sound_bytes
 from CLAPForge.core.transforms_interface import BaseWaveformTransform
 from CLAPForge.core.utils import (
     convert_float_samples_to_int16,
@@ -15,6 +14,79 @@ from CLAPForge.core.utils import (
 )
 
 
+def encode_mp3_with_ffmpeg(
+    converter: str,
+    int_samples: NDArray[np.int16],
+    sample_rate: int,
+    num_channels: int,
+    bitrate: int,
+) -> bytes:
+    """
+    Encode int16 PCM samples, interleaved with shape (samples, channels) or (samples,),
+    to MP3 with the given ffmpeg (or avconv) binary. The raw PCM data is piped straight
+    into it, and the MP3 data is read back from a pipe.
+    """
+    command = [
+        converter,
+        "-loglevel",
+        "error",
+        "-f",
+        "s16le",
+        "-ar",
+        str(sample_rate),
+        "-ac",
+        str(num_channels),
+        "-i",
+        "pipe:0",
+        "-f",
+        "mp3",
+        "-b:a",
+        "{}k".format(bitrate),
+        "pipe:1",
+    ]
+    process = subprocess.run(
+        command,
+        input=np.ascontiguousarray(int_samples).tobytes(),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    if process.returncode != 0:
+        raise RuntimeError(
+            "Encoding to MP3 with {} failed: {}".format(
+                command[0], process.stderr.decode(errors="replace")
+            )
+        )
+    return process.stdout
+
+
+@functools.lru_cache(maxsize=None)
+def measure_ffmpeg_mp3_delay(converter: str, sample_rate: int, bitrate: int) -> int:
+    """
+    Return the number of samples of priming silence at the start of MP3 audio encoded
+    with encode_mp3_with_ffmpeg and decoded with decode_sound_bytes. When ffmpeg writes
+    to a file, it stores the encoder delay in the LAME header so decoders can drop it,
+    but that header can't be written to a pipe, so the delay has to be trimmed manually.
+
+    The delay (typically 1105 samples: the LAME encoder delay of 576 plus the decoder
+    delay of 529) is measured once per converter, sample rate and bitrate, by
+    cross-correlating a burst of noise with its decoded version, like
+    CLAPForge.core.ffmpeg_utils.FFmpegCodecWorker does.
+    """
+    from scipy.signal import correlate
+
+    max_delay = sample_rate // 4
+    num_samples = sample_rate // 2
+    noise = np.random.RandomState(42).uniform(-0.5, 0.5, num_samples).astype(np.float32)
+    mp3_data = encode_mp3_with_ffmpeg(
+        converter, convert_float_samples_to_int16(noise), sample_rate, 1, bitrate
+    )
+    decoded = np.ravel(decode_sound_bytes(mp3_data, sample_rate))
+    correlation = correlate(decoded, noise, mode="full", method="fft")
+    lags = np.arange(-num_samples + 1, decoded.shape[0])
+    is_candidate = (lags >= 0) & (lags <= max_delay)
+    return int(lags[is_candidate][np.argmax(correlation[is_candidate])])
+
+
 class MP3CompressionAugment(BaseWaveformTransform):
     """Compress the audio using an MP3 encoder to lower the audio quality.
     This may help machine learning models deal with compressed, low-quality audio.
@@ -26,8 +98,9 @@ class MP3CompressionAugment(BaseWaveformTransform):
     Note: When using the lameenc backend, the output may be slightly longer than the input due
     to the fact that the LAME encoder inserts some silence at the beginning of the audio.
 
-    Warning: This transform writes to disk, so it may be slow. Ideally, the work should be done
-    in memory. Contributions are welcome.
+    The encoding and decoding happen in memory: the MP3 data is decoded from a byte buffer
+    with libsndfile (via soundfile), and the pydub backend talks to ffmpeg through pipes.
+    Nothing is written to disk.
     """
 
     supports_multichannel = True
@@ -177,17 +250,7 @@ class MP3CompressionAugment(BaseWaveformTransform):
         mp3_data = encoder.encode(int_samples.tobytes())
         mp3_data += encoder.flush()
 
-        # Write a temporary MP3 file that will then be decoded
-        tmp_dir = tempfile.gettempdir()
-        tmp_file_path = os.path.join(
-            tmp_dir, "tmp_compressed_{}.mp3".format(str(uuid.uuid4())[0:12])
-        )
-        with open(tmp_file_path, "wb") as f:
-            f.write(mp3_data)
-
-        degraded_samples, _ = librosa.load(tmp_file_path, sr=sample_rate, mono=False)
-
-        os.unlink(tmp_file_path)
+        degraded_samples = decode_sound_bytes(bytes(mp3_data), sample_rate)
 
         degraded_samples = self.maybe_post_gain(degraded_samples)
 
@@ -222,25 +285,20 @@ class MP3CompressionAugment(BaseWaveformTransform):
 
         int_samples = convert_float_samples_to_int16(input_samples).T
         num_channels = 1 if input_samples.ndim == 1 else input_samples.shape[0]
-        audio_segment = pydub.AudioSegment(
-            int_samples.tobytes(),
-            frame_rate=sample_rate,
-            sample_width=int_samples.dtype.itemsize,
-            channels=num_channels,
-        )
 
-        tmp_dir = tempfile.gettempdir()
-        tmp_file_path = os.path.join(
-            tmp_dir, "tmp_compressed_{}.mp3".format(str(uuid.uuid4())[0:12])
+        # AudioSegment.export goes through temporary files, so the raw PCM data is piped
+        # straight into the ffmpeg (or avconv) binary that pydub is configured to use
+        converter = pydub.AudioSegment.converter
+        mp3_data = encode_mp3_with_ffmpeg(
+            converter, int_samples, sample_rate, num_channels, self.parameters["bitrate"]
         )
 
-        bitrate_string = "{}k".format(self.parameters["bitrate"])
-        file_handle = audio_segment.export(tmp_file_path, bitrate=bitrate_string)
-        file_handle.close()
-
-        degraded_samples, _ = librosa.load(tmp_file_path, sr=sample_rate, mono=False)
-
-        os.unlink(tmp_file_path)
+        degraded_samples = decode_sound_bytes(mp3_data, sample_rate)
+        delay = measure_ffmpeg_mp3_delay(
+            converter, sample_rate, self.parameters["bitrate"]
+        )
+        num_samples = input_samples.shape[-1]
+        degraded_samples = degraded_samples[..., delay : delay + num_samples]
 
         degraded_samples = self.maybe_post_gain(degraded_samples)
 
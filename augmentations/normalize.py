@@ -13,6 +13,7 @@ class NormalizeAugment(BaseWaveformTransform):
     """
 
     supports_multichannel = True
+    supports_inplace = True
 
     def __init__(self, apply_to: str = "all", p: float = 0.5):
         super().__init__(p)
@@ -24,7 +25,9 @@ class NormalizeAugment(BaseWaveformTransform):
         if self.parameters["should_apply"]:
             self.parameters["max_amplitude"] = get_max_abs_amplitude(input_samples)
 
-    def apply(self, input_samples: NDArray[np.float32], sample_rate: int) -> NDArray[np.float32]:
+    def apply(
+        self, input_samples: NDArray[np.float32], sample_rate: int, out=None
+    ) -> NDArray[np.float32]:
         if (
             self.apply_to == "only_too_loud_sounds"
             and self.parameters["max_amplitude"] < 1.0
@@ -32,6 +35,6 @@ class NormalizeAugment(BaseWaveformTransform):
             return input_samples
 
         if self.parameters["max_amplitude"] > 0:
-            return input_samples / self.parameters["max_amplitude"]
+            return np.divide(input_samples, self.parameters["max_amplitude"], out=out)
         else:
             return input_samples
@@ -1,4 +1,3 @@
-import python_stretch
 import random
 import warnings
 
@@ -6,11 +5,18 @@ import librosa
 import numpy as np
 from numpy.typing import NDArray
 
+from CLAPForge.core.stretch_utils import signalsmith_stretch
 from CLAPForge.core.transforms_interface import BaseWaveformTransform
 
 
 class PitchShiftAugment(BaseWaveformTransform):
-    """Pitch shift the sound up or down without changing the tempo"""
+    """
+    Pitch shift the sound up or down without changing the tempo.
+
+    With the "signalsmith_stretch" method, the stretchers are taken from a pool instead of
+    being set up for every call. In a compiled Compose, this transform and an adjacent
+    TimeStretchAugment share a single Signalsmith pass.
+    """
 
     supports_multichannel = True
 
@@ -52,21 +58,23 @@ class PitchShiftAugment(BaseWaveformTransform):
                 self.min_semitones, self.max_semitones
             )
 
+    @property
+    def supports_stretch_fusion(self):
+        return self.method == "signalsmith_stretch"
+
+    def get_stretch_settings(self) -> dict:
+        """Return the arguments for signalsmith_stretch() that this transform adds"""
+        return {"transpose_semitones": self.parameters["num_semitones"]}
+
     def apply(
         self, input_samples: NDArray[np.float32], sample_rate: int
     ) -> NDArray[np.float32]:
         if self.method == "signalsmith_stretch":
-            original_ndim = input_samples.ndim
-            if original_ndim == 1:
-                input_samples = input_samples[np.newaxis, :]
-
-            stretch = python_stretch.Signalsmith.Stretch()
-            stretch.preset(input_samples.shape[0], sample_rate)
-            stretch.setTransposeSemitones(self.parameters["num_semitones"])
-            input_samples = stretch.process(input_samples)
-            if input_samples.ndim > original_ndim:
-                input_samples = input_samples[0]
-            return input_samples
+            return signalsmith_stretch(
+                input_samples,
+                sample_rate,
+                transpose_semitones=self.parameters["num_semitones"],
+            )
 
         try:
             resample_type = (
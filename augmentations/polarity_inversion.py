@@ -16,6 +16,7 @@ class PolarityInvertAugment(BaseWaveformTransform):
     """
 
     supports_multichannel = True
+    supports_inplace = True
 
     def __init__(self, p: float = 0.5):
         """
@@ -26,5 +27,7 @@ class PolarityInvertAugment(BaseWaveformTransform):
     def randomize_parameters(self, input_samples: NDArray[np.float32], sample_rate: int):
         super().randomize_parameters(input_samples, sample_rate)
 
-    def apply(self, input_samples: NDArray[np.float32], sample_rate: int) -> NDArray[np.float32]:
-        return -input_samples
+    def apply(
+        self, input_samples: NDArray[np.float32], sample_rate: int, out=None
+    ) -> NDArray[np.float32]:
+        return np.negative(input_samples, out=out)
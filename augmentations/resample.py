@@ -1,47 +1,76 @@
 import random
 
-import librosa
 import numpy as np
 from numpy.typing import NDArray
 
+from CLAPForge.core.resampling import RESAMPLING_QUALITIES, SOXR_QUALITY, resample
 from CLAPForge.core.transforms_interface import BaseWaveformTransform
 
 
 class ResampleAugment(BaseWaveformTransform):
     """
-    ResampleAugment signal using librosa.core.resample
+    Resample the signal to a random sample rate (see CLAPForge.core.resampling.resample)
 
     To do downsampling only, set both minimum and maximum sampling rate lower than
     original sampling rate. Conversely, to perform upsampling only, set both rates higher than the original sampling
     rate.
+
+    The polyphase qualities cache a filter kernel per resampling ratio. To make the cache
+    hit, snap the random target sample rates to a grid with sample_rate_step, e.g.
+    `ResampleAugment(sample_rate_step=100, quality="medium")`.
     """
 
     supports_multichannel = True
 
     def __init__(
-        self, min_sample_rate: int = 8000, max_sample_rate: int = 44100, p: float = 0.5
+        self,
+        min_sample_rate: int = 8000,
+        max_sample_rate: int = 44100,
+        sample_rate_step: int = 1,
+        quality: str = SOXR_QUALITY,
+        p: float = 0.5,
     ):
         """
         :param min_sample_rate: The minimum sample rate
         :param max_sample_rate: The maximum sample rate
+        :param sample_rate_step: The target sample rate is picked from the multiples of
+            this value in the range [min_sample_rate, max_sample_rate]
+        :param quality: "fast", "medium" or "high" for the polyphase resampler with
+            cached kernels, or "soxr_hq" for libsoxr
         :param p: The probability of applying this transform
         """
         super().__init__(p)
         assert min_sample_rate <= max_sample_rate
+        assert sample_rate_step >= 1, "sample_rate_step must be a positive integer"
+        assert quality in RESAMPLING_QUALITIES, "quality must be one of " + ", ".join(
+            RESAMPLING_QUALITIES
+        )
         self.min_sample_rate = min_sample_rate
         self.max_sample_rate = max_sample_rate
+        self.sample_rate_step = sample_rate_step
+        self.quality = quality
+        self.min_target_sample_rate = sample_rate_step * -(
+            -min_sample_rate // sample_rate_step
+        )
+        if self.min_target_sample_rate > max_sample_rate:
+            raise ValueError(
+                "There is no multiple of sample_rate_step between min_sample_rate and"
+                " max_sample_rate"
+            )
 
     def randomize_parameters(self, input_samples: NDArray[np.float32], sample_rate: int):
         super().randomize_parameters(input_samples, sample_rate)
         if self.parameters["should_apply"]:
-            self.parameters["target_sample_rate"] = random.randint(
-                self.min_sample_rate, self.max_sample_rate
+            self.parameters["target_sample_rate"] = random.randrange(
+                self.min_target_sample_rate,
+                self.max_sample_rate + 1,
+                self.sample_rate_step,
             )
 
     def apply(self, input_samples: NDArray[np.float32], sample_rate: int) -> NDArray[np.float32]:
-        input_samples = librosa.core.resample(
+        return resample(
             input_samples,
-            orig_sr=sample_rate,
-            target_sr=self.parameters["target_sample_rate"],
+            sample_rate,
+            self.parameters["target_sample_rate"],
+            quality=self.quality,
         )
-        return input_samples
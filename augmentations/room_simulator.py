@@ -1,4 +1,7 @@
+import inspect
+import os
 import random
+from concurrent.futures import ProcessPoolExecutor
 from typing import Optional, Dict
 
 import numpy as np
@@ -9,6 +12,77 @@ from scipy.signal import convolve
 from CLAPForge.core.transforms_interface import BaseWaveformTransform
 
 
+def import_pyroomacoustics():
+    try:
+        import pyroomacoustics as pra
+    except ImportError:
+        print(
+            "Failed to import pyroomacoustics. Maybe it is not installed? "
+            "To install the optional pyroomacoustics dependency of CLAPForge,"
+            " do `pip install CLAPForge[extras]` or simply "
+            " `pip install pyroomacoustics`",
+            file=sys.stderr,
+        )
+        raise
+    return pra
+
+
+class RIRBank:
+    """
+    A set of precomputed room impulse responses, together with the room parameters they
+    were simulated with. See `generate_rir_bank` for how to create one.
+
+    The file is an .npz archive with the RIRs concatenated into one float32 array, an
+    array of offsets into it, a (num_rirs, num_parameters) array with the parameters of
+    each RIR, the parameter names and the sample rate.
+    """
+
+    def __init__(self, file_path):
+        with np.load(file_path) as data:
+            self.rirs = data["rirs"]
+            self.offsets = data["offsets"]
+            self.parameters = data["parameters"]
+            self.parameter_names = [str(name) for name in data["parameter_names"]]
+            self.sample_rate = int(data["sample_rate"])
+        self._kd_trees = {}
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def get_rir(self, index: int) -> NDArray[np.float32]:
+        return self.rirs[self.offsets[index] : self.offsets[index + 1]]
+
+    def get_parameters(self, index: int) -> dict:
+        return {
+            name: float(value)
+            for name, value in zip(self.parameter_names, self.parameters[index])
+        }
+
+    def find_nearest(self, parameters: dict) -> int:
+        """
+        Return the index of the RIR whose parameters are closest to the given ones. Only
+        the parameters that are stored in the bank are compared, each one normalized by
+        its standard deviation in the bank.
+        """
+        names = tuple(name for name in self.parameter_names if name in parameters)
+        if not names:
+            raise ValueError("None of the given parameters are stored in the RIR bank")
+        if names not in self._kd_trees:
+            from scipy.spatial import cKDTree
+
+            columns = [self.parameter_names.index(name) for name in names]
+            scale = np.std(self.parameters[:, columns], axis=0)
+            scale[scale == 0.0] = 1.0
+            self._kd_trees[names] = (
+                cKDTree(self.parameters[:, columns] / scale),
+                scale,
+            )
+        kd_tree, scale = self._kd_trees[names]
+        query = np.array([parameters[name] for name in names]) / scale
+        _, index = kd_tree.query(query)
+        return int(index)
+
+
 class RoomSimulateAugment(BaseWaveformTransform):
     """
     A ShoeBox Room Simulator. Simulates a cuboid of parametrized size and 
@@ -66,6 +140,8 @@ class RoomSimulateAugment(BaseWaveformTransform):
         padding: float = 0.1,
         p: float = 0.5,
         ray_tracing_options: Optional[Dict] = None,
+        rir_bank_path: Optional[str] = None,
+        rir_bank_selection: str = "random",
     ):
         """
 
@@ -123,6 +199,13 @@ class RoomSimulateAugment(BaseWaveformTransform):
         :param p: The probability of applying this transform
         :param ray_tracing_options: Options for the ray tracer. See `set_ray_tracing` here:
             https://github.com/LCAV/pyroomacoustics/blob/master/pyroomacoustics/room.py
+        :param rir_bank_path: Path to a file made with `generate_rir_bank`. If given, no
+            rooms get simulated at runtime. Instead, a precomputed room impulse response
+            is drawn from the bank and convolved with the audio, which is much faster.
+        :param rir_bank_selection: How RIRs are drawn from the bank. "random" picks any
+            RIR in the bank. "nearest" draws room parameters from the ranges given above,
+            like the simulation mode does, and picks the RIR with the most similar
+            parameters.
         """
         super().__init__(p)
 
@@ -188,160 +271,193 @@ class RoomSimulateAugment(BaseWaveformTransform):
         else:
             self.ray_tracing_options = ray_tracing_options
 
-    def randomize_parameters(self, input_samples: NDArray[np.float32], sample_rate: int):
-
-        try:
-            import pyroomacoustics as pra
-        except ImportError:
-            print(
-                "Failed to import pyroomacoustics. Maybe it is not installed? "
-                "To install the optional pyroomacoustics dependency of CLAPForge,"
-                " do `pip install CLAPForge[extras]` or simply "
-                " `pip install pyroomacoustics`",
-                file=sys.stderr,
-            )
-            raise
+        assert rir_bank_selection in [
+            "random",
+            "nearest",
+        ], "`rir_bank_selection` should either be `random` or `nearest`"
+        self.rir_bank_path = rir_bank_path
+        self.rir_bank_selection = rir_bank_selection
+        self.rir_bank = RIRBank(rir_bank_path) if rir_bank_path is not None else None
 
+    def randomize_parameters(self, input_samples: NDArray[np.float32], sample_rate: int):
         super().randomize_parameters(input_samples, sample_rate)
         if not self.parameters["should_apply"]:
             return
 
-        self.parameters["size_x"] = random.uniform(self.min_size_x, self.max_size_x)
-        self.parameters["size_y"] = random.uniform(self.min_size_y, self.max_size_y)
-        self.parameters["size_z"] = random.uniform(self.min_size_z, self.max_size_z)
+        if self.rir_bank is not None:
+            if sample_rate != self.rir_bank.sample_rate:
+                raise ValueError(
+                    "The RIR bank was generated for a sample rate of {} Hz, but the"
+                    " audio has a sample rate of {} Hz".format(
+                        self.rir_bank.sample_rate, sample_rate
+                    )
+                )
+            if self.rir_bank_selection == "nearest":
+                index = self.rir_bank.find_nearest(self.sample_room_parameters())
+            else:
+                index = random.randrange(len(self.rir_bank))
+            self.parameters.update(self.rir_bank.get_parameters(index))
+            self.parameters["rir_bank_index"] = index
+            self.rir = self.rir_bank.get_rir(index)
+            return
+
+        self.parameters.update(self.sample_room_parameters())
+        self.room = self.build_room(sample_rate, signal=input_samples)
+        # Do the simulation
+        self.room.compute_rir()
+        self.rir = self.room.rir[0][0]
+
+    def sample_room_parameters(self) -> dict:
+        """
+        Draw random room, source and microphone parameters from the configured ranges.
+        """
+        parameters = {}
+        parameters["size_x"] = random.uniform(self.min_size_x, self.max_size_x)
+        parameters["size_y"] = random.uniform(self.min_size_y, self.max_size_y)
+        parameters["size_z"] = random.uniform(self.min_size_z, self.max_size_z)
 
         room_dim = np.array(
             [
-                self.parameters["size_x"],
-                self.parameters["size_y"],
-                self.parameters["size_z"],
+                parameters["size_x"],
+                parameters["size_y"],
+                parameters["size_z"],
             ]
         )
 
-        self.parameters["max_order"] = self.max_order
+        parameters["max_order"] = self.max_order
 
         if self.calculation_mode == "rt60":
+            pra = import_pyroomacoustics()
             target_rt60 = random.uniform(self.min_target_rt60, self.max_target_rt60)
-            self.parameters["target_rt60"] = target_rt60
+            parameters["target_rt60"] = target_rt60
 
             # If we are in rt60 mode, estimate the absorption coefficient on a desired target
             # rt60 value.
-            self.parameters["absorption_coefficient"], max_order = pra.inverse_sabine(
-                self.parameters["target_rt60"], room_dim
+            parameters["absorption_coefficient"], max_order = pra.inverse_sabine(
+                parameters["target_rt60"], room_dim
             )
             
             # When `rt60` is specified, use max_order from sabine's formula
-            self.parameters["max_order"] = min(max_order,self.max_order)
+            parameters["max_order"] = min(max_order,self.max_order)
         else:
-            self.parameters["absorption_coefficient"] = random.uniform(
+            parameters["absorption_coefficient"] = random.uniform(
                 self.min_absorption_value, self.max_absorption_value
             )
 
-        self.parameters["source_x"] = random.uniform(
+        parameters["source_x"] = random.uniform(
             max(self.min_source_x, self.padding),
-            min(self.max_source_x, self.parameters["size_x"] - self.padding),
+            min(self.max_source_x, parameters["size_x"] - self.padding),
         )
-        self.parameters["source_y"] = random.uniform(
+        parameters["source_y"] = random.uniform(
             max(self.min_source_y, self.padding),
-            min(self.max_source_y, self.parameters["size_y"] - self.padding),
+            min(self.max_source_y, parameters["size_y"] - self.padding),
         )
-        self.parameters["source_z"] = random.uniform(
+        parameters["source_z"] = random.uniform(
             max(self.min_source_z, self.padding),
-            min(self.max_source_z, self.parameters["size_z"] - self.padding),
+            min(self.max_source_z, parameters["size_z"] - self.padding),
         )
 
-        self.parameters["mic_radius"] = random.uniform(
+        parameters["mic_radius"] = random.uniform(
             self.min_mic_distance, self.max_mic_distance
         )
-        self.parameters["mic_azimuth"] = random.uniform(
+        parameters["mic_azimuth"] = random.uniform(
             self.min_mic_azimuth, self.max_mic_azimuth
         )
-        self.parameters["mic_elevation"] = random.uniform(
+        parameters["mic_elevation"] = random.uniform(
             self.min_mic_elevation, self.max_mic_elevation
         )
 
         # Convert to cartesian coordinates according to ADM
-        mic_x = self.parameters["source_x"] - self.parameters["mic_radius"] * np.cos(
-            self.parameters["mic_elevation"]
-        ) * np.sin(self.parameters["mic_azimuth"])
-        mic_y = self.parameters["source_y"] + self.parameters["mic_radius"] * np.cos(
-            self.parameters["mic_elevation"]
-        ) * np.cos(self.parameters["mic_azimuth"])
-        mic_z = self.parameters["source_z"] + self.parameters["mic_radius"] * np.sin(
-            self.parameters["mic_elevation"]
+        mic_x = parameters["source_x"] - parameters["mic_radius"] * np.cos(
+            parameters["mic_elevation"]
+        ) * np.sin(parameters["mic_azimuth"])
+        mic_y = parameters["source_y"] + parameters["mic_radius"] * np.cos(
+            parameters["mic_elevation"]
+        ) * np.cos(parameters["mic_azimuth"])
+        mic_z = parameters["source_z"] + parameters["mic_radius"] * np.sin(
+            parameters["mic_elevation"]
         )
 
         # Clamp between 0 and room dimensions
-        self.parameters["mic_x"] = max(
-            self.padding, min(self.parameters["size_x"] - self.padding, mic_x)
+        parameters["mic_x"] = max(
+            self.padding, min(parameters["size_x"] - self.padding, mic_x)
         )
-        self.parameters["mic_y"] = max(
-            self.padding, min(self.parameters["size_y"] - self.padding, mic_y)
+        parameters["mic_y"] = max(
+            self.padding, min(parameters["size_y"] - self.padding, mic_y)
         )
-        self.parameters["mic_z"] = max(
-            self.padding, min(self.parameters["size_z"] - self.padding, mic_z)
+        parameters["mic_z"] = max(
+            self.padding, min(parameters["size_z"] - self.padding, mic_z)
         )
+        return parameters
+
+    def build_room(self, sample_rate: int, signal=None, parameters: dict = None):
+        """
+        Construct the pyroomacoustics room with the source and the microphone, based on
+        the given parameters (by default the current parameters of the transform).
+        """
+        pra = import_pyroomacoustics()
+        if parameters is None:
+            parameters = self.parameters
 
         # Construct room
-        self.room = pra.Room.from_corners(
+        room = pra.Room.from_corners(
             np.array(
                 [
                     [0, 0],
-                    [0, self.parameters["size_y"]],
-                    [self.parameters["size_x"], self.parameters["size_y"]],
-                    [self.parameters["size_x"], 0],
+                    [0, parameters["size_y"]],
+                    [parameters["size_x"], parameters["size_y"]],
+                    [parameters["size_x"], 0],
                 ]
             ).T,
             fs=sample_rate,
-            materials=pra.Material(self.parameters["absorption_coefficient"]),
+            materials=pra.Material(parameters["absorption_coefficient"]),
             ray_tracing=self.use_ray_tracing,
             air_absorption=True,
-            max_order=self.parameters["max_order"],
+            max_order=parameters["max_order"],
         )
 
         if self.use_ray_tracing:
             # TODO: Somehow make those parameters
-            self.room.set_ray_tracing(**self.ray_tracing_options)
+            room.set_ray_tracing(**self.ray_tracing_options)
 
-        self.room.extrude(
-            height=self.parameters["size_z"],
-            materials=pra.Material(self.parameters["absorption_coefficient"]),
+        room.extrude(
+            height=parameters["size_z"],
+            materials=pra.Material(parameters["absorption_coefficient"]),
         )
 
         # Add the point source
-        self.room.add_source(
+        room.add_source(
             np.array(
                 [
-                    self.parameters["source_x"],
-                    self.parameters["source_y"],
-                    self.parameters["source_z"],
+                    parameters["source_x"],
+                    parameters["source_y"],
+                    parameters["source_z"],
                 ]
             ),
-            signal=input_samples,
+            signal=signal,
         )
 
         # Add the microphone
-        self.room.add_microphone_array(
+        room.add_microphone_array(
             pra.MicrophoneArray(
                 np.array(
                     [
                         [
-                            self.parameters["mic_x"],
-                            self.parameters["mic_y"],
-                            self.parameters["mic_z"],
+                            parameters["mic_x"],
+                            parameters["mic_y"],
+                            parameters["mic_z"],
                         ]
                     ]
                 ).T,
-                self.room.fs,
+                room.fs,
             )
         )
-        # Do the simulation
-        self.room.compute_rir()
+        return room
 
     def apply(self, input_samples: NDArray[np.float32], sample_rate: int) -> NDArray[np.float32]:
         assert input_samples.dtype == np.float32
 
-        rir = self.room.rir[0][0]
+        rir = self.rir
 
         # This is the same as ImpulseResponseAugment transform
         if input_samples.ndim > 1:
@@ -356,3 +472,81 @@ class RoomSimulateAugment(BaseWaveformTransform):
         if self.leave_length_unchanged:
             signal_ir = signal_ir[..., : input_samples.shape[-1]]
         return signal_ir
+
+
+def _simulate_rir_bank_entry(args):
+    init_args, sample_rate, seed_sequence = args
+    python_seed, numpy_seed = seed_sequence.generate_state(2)
+    random.seed(int(python_seed))
+    np.random.seed(numpy_seed)
+    transform = RoomSimulateAugment(**init_args)
+    parameters = transform.sample_room_parameters()
+    room = transform.build_room(sample_rate, parameters=parameters)
+    room.compute_rir()
+    return parameters, np.asarray(room.rir[0][0], dtype=np.float32)
+
+
+def generate_rir_bank(
+    transform: RoomSimulateAugment,
+    output_path: str,
+    num_rirs: int,
+    sample_rate: int,
+    num_workers: Optional[int] = None,
+    seed: int = 0,
+):
+    """
+    Simulate room impulse responses with parameters drawn from the ranges of the given
+    RoomSimulateAugment, using a pool of processes, and store them in a file that
+    `RoomSimulateAugment(rir_bank_path=...)` can draw from at runtime.
+
+    Example:
+    ```
+    generate_rir_bank(RoomSimulateAugment(max_order=4), "rirs_16k.npz", 5000, 16000)
+    augment = RoomSimulateAugment(rir_bank_path="rirs_16k.npz", p=0.5)
+    ```
+
+    :param transform: The transform whose parameter ranges and simulation settings to use
+    :param output_path: Where to save the bank (.npz)
+    :param num_rirs: Number of room impulse responses to simulate
+    :param sample_rate: Sample rate of the room impulse responses
+    :param num_workers: Number of processes. By default, the number of CPUs.
+    :param seed: Seed for the random parameters. Each RIR gets its own independent seed
+        spawned from it with np.random.SeedSequence, so the result doesn't depend on the
+        number of workers, and banks built with different seeds don't share RIRs.
+    """
+    init_args = {
+        name: getattr(transform, name)
+        for name in inspect.signature(RoomSimulateAugment.__init__).parameters
+        if name not in ("self", "rir_bank_path", "rir_bank_selection")
+    }
+    jobs = [
+        (init_args, sample_rate, seed_sequence)
+        for seed_sequence in np.random.SeedSequence(seed).spawn(num_rirs)
+    ]
+    if num_workers is None:
+        num_workers = os.cpu_count() or 1
+
+    with ProcessPoolExecutor(max_workers=num_workers) as executor:
+        results = list(
+            executor.map(
+                _simulate_rir_bank_entry,
+                jobs,
+                chunksize=max(1, num_rirs // (num_workers * 4)),
+            )
+        )
+
+    parameter_names = sorted(results[0][0])
+    rirs = [rir for _, rir in results]
+    offsets = np.zeros(len(rirs) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(rir) for rir in rirs])
+    np.savez_compressed(
+        output_path,
+        rirs=np.concatenate(rirs),
+        offsets=offsets,
+        parameters=np.array(
+            [[parameters[name] for name in parameter_names] for parameters, _ in results],
+            dtype=np.float64,
+        ),
+        parameter_names=np.array(parameter_names),
+        sample_rate=np.array(sample_rate),
+    )
@@ -2,6 +2,7 @@ import numpy as np
 from numpy.typing import NDArray
 
 from CLAPForge import LowShelfFilterAugment, PeakingFilterAugment, HighShelfFilterAugment
+from CLAPForge.core.filter_utils import sosfilt_from_steady_state
 from CLAPForge.core.transforms_interface import BaseWaveformTransform
 
 
@@ -34,6 +35,8 @@ class SevenBandEQAugment(BaseWaveformTransform):
     """
 
     supports_multichannel = True
+    supports_sos_fusion = True
+    supports_streaming = True
 
     def __init__(
         self,
@@ -115,9 +118,14 @@ class SevenBandEQAugment(BaseWaveformTransform):
             self.peaking_filters[i].randomize_parameters(input_samples, sample_rate)
         self.high_shelf_filter.randomize_parameters(input_samples, sample_rate)
 
+    def get_sos(self, sample_rate: int) -> NDArray[np.float64]:
+        return np.concatenate(
+            [self.low_shelf_filter.get_sos(sample_rate)]
+            + [peaking_filter.get_sos(sample_rate) for peaking_filter in self.peaking_filters]
+            + [self.high_shelf_filter.get_sos(sample_rate)]
+        )
+
     def apply(self, input_samples: NDArray[np.float32], sample_rate: int) -> NDArray[np.float32]:
-        input_samples = self.low_shelf_filter(input_samples, sample_rate)
-        for i in range(len(self.peaking_filters)):
-            input_samples = self.peaking_filters[i](input_samples, sample_rate)
-        input_samples = self.high_shelf_filter(input_samples, sample_rate)
-        return input_samples
+        # The seven biquads are stacked into a single (7, 6) filter, so all bands and
+        # channels are done in one filter pass
+        return sosfilt_from_steady_state(self.get_sos(sample_rate), input_samples)
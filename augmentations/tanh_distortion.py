@@ -21,6 +21,7 @@ class TanhDistortionAugment(BaseWaveformTransform):
     """
 
     supports_multichannel = True
+    supports_inplace = True
 
     def __init__(
         self, min_distortion: float = 0.01, max_distortion: float = 0.7, p: float = 0.5
@@ -44,20 +45,25 @@ class TanhDistortionAugment(BaseWaveformTransform):
                 self.min_distortion, self.max_distortion
             )
 
-    def apply(self, input_samples: NDArray[np.float32], sample_rate: int) -> NDArray[np.float32]:
+    def apply(
+        self, input_samples: NDArray[np.float32], sample_rate: int, out=None
+    ) -> NDArray[np.float32]:
         # Find out how much to pre-gain the audio to get a given amount of distortion
         percentile = 100 - 99 * self.parameters["distortion_amount"]
         threshold = np.percentile(np.abs(input_samples), percentile)
         gain_factor = 0.5 / (threshold + 1e-6)
 
+        # Measure the input before `out` (which may be the input itself) gets overwritten
+        rms_before = calculate_rms(input_samples)
+
         # Distort the audio
-        distorted_samples = np.tanh(gain_factor * input_samples)
+        distorted_samples = np.multiply(gain_factor, input_samples, out=out)
+        np.tanh(distorted_samples, out=distorted_samples)
 
         # Scale the output so its loudness matches the input
-        rms_before = calculate_rms(input_samples)
         if rms_before > 1e-9:
             rms_after = calculate_rms(distorted_samples)
             post_gain = rms_before / rms_after
-            distorted_samples = post_gain * distorted_samples
+            np.multiply(post_gain, distorted_samples, out=distorted_samples)
 
         return distorted_samples
@@ -4,6 +4,7 @@ import numpy as np
 from numpy.typing import NDArray
 
 from CLAPForge.core.transforms_interface import BaseWaveformTransform
+from CLAPForge.core.utils import get_writable_copy
 
 
 class TimeMaskAugment(BaseWaveformTransform):
@@ -13,6 +14,7 @@ class TimeMaskAugment(BaseWaveformTransform):
     """
 
     supports_multichannel = True
+    supports_inplace = True
 
     def __init__(
         self,
@@ -54,8 +56,10 @@ class TimeMaskAugment(BaseWaveformTransform):
                 0, num_samples - self.parameters["t"]
             )
 
-    def apply(self, input_samples: NDArray[np.float32], sample_rate: int) -> NDArray[np.float32]:
-        new_samples = input_samples.copy()
+    def apply(
+        self, input_samples: NDArray[np.float32], sample_rate: int, out=None
+    ) -> NDArray[np.float32]:
+        new_samples = get_writable_copy(input_samples, out)
         t = self.parameters["t"]
         t0 = self.parameters["t0"]
         mask = np.zeros(t)
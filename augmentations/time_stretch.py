@@ -3,13 +3,20 @@ import random
 import librosa
 import numpy as np
 from numpy.typing import NDArray
-import python_stretch
 
+from CLAPForge.core.stretch_utils import signalsmith_stretch
 from CLAPForge.core.transforms_interface import BaseWaveformTransform
+from CLAPForge.core.utils import pad_or_crop
 
 
 class TimeStretchAugment(BaseWaveformTransform):
-    """Time stretch the signal without changing the pitch"""
+    """
+    Time stretch the signal without changing the pitch.
+
+    With the "signalsmith_stretch" method, the stretchers are taken from a pool instead of
+    being set up for every call. In a compiled Compose, this transform and an adjacent
+    PitchShiftAugment share a single Signalsmith pass.
+    """
 
     supports_multichannel = True
 
@@ -56,20 +63,19 @@ class TimeStretchAugment(BaseWaveformTransform):
             """
             self.parameters["rate"] = random.uniform(self.min_rate, self.max_rate)
 
-    def apply(self, input_samples: NDArray[np.float32], sample_rate: int) -> NDArray[np.float32]:
-        original_shape = input_samples.shape
-        if self.method == "signalsmith_stretch":
-            original_ndim = input_samples.ndim
-            if original_ndim == 1:
-                input_samples = input_samples[np.newaxis, :]
+    @property
+    def supports_stretch_fusion(self):
+        return self.method == "signalsmith_stretch"
 
-            stretch = python_stretch.Signalsmith.Stretch()
-            stretch.preset(input_samples.shape[0], sample_rate)
-            stretch.setTimeFactor(self.parameters["rate"])
-            time_stretched_samples = stretch.process(input_samples)
+    def get_stretch_settings(self) -> dict:
+        """Return the arguments for signalsmith_stretch() that this transform adds"""
+        return {"time_factor": self.parameters["rate"]}
 
-            if time_stretched_samples.ndim > original_ndim:
-                time_stretched_samples = time_stretched_samples[0]
+    def apply(self, input_samples: NDArray[np.float32], sample_rate: int) -> NDArray[np.float32]:
+        if self.method == "signalsmith_stretch":
+            time_stretched_samples = signalsmith_stretch(
+                input_samples, sample_rate, time_factor=self.parameters["rate"]
+            )
 
         else:  # method == "librosa_phase_vocoder"
             try:
@@ -93,10 +99,8 @@ class TimeStretchAugment(BaseWaveformTransform):
         if self.leave_length_unchanged:
             # Apply zero padding if the time stretched audio is not long enough to fill the
             # whole space, or crop the time stretched audio if it ended up too long.
-            padded_samples = np.zeros(shape=original_shape, dtype=input_samples.dtype)
-            window = time_stretched_samples[..., : input_samples.shape[-1]]
-            actual_window_length = window.shape[-1]
-            padded_samples[..., :actual_window_length] = window
-            time_stretched_samples = padded_samples
+            time_stretched_samples = pad_or_crop(
+                time_stretched_samples, input_samples.shape[-1]
+            )
 
         return time_stretched_samples
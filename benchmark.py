@@ -0,0 +1,367 @@
+import argparse
+import random
+import shutil
+import time
+
+import numpy as np
+
+# --------------------------
+# Reference implementations
+# --------------------------
+def dynamic_range_per_sample_loop(input_samples, threshold, ratio, mode):
+    """
+    The original per-sample Python loop of DynamicRangeAugment, kept as a baseline.
+    """
+    output = np.copy(input_samples)
+    for i in range(len(output)):
+        abs_val = abs(output[i])
+        if abs_val > threshold:
+            excess = abs_val - threshold
+            if mode == 'compress':
+                output[i] = np.sign(output[i]) * (threshold + excess / ratio)
+            elif mode == 'expand':
+                output[i] = np.sign(output[i]) * (threshold + excess * ratio)
+    return np.clip(output, -1.0, 1.0)
+
+
+def mp3_round_trip_via_temp_file(mp3_data, sample_rate):
+    """
+    The original way MP3CompressionAugment decoded MP3 data: write it to a temporary
+    file and load that with librosa.
+    """
+    import os
+    import tempfile
+    import uuid
+
+    import librosa
+
+    tmp_file_path = os.path.join(
+        tempfile.gettempdir(), "tmp_compressed_{}.mp3".format(str(uuid.uuid4())[0:12])
+    )
+    with open(tmp_file_path, "wb") as f:
+        f.write(mp3_data)
+    degraded_samples, _ = librosa.load(tmp_file_path, sr=sample_rate, mono=False)
+    os.unlink(tmp_file_path)
+    return degraded_samples
+
+
+def mp3_pydub_round_trip_via_temp_file(samples, sample_rate, bitrate):
+    """
+    The original pydub backend of MP3CompressionAugment: export an AudioSegment to a
+    temporary MP3 file with ffmpeg, and load that with librosa.
+    """
+    import os
+    import tempfile
+    import uuid
+
+    import librosa
+    import pydub
+
+    from CLAPForge.core.utils import convert_float_samples_to_int16
+
+    int_samples = convert_float_samples_to_int16(samples)
+    audio_segment = pydub.AudioSegment(
+        int_samples.tobytes(),
+        frame_rate=sample_rate,
+        sample_width=int_samples.dtype.itemsize,
+        channels=1,
+    )
+    tmp_file_path = os.path.join(
+        tempfile.gettempdir(), "tmp_compressed_{}.mp3".format(str(uuid.uuid4())[0:12])
+    )
+    audio_segment.export(tmp_file_path, bitrate="{}k".format(bitrate)).close()
+    degraded_samples, _ = librosa.load(tmp_file_path, sr=sample_rate, mono=False)
+    os.unlink(tmp_file_path)
+    return degraded_samples
+
+
+def codec_round_trip_with_new_processes(samples, sample_rate, codec, bitrate):
+    """
+    Encode and decode audio with a fresh ffmpeg process for each direction, which is
+    what a pydub-style codec backend does for every clip.
+    """
+    import subprocess
+
+    from CLAPForge.core.ffmpeg_utils import FFMPEG_CODECS, find_ffmpeg
+
+    ffmpeg_path = find_ffmpeg()
+    codec_spec = FFMPEG_CODECS[codec]
+    pcm_args = ["-f", "f32le", "-ar", str(sample_rate), "-ac", "1"]
+    encoded = subprocess.run(
+        [ffmpeg_path, "-loglevel", "error"]
+        + pcm_args
+        + ["-i", "pipe:0", "-c:a", codec_spec["encoder"], "-b:a", f"{bitrate}k"]
+        + codec_spec["args"]
+        + ["-f", codec_spec["muxer"], "pipe:1"],
+        input=samples.tobytes(),
+        stdout=subprocess.PIPE,
+        check=True,
+    ).stdout
+    decoded = subprocess.run(
+        [ffmpeg_path, "-loglevel", "error", "-i", "pipe:0"] + pcm_args + ["pipe:1"],
+        input=encoded,
+        stdout=subprocess.PIPE,
+        check=True,
+    ).stdout
+    return np.frombuffer(decoded, dtype=np.float32)
+
+
+def seven_band_eq_band_by_band(augment, samples, sample_rate):
+    """
+    The original SevenBandEQAugment.apply: one filter pass per band, each with its own
+    per-channel loop.
+    """
+    from scipy.signal import sosfilt, sosfilt_zi
+
+    bands = [augment.low_shelf_filter] + augment.peaking_filters + [augment.high_shelf_filter]
+    for band in bands:
+        sos = band.get_sos(sample_rate)
+        zi = sosfilt_zi(sos)
+        processed_samples = np.zeros_like(samples, dtype=np.float32)
+        for chn_idx in range(samples.shape[0]):
+            processed_samples[chn_idx, :], _ = sosfilt(
+                sos, samples[chn_idx, :], zi=zi * samples[chn_idx, 0]
+            )
+        samples = processed_samples
+    return samples
+
+
+# --------------------------
+# Timing Helper
+# --------------------------
+def time_call(func, repeats):
+    """
+    Returns the best wall clock time in seconds over a number of calls.
+    """
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def report(name, baseline_seconds, optimized_seconds):
+    print(
+        f"{name}: baseline {baseline_seconds * 1000:.1f} ms, "
+        f"optimized {optimized_seconds * 1000:.2f} ms, "
+        f"speedup {baseline_seconds / optimized_seconds:.1f}x"
+    )
+
+
+# --------------------------
+# Benchmarks
+# --------------------------
+def benchmark_dynamic_range(duration, sample_rate, repeats):
+    from CLAPForge.augmentations.dynamic_range_augment import DynamicRangeAugment
+
+    samples = np.random.uniform(-1.0, 1.0, int(duration * sample_rate)).astype(np.float32)
+    augment = DynamicRangeAugment(threshold=0.5, ratio=4.0, mode='compress', p=1.0)
+    baseline = time_call(
+        lambda: dynamic_range_per_sample_loop(samples, 0.5, 4.0, 'compress'), 1
+    )
+    report(
+        "DynamicRangeAugment",
+        baseline,
+        time_call(lambda: augment(samples, sample_rate), repeats),
+    )
+
+    smoothed_augment = DynamicRangeAugment(
+        threshold=0.5, ratio=4.0, attack_ms=5.0, release_ms=50.0, p=1.0
+    )
+    smoothed_augment(samples[:1024], sample_rate)  # compile the envelope follower
+    report(
+        "DynamicRangeAugment (attack/release)",
+        baseline,
+        time_call(lambda: smoothed_augment(samples, sample_rate), repeats),
+    )
+
+
+def benchmark_mp3_compression(duration, sample_rate, repeats):
+    import lameenc
+
+    from CLAPForge.augmentations.mp3_compression import MP3CompressionAugment
+    from CLAPForge.core.audio_loading_utils import decode_sound_bytes
+    from CLAPForge.core.utils import convert_float_samples_to_int16
+
+    samples = np.random.uniform(-0.5, 0.5, int(duration * sample_rate)).astype(np.float32)
+    encoder = lameenc.Encoder()
+    encoder.set_bit_rate(64)
+    encoder.set_in_sample_rate(sample_rate)
+    encoder.set_channels(1)
+    encoder.set_quality(7)
+    mp3_data = bytes(
+        encoder.encode(convert_float_samples_to_int16(samples).tobytes())
+        + encoder.flush()
+    )
+    report(
+        "MP3 decoding (temp file + librosa.load vs in memory)",
+        time_call(lambda: mp3_round_trip_via_temp_file(mp3_data, sample_rate), repeats),
+        time_call(lambda: decode_sound_bytes(mp3_data, sample_rate), repeats),
+    )
+
+    augment = MP3CompressionAugment(
+        min_bitrate=64, max_bitrate=64, backend="lameenc", p=1.0
+    )
+    seconds = time_call(lambda: augment(samples, sample_rate), repeats)
+    print(
+        f"MP3CompressionAugment (lameenc): {seconds * 1000:.1f} ms,"
+        f" {duration / seconds:.0f}x realtime"
+    )
+
+    if shutil.which("ffmpeg") is None:
+        print("Skipping the pydub MP3 benchmark, as ffmpeg is not installed")
+        return
+    augment = MP3CompressionAugment(
+        min_bitrate=64, max_bitrate=64, backend="pydub", p=1.0
+    )
+    augment(samples, sample_rate)  # measure the encoder delay
+    report(
+        "MP3CompressionAugment (pydub, temp file + librosa.load vs pipes + in memory)",
+        time_call(
+            lambda: mp3_pydub_round_trip_via_temp_file(samples, sample_rate, 64),
+            repeats,
+        ),
+        time_call(lambda: augment(samples, sample_rate), repeats),
+    )
+
+
+def benchmark_codec(duration, sample_rate, repeats):
+    from CLAPForge.augmentations.codec_augment import CodecAugment
+
+    samples = np.random.uniform(-0.5, 0.5, int(duration * sample_rate)).astype(np.float32)
+    for codec in ("mp3", "aac", "opus", "vorbis"):
+        augment = CodecAugment(codecs=[codec], min_bitrate=64, max_bitrate=64, p=1.0)
+        augment(samples, sample_rate)  # start the worker
+        report(
+            f"CodecAugment {codec} (new processes per clip vs persistent worker)",
+            time_call(
+                lambda: codec_round_trip_with_new_processes(
+                    samples, sample_rate, codec, 64
+                ),
+                repeats,
+            ),
+            time_call(lambda: augment(samples, sample_rate), repeats),
+        )
+        augment.close()
+
+    # The default randomization over all codecs and bitrates, including the start of
+    # the workers
+    num_calls = 50
+    augment = CodecAugment(p=1.0)
+    settings = [
+        (random.choice(augment.codecs), random.choice(augment.bitrate_choices))
+        for _ in range(num_calls)
+    ]
+    start_time = time.perf_counter()
+    for codec, bitrate in settings:
+        codec_round_trip_with_new_processes(samples, sample_rate, codec, bitrate)
+    baseline_seconds = time.perf_counter() - start_time
+    start_time = time.perf_counter()
+    for _ in range(num_calls):
+        augment(samples, sample_rate)
+    seconds = time.perf_counter() - start_time
+    report(
+        f"CodecAugment, {num_calls} clips with default randomization (new processes"
+        f" per clip vs {augment.max_workers} persistent workers, started on demand)",
+        baseline_seconds,
+        seconds,
+    )
+    augment.close()
+
+
+def benchmark_seven_band_eq(duration, sample_rate, repeats):
+    from CLAPForge.augmentations.seven_band_parametric_eq import SevenBandEQAugment
+
+    for num_channels in (1, 2, 8):
+        samples = np.random.uniform(
+            -0.5, 0.5, (num_channels, int(duration * sample_rate))
+        ).astype(np.float32)
+        augment = SevenBandEQAugment(p=1.0)
+        augment(samples, sample_rate)
+        augment.freeze_parameters()
+        report(
+            f"SevenBandEQAugment, {num_channels} channel(s) (band by band vs stacked)",
+            time_call(
+                lambda: seven_band_eq_band_by_band(augment, samples, sample_rate),
+                repeats,
+            ),
+            time_call(lambda: augment(samples, sample_rate), repeats),
+        )
+
+
+def benchmark_resample(duration, sample_rate, repeats):
+    from scipy.signal import resample_poly
+
+    from CLAPForge.augmentations.resample import ResampleAugment
+    from CLAPForge.core.resampling import resample
+
+    samples = np.random.uniform(
+        -0.5, 0.5, (2, int(duration * sample_rate))
+    ).astype(np.float32)
+
+    # A clip from a 44.1 kHz file, where the 160/441 ratio needs a long filter
+    clip = samples[:, :22050]
+    report(
+        "resample 44100 -> 16000 Hz, 0.5 s (resample_poly designing its filter vs"
+        " cached kernel)",
+        time_call(lambda: resample_poly(clip, 160, 441, axis=-1), repeats),
+        time_call(lambda: resample(clip, 44100, 16000, "medium"), repeats),
+    )
+    for quality in ("fast", "medium", "high", "soxr_hq"):
+        seconds = time_call(lambda: resample(samples, sample_rate, 16000, quality), repeats)
+        print(f"resample {sample_rate} -> 16000 Hz, {quality}: {seconds * 1000:.1f} ms")
+
+    # Short clips with random target rates, as in data augmentation
+    clip = samples[:, : sample_rate // 2]
+    num_calls = 200
+    soxr_augment = ResampleAugment(p=1.0)
+    for quality in ("fast", "medium"):
+        snapped_augment = ResampleAugment(sample_rate_step=1000, quality=quality, p=1.0)
+        for _ in range(num_calls):
+            snapped_augment(clip, sample_rate)  # fill the kernel cache
+        report(
+            f"ResampleAugment, {num_calls} short clips (soxr_hq vs {quality},"
+            " target rates snapped to 1 kHz)",
+            time_call(
+                lambda: [soxr_augment(clip, sample_rate) for _ in range(num_calls)],
+                repeats,
+            ),
+            time_call(
+                lambda: [snapped_augment(clip, sample_rate) for _ in range(num_calls)],
+                repeats,
+            ),
+        )
+
+
+BENCHMARKS = {
+    "dynamic_range": benchmark_dynamic_range,
+    "mp3_compression": benchmark_mp3_compression,
+    "codec": benchmark_codec,
+    "seven_band_eq": benchmark_seven_band_eq,
+    "resample": benchmark_resample,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark CLAPForge augmentations")
+    parser.add_argument(
+        "benchmarks",
+        nargs="*",
+        help="Benchmarks to run (default: all). Choose from: "
+        + ", ".join(sorted(BENCHMARKS)),
+    )
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of audio")
+    parser.add_argument("--sample_rate", type=int, default=48000)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    for name in args.benchmarks:
+        if name not in BENCHMARKS:
+            parser.error(f"Unknown benchmark: {name}")
+    for name in args.benchmarks or BENCHMARKS:
+        BENCHMARKS[name](args.duration, args.sample_rate, args.repeats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from numpy.typing import NDArray
+
+from CLAPForge.core.audio_loading_utils import load_sound_file
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+EVICTION_POLICIES = ("lru", "lfu")
+
+
+class AudioCache:
+    """
+    A cache of decoded audio with a budget in bytes rather than in number of entries, so
+    that a few long noise files and many short clicks are accounted for fairly. Entries are
+    keyed by (file_path, sample_rate, mono, offset, duration).
+
+    The cached arrays are shared between all callers, so they are returned read-only.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, eviction_policy: str = "lru"):
+        """
+        :param max_bytes: The maximum total size of the cached audio in bytes. Audio that
+            is larger than this on its own is loaded, but not cached.
+        :param eviction_policy: "lru" evicts the least recently used audio first. "lfu"
+            evicts the least frequently used audio first, and the least recently used
+            one among equally frequently used entries.
+        """
+        if eviction_policy not in EVICTION_POLICIES:
+            raise ValueError(
+                "eviction_policy must be one of {}".format(", ".join(EVICTION_POLICIES))
+            )
+        self.max_bytes = max_bytes
+        self.eviction_policy = eviction_policy
+        self.num_bytes = 0
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+        # key -> [samples, sample_rate, number of uses], ordered from least to most
+        # recently used
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def load(
+        self,
+        file_path,
+        sample_rate,
+        mono: bool = True,
+        offset: float = 0.0,
+        duration: float = None,
+    ):
+        """
+        Load an audio file like load_sound_file, but return the cached audio if it has
+        been loaded before.
+
+        :return: A tuple of the (read-only) samples and the sample rate
+        """
+        key = (str(file_path), sample_rate, mono, offset, duration)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self.stats["hits"] += 1
+                entry[2] += 1
+                self._entries.move_to_end(key)
+                return entry[0], entry[1]
+            self.stats["misses"] += 1
+
+        # Decode outside the lock, so that other threads can use the cache meanwhile
+        samples, actual_sample_rate = load_sound_file(
+            file_path, sample_rate, mono=mono, offset=offset, duration=duration
+        )
+        samples.flags.writeable = False
+        self.put(key, samples, actual_sample_rate)
+        return samples, actual_sample_rate
+
+    def contains(
+        self,
+        file_path,
+        sample_rate,
+        mono: bool = True,
+        offset: float = 0.0,
+        duration: float = None,
+    ) -> bool:
+        return (str(file_path), sample_rate, mono, offset, duration) in self._entries
+
+    def put(self, key, samples: NDArray[np.float32], sample_rate: int):
+        if samples.nbytes > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                return
+            self.evict(self.max_bytes - samples.nbytes)
+            self._entries[key] = [samples, sample_rate, 1]
+            self.num_bytes += samples.nbytes
+
+    def evict(self, max_bytes: int):
+        """Evict entries until the cached audio takes up at most max_bytes."""
+        while self.num_bytes > max_bytes:
+            if self.eviction_policy == "lru":
+                key = next(iter(self._entries))
+            else:
+                key = min(self._entries, key=lambda k: self._entries[k][2])
+            samples = self._entries.pop(key)[0]
+            self.num_bytes -= samples.nbytes
+            self.stats["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.num_bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# The decoded audio cache that is shared by all transforms that load external audio in
+# this process. Its budget can be changed with audio_cache.max_bytes.
+audio_cache = AudioCache()
+
+
+def load_cached_sound_file(
+    file_path, sample_rate, mono: bool = True, offset: float = 0.0, duration=None
+):
+    """
+    Load an audio file through the process-wide audio cache. The returned samples are
+    read-only.
+    """
+    return audio_cache.load(
+        file_path, sample_rate, mono=mono, offset=offset, duration=duration
+    )
@@ -1,10 +1,19 @@
+import io
+import json
+import os
+import tempfile
 import warnings
 
 import librosa
 import numpy as np
+import soundfile
 
+from CLAPForge.core.resampling import POLYPHASE_QUALITIES, SOXR_QUALITY, resample
 
-def load_sound_file(file_path, sample_rate, mono=True, resample_type="auto"):
+
+def load_sound_file(
+    file_path, sample_rate, mono=True, resample_type="auto", offset=0.0, duration=None
+):
     """
     Load an audio file as a floating point time series. Audio will be automatically
     resampled to the given sample rate.
@@ -12,12 +21,21 @@ def load_sound_file(file_path, sample_rate, mono=True, resample_type="auto"):
     :param file_path: str or Path instance that points to a sound file
     :param sample_rate: If not None, resample to this sample rate
     :param mono: If True, mix any multichannel data down to mono, and return a 1D array
-    :param resample_type: "auto" means use "kaiser_fast" when upsampling and "kaiser_best" when
-        downsampling
+    :param resample_type: "auto" means use "soxr_hq" ("kaiser_fast" when upsampling and
+        "kaiser_best" when downsampling with librosa 0.8). "fast", "medium" and "high"
+        use the polyphase resampler of CLAPForge.core.resampling, which caches its
+        kernel per pair of sample rates. Other values are passed on to librosa.resample.
+    :param offset: Start reading after this time (in seconds)
+    :param duration: Only load up to this much audio (in seconds). None means to the end.
     """
     file_path = str(file_path)
     samples, actual_sample_rate = librosa.load(
-        str(file_path), sr=None, mono=mono, dtype=np.float32
+        str(file_path),
+        sr=None,
+        mono=mono,
+        offset=offset,
+        duration=duration,
+        dtype=np.float32,
     )
 
     if sample_rate is not None and actual_sample_rate != sample_rate:
@@ -28,12 +46,17 @@ def load_sound_file(file_path, sample_rate, mono=True, resample_type="auto"):
                 )
             else:
                 resample_type = "soxr_hq"
-        samples = librosa.resample(
-            samples,
-            orig_sr=actual_sample_rate,
-            target_sr=sample_rate,
-            res_type=resample_type,
-        )
+        if resample_type in POLYPHASE_QUALITIES:
+            samples = resample(
+                samples, actual_sample_rate, sample_rate, quality=resample_type
+            )
+        else:
+            samples = librosa.resample(
+                samples,
+                orig_sr=actual_sample_rate,
+                target_sr=sample_rate,
+                res_type=resample_type,
+            )
         warnings.warn(
             "{} had to be resampled from {} Hz to {} Hz. This hurt execution time.".format(
                 str(file_path), actual_sample_rate, sample_rate
@@ -45,3 +68,108 @@ def load_sound_file(file_path, sample_rate, mono=True, resample_type="auto"):
     if mono:
         assert len(samples.shape) == 1
     return samples, actual_sample_rate
+
+
+def decode_sound_bytes(data: bytes, sample_rate: int):
+    """
+    Decode an encoded sound (e.g. the bytes of an MP3, WAV or FLAC file) in memory, without
+    writing it to disk. Audio will be resampled to the given sample rate if needed.
+
+    MP3 needs libsndfile >= 1.1 (bundled with soundfile >= 0.12). With an older
+    libsndfile, or a format it doesn't know, the data is written to a temporary file and
+    decoded with librosa.load instead, which can fall back to audioread.
+
+    :param data: The encoded sound
+    :param sample_rate: If not None, resample to this sample rate
+    :return: float32 samples with shape (samples,) for mono audio and (channels, samples)
+        for multichannel audio, like librosa.load with mono=False
+    """
+    try:
+        samples, actual_sample_rate = soundfile.read(
+            io.BytesIO(data), dtype="float32", always_2d=True
+        )
+    except RuntimeError:
+        # soundfile raises LibsndfileError, a subclass of RuntimeError, for data that
+        # libsndfile can't decode
+        samples, actual_sample_rate = decode_sound_bytes_via_temp_file(data)
+    else:
+        samples = samples.T
+        if samples.shape[0] == 1:
+            samples = samples[0]
+    samples = np.ascontiguousarray(samples)
+
+    if sample_rate is not None and actual_sample_rate != sample_rate:
+        samples = resample(samples, actual_sample_rate, sample_rate, quality=SOXR_QUALITY)
+    return samples
+
+
+def decode_sound_bytes_via_temp_file(data: bytes):
+    """
+    Decode an encoded sound by writing it to a temporary file and loading that with
+    librosa, without resampling. The samples have the same shape as in
+    decode_sound_bytes.
+
+    :return: A tuple of the float32 samples and their sample rate
+    """
+    file_descriptor, tmp_file_path = tempfile.mkstemp(prefix="CLAPForge_")
+    try:
+        with os.fdopen(file_descriptor, "wb") as f:
+            f.write(data)
+        return librosa.load(tmp_file_path, sr=None, mono=False, dtype=np.float32)
+    finally:
+        os.unlink(tmp_file_path)
+
+
+def load_audio_duration_index(file_paths, index_path=None):
+    """
+    Get the duration of each audio file from its header, without decoding the audio. If
+    index_path is given, durations are read from that JSON sidecar file when it exists.
+    An entry is only used if the modification time and size of its file are unchanged.
+    Files that are missing or changed are (re)read, and the sidecar file is then
+    rewritten, so later runs over the same noise bank skip even the header reads. The
+    sidecar file is replaced atomically, so processes that share it (e.g. DataLoader
+    workers) never read a partially written file.
+
+    :param file_paths: The paths (str) of the audio files
+    :param index_path: Optional path of a JSON file that maps file paths to their
+        duration, modification time and size
+    :return: dict that maps each file path to its duration in seconds
+    """
+    index = {}
+    if index_path is not None and os.path.isfile(index_path):
+        with open(index_path, "r") as index_file:
+            index = json.load(index_file)
+
+    durations = {}
+    is_index_changed = False
+    for file_path in file_paths:
+        stat_result = os.stat(file_path)
+        entry = index.get(file_path)
+        if (
+            not isinstance(entry, dict)
+            or entry.get("mtime") != stat_result.st_mtime
+            or entry.get("size") != stat_result.st_size
+        ):
+            entry = {
+                "duration": librosa.get_duration(path=file_path),
+                "mtime": stat_result.st_mtime,
+                "size": stat_result.st_size,
+            }
+            index[file_path] = entry
+            is_index_changed = True
+        durations[file_path] = entry["duration"]
+
+    if index_path is not None and is_index_changed:
+        index_dir = os.path.dirname(os.path.abspath(index_path))
+        file_descriptor, tmp_index_path = tempfile.mkstemp(
+            dir=index_dir, prefix=".duration_index_", suffix=".json"
+        )
+        try:
+            with os.fdopen(file_descriptor, "w") as index_file:
+                json.dump(index, index_file, indent=2)
+            os.replace(tmp_index_path, index_path)
+        except BaseException:
+            os.unlink(tmp_index_path)
+            raise
+
+    return durations
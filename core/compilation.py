@@ -0,0 +1,169 @@
+import warnings
+
+import numpy as np
+from numpy.typing import NDArray
+
+from CLAPForge.core.filter_utils import sosfilt_from_steady_state
+from CLAPForge.core.stretch_utils import signalsmith_stretch
+from CLAPForge.core.utils import pad_or_crop
+
+
+class FusedFilterStage:
+    """
+    Runs a sequence of linear IIR filter transforms (see `supports_sos_fusion`) as one
+    filter. The second-order sections of the filters that should be applied are stacked,
+    so the signal is filtered in a single `sosfilt` pass instead of one pass per transform.
+    Each transform still randomizes its own parameters and honors its own `p`.
+    """
+
+    def __init__(self, transforms):
+        self.transforms = transforms
+
+    def __call__(self, samples: NDArray[np.float32], sample_rate: int) -> NDArray[np.float32]:
+        if samples.dtype == np.float64:
+            warnings.warn(
+                "Warning: input samples dtype is np.float64. Converting to np.float32"
+            )
+            samples = np.float32(samples)
+
+        # The filters are linear and time-invariant, so none of them changes the shape of
+        # the signal, and they can all be prepared based on the input of the stage
+        sos_list = [
+            transform.get_sos(sample_rate)
+            for transform in self.transforms
+            if transform.prepare(samples, sample_rate)
+        ]
+        if not sos_list:
+            return samples
+        return sosfilt_from_steady_state(np.concatenate(sos_list), samples)
+
+
+class FusedStretchStage:
+    """
+    Runs a sequence of Signalsmith based pitch shift and time stretch transforms (see
+    `supports_stretch_fusion`) as one Signalsmith Stretch pass. The pitch shifts add up
+    and the time stretch rates multiply. If all time stretches that get applied leave the
+    length unchanged, the output is padded or cropped to the input length. Each transform
+    still randomizes its own parameters and honors its own `p`.
+    """
+
+    def __init__(self, transforms):
+        self.transforms = transforms
+
+    def __call__(self, samples: NDArray[np.float32], sample_rate: int) -> NDArray[np.float32]:
+        if samples.dtype == np.float64:
+            warnings.warn(
+                "Warning: input samples dtype is np.float64. Converting to np.float32"
+            )
+            samples = np.float32(samples)
+
+        transpose_semitones = 0.0
+        time_factor = 1.0
+        leave_length_unchanged = True
+        is_any_applied = False
+        for transform in self.transforms:
+            if not transform.prepare(samples, sample_rate):
+                continue
+            is_any_applied = True
+            settings = transform.get_stretch_settings()
+            transpose_semitones += settings.get("transpose_semitones", 0.0)
+            if "time_factor" in settings:
+                time_factor *= settings["time_factor"]
+                leave_length_unchanged &= transform.leave_length_unchanged
+        if not is_any_applied:
+            return samples
+
+        processed_samples = signalsmith_stretch(
+            samples,
+            sample_rate,
+            transpose_semitones=transpose_semitones,
+            time_factor=time_factor,
+        )
+        if leave_length_unchanged:
+            processed_samples = pad_or_crop(processed_samples, samples.shape[-1])
+        return processed_samples
+
+
+# Fusable kinds of transforms: (name of the class flag, stage class)
+FUSIONS = (
+    ("supports_sos_fusion", FusedFilterStage),
+    ("supports_stretch_fusion", FusedStretchStage),
+)
+
+
+def get_pipeline_buffer(buffers: list, samples: NDArray) -> NDArray[np.float32]:
+    """
+    Pick the array that an in-place capable transform should write its output into. If
+    the samples already live in one of the pipeline's own buffers, that buffer is
+    returned, so the transform works in place. Otherwise a buffer with a matching shape
+    that doesn't overlap the samples is reused, or a new one is allocated. At most two
+    buffers are kept, so a chain ping-pongs between them at worst.
+
+    :param buffers: The list of buffers owned by the pipeline. It gets updated.
+    :param samples: The input of the transform
+    """
+    for buffer in buffers:
+        if buffer is samples:
+            return buffer
+    for buffer in buffers:
+        if buffer.shape == samples.shape and not np.may_share_memory(buffer, samples):
+            return buffer
+    if len(buffers) == 2:
+        buffers.pop(0)
+    buffer = np.empty(samples.shape, dtype=np.float32)
+    buffers.append(buffer)
+    return buffer
+
+
+def run_stages(stages, samples: NDArray[np.float32], sample_rate: int) -> NDArray[np.float32]:
+    """
+    Run a sequence of transforms/stages. Transforms that support in-place operation (see
+    `supports_inplace`) write their output into buffers owned by the pipeline instead of
+    allocating a new array each, so e.g. a chain of gain, polarity inversion, clipping
+    and limiting runs in a single buffer. The input array, and any array that a transform
+    returns without the pipeline having allocated it, is never written to.
+    """
+    buffers = []
+    for stage in stages:
+        if getattr(stage, "supports_inplace", False):
+            samples = stage(
+                samples, sample_rate, out=get_pipeline_buffer(buffers, samples)
+            )
+        else:
+            samples = stage(samples, sample_rate)
+    return samples
+
+
+def plan_stages(transforms) -> list:
+    """
+    Group a sequence of waveform transforms into execution stages. Runs of two or more
+    consecutive transforms that support the same kind of fusion become a single stage:
+    linear IIR filters a FusedFilterStage, and Signalsmith pitch shifts and time
+    stretches a FusedStretchStage. All other transforms are kept as they are.
+    """
+    stages = []
+    run = []
+    run_stage_class = None
+
+    def flush_run():
+        if len(run) > 1:
+            stages.append(run_stage_class(list(run)))
+        else:
+            stages.extend(run)
+        run.clear()
+
+    for transform in transforms:
+        stage_class = None
+        for flag, fused_stage_class in FUSIONS:
+            if getattr(transform, flag, False):
+                stage_class = fused_stage_class
+                break
+        if stage_class is None or stage_class is not run_stage_class:
+            flush_run()
+        run_stage_class = stage_class
+        if stage_class is None:
+            stages.append(transform)
+        else:
+            run.append(transform)
+    flush_run()
+    return stages
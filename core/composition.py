@@ -1,9 +1,10 @@
 import random
-from typing import Any
+from typing import Any, Iterable, Iterator
 
 import numpy as np
 from numpy.typing import NDArray
 
+from CLAPForge.core.compilation import plan_stages, run_stages
 from CLAPForge.core.transforms_interface import BaseSpectrogramTransform
 from CLAPForge.core.serialization import get_shortest_class_fullname
 from CLAPForge.core.utils import format_args
@@ -117,6 +118,24 @@ class Compose(BaseCompose):
 
     def __init__(self, transforms, p=1.0, shuffle=False):
         super().__init__(transforms, p, shuffle)
+        self.is_compiled = False
+
+    def compile(self):
+        """
+        Plan a faster execution of the transforms. Consecutive linear IIR filters (e.g.
+        HighPassFilterAugment, PeakingFilterAugment, LowShelfFilterAugment and
+        SevenBandEQAugment) get merged into a single filter pass, so the signal is read
+        and written once per run of filters instead of once per filter. The output
+        matches the uncompiled output within float32 rounding. Likewise, consecutive
+        PitchShiftAugment and TimeStretchAugment (with the "signalsmith_stretch" method)
+        share a single Signalsmith pass, which sounds like the two passes in a row but
+        is not sample-identical.
+
+        Returns the Compose itself, so you can write `augment = Compose([...]).compile()`
+        """
+        self.is_compiled = True
+        self.stages = plan_stages(self.transforms)
+        return self
 
     def __call__(self, samples: NDArray[np.float32], sample_rate: int):
         transforms = self.transforms.copy()
@@ -126,11 +145,70 @@ class Compose(BaseCompose):
         if should_apply:
             if self.shuffle:
                 random.shuffle(transforms)
-            for transform in transforms:
-                samples = transform(samples, sample_rate)
+            if self.is_compiled:
+                transforms = plan_stages(transforms) if self.shuffle else self.stages
+            # Transforms that support in-place operation share at most two buffers owned
+            # by the Compose. The input samples are never modified.
+            samples = run_stages(transforms, samples, sample_rate)
 
         return samples
 
+    def process_stream(
+        self, chunks: Iterable[NDArray[np.float32]], sample_rate: int
+    ) -> Iterator[NDArray[np.float32]]:
+        """
+        Apply the transforms to a long recording that is given as an iterable of chunks
+        (e.g. blocks read from a file), and yield the output chunk by chunk. Only a few
+        chunks are held in memory at a time. The concatenated output is equal to what
+        __call__ would return for the whole recording with the same random state (see
+        the notes on exactness of each transform).
+
+        All transforms must support streaming (see `supports_streaming`), e.g. gain,
+        IIR filters, gaussian noise, limiting with an absolute threshold and impulse
+        responses without output normalization. Output chunks may differ in length from
+        the input chunks when a transform delays its output.
+
+        :param chunks: Iterable of arrays with shape (samples,) or (channels, samples)
+        :param sample_rate: The sample rate of the stream
+        """
+        transforms = self.transforms.copy()
+        should_apply = random.random() < self.p
+        if not should_apply:
+            yield from chunks
+            return
+        if self.shuffle:
+            random.shuffle(transforms)
+        for transform in transforms:
+            if not getattr(transform, "supports_streaming", False):
+                raise ValueError(
+                    "{} does not support streaming".format(transform.__class__.__name__)
+                )
+
+        states = [transform.init_stream_state(sample_rate) for transform in transforms]
+
+        def process(chunk, first_transform_idx):
+            for transform, state in zip(
+                transforms[first_transform_idx:], states[first_transform_idx:]
+            ):
+                if chunk.shape[-1] == 0:
+                    break
+                chunk = transform.process_chunk(chunk, state)
+            return chunk
+
+        for chunk in chunks:
+            chunk = process(chunk, 0)
+            if chunk.shape[-1] > 0:
+                yield chunk
+
+        # Push what each transform held back through the transforms after it
+        for transform_idx, (transform, state) in enumerate(zip(transforms, states)):
+            tail = transform.finish_stream(state)
+            if tail is None:
+                continue
+            tail = process(tail, transform_idx + 1)
+            if tail.shape[-1] > 0:
+                yield tail
+
 
 class SpecCompose(BaseCompose):
     def __init__(self, transforms, p=1.0, shuffle=False):
@@ -0,0 +1,88 @@
+import numpy as np
+import scipy.fft
+from numpy.typing import NDArray
+
+# Upper bound for the number of values in one batch of FFT frames. Long inputs are
+# processed in several batches to bound the memory use.
+MAX_BATCH_SIZE = 2**22
+
+
+def next_power_of_two(n: int) -> int:
+    return 1 << max(0, int(n) - 1).bit_length()
+
+
+def choose_fft_size(ir_length: int, num_output_samples: int) -> int:
+    """
+    Pick the FFT size for convolving with an impulse response of the given length. Short
+    outputs are done in a single FFT. Long ones are split into overlap-save blocks with an
+    FFT size of about 8 times the IR length, which keeps the overhead of the overlap small
+    while the FFTs stay cache friendly. Sizes are powers of two, so that only a few
+    distinct sizes (and cached IR spectra) are in use.
+    """
+    return min(
+        next_power_of_two(num_output_samples + ir_length - 1),
+        next_power_of_two(8 * ir_length),
+    )
+
+
+def get_ir_spectrum(ir: NDArray[np.float32], fft_size: int) -> NDArray[np.complex64]:
+    """
+    Return the rFFT of an impulse response with shape (samples,) or (channels, samples),
+    as an array with shape (channels, fft_size // 2 + 1).
+    """
+    return scipy.fft.rfft(np.atleast_2d(ir).astype(np.float32), n=fft_size, axis=-1)
+
+
+def fft_convolve(
+    samples: NDArray[np.float32],
+    ir_spectrum: NDArray[np.complex64],
+    ir_length: int,
+    fft_size: int,
+    num_output_samples: int,
+) -> NDArray[np.float32]:
+    """
+    Convolve audio with an impulse response, given by its spectrum, using overlap-save.
+    Only the first `num_output_samples` samples of the full convolution are computed,
+    which allows skipping the tail if it will be thrown away anyway. All channels and
+    blocks are transformed in batched FFTs.
+
+    :param samples: Audio with shape (channels, samples)
+    :param ir_spectrum: rFFT of the impulse response(s) with size fft_size, with shape
+        (ir_channels, fft_size // 2 + 1). Channel i of the audio is convolved with IR
+        channel i % ir_channels.
+    :param ir_length: Length of the impulse response in samples
+    :param fft_size: The FFT size that the IR spectrum was computed with. Must be at
+        least ir_length.
+    :param num_output_samples: How many samples of the convolution to compute, at most
+        samples.shape[1] + ir_length - 1
+    :return: float32 array with shape (channels, num_output_samples)
+    """
+    num_channels, num_samples = samples.shape
+    block_size = fft_size - ir_length + 1
+    num_blocks = -(-num_output_samples // block_size)
+    if ir_spectrum.shape[0] != num_channels:
+        ir_spectrum = ir_spectrum[np.arange(num_channels) % ir_spectrum.shape[0]]
+
+    # Output block b covers [b * block_size, (b + 1) * block_size) and needs the input
+    # from ir_length - 1 samples before the block start
+    padded_length = (num_blocks - 1) * block_size + fft_size
+    padded_samples = np.zeros((num_channels, padded_length), dtype=np.float32)
+    num_input_samples = min(num_samples, padded_length - (ir_length - 1))
+    padded_samples[:, ir_length - 1 : ir_length - 1 + num_input_samples] = samples[
+        :, :num_input_samples
+    ]
+    frames = np.lib.stride_tricks.sliding_window_view(
+        padded_samples, fft_size, axis=-1
+    )[:, ::block_size]
+
+    output = np.empty((num_channels, num_blocks * block_size), dtype=np.float32)
+    blocks_per_batch = max(1, MAX_BATCH_SIZE // (num_channels * fft_size))
+    for first_block in range(0, num_blocks, blocks_per_batch):
+        last_block = min(first_block + blocks_per_batch, num_blocks)
+        spectra = scipy.fft.rfft(frames[:, first_block:last_block], axis=-1)
+        spectra *= ir_spectrum[:, np.newaxis, :]
+        convolved_frames = scipy.fft.irfft(spectra, n=fft_size, axis=-1)
+        output[:, first_block * block_size : last_block * block_size] = (
+            convolved_frames[..., ir_length - 1 :].reshape((num_channels, -1))
+        )
+    return output[:, :num_output_samples]
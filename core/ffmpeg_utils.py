@@ -0,0 +1,251 @@
+import os
+import shutil
+import subprocess
+import threading
+import time
+
+import numpy as np
+from numpy.typing import NDArray
+from scipy.signal import correlate
+
+# Encoder, muxer, demuxer and encoder-specific output arguments per codec
+FFMPEG_CODECS = {
+    "mp3": {"encoder": "libmp3lame", "muxer": "mp3", "demuxer": "mp3", "args": []},
+    "aac": {"encoder": "aac", "muxer": "adts", "demuxer": "aac", "args": []},
+    # libopus only supports a few sample rates, so the audio gets encoded at 48 kHz
+    "opus": {
+        "encoder": "libopus",
+        "muxer": "ogg",
+        "demuxer": "ogg",
+        "args": ["-ar", "48000", "-page_duration", "10000"],
+    },
+    "vorbis": {
+        "encoder": "libvorbis",
+        "muxer": "ogg",
+        "demuxer": "ogg",
+        "args": ["-page_duration", "10000"],
+    },
+}
+
+# Keep ffmpeg from reading seconds of a pipe before it starts producing output
+FFMPEG_LOW_LATENCY_INPUT_ARGS = ["-probesize", "32", "-analyzeduration", "1"]
+
+
+def find_ffmpeg(ffmpeg_path=None) -> str:
+    """
+    Return the path to the ffmpeg executable. If ffmpeg_path is not given, look for
+    ffmpeg on the PATH.
+    """
+    if ffmpeg_path is None:
+        ffmpeg_path = shutil.which("ffmpeg")
+    if ffmpeg_path is None:
+        raise FileNotFoundError(
+            "Could not find ffmpeg. Install it, e.g. with your package manager, or pass"
+            " the path to the executable via the ffmpeg_path argument"
+        )
+    return ffmpeg_path
+
+
+class FFmpegCodecWorker:
+    """
+    A long-lived pair of ffmpeg processes that encode float32 PCM with a lossy codec and
+    decode it straight back: PCM -> encoder -> decoder -> PCM, connected with pipes. A
+    clip is processed by writing it to the encoder and reading the same number of frames
+    back from the decoder, so there is no process launch per clip.
+
+    The codec delay (e.g. priming samples) is measured once when the worker starts, by
+    cross-correlating a burst of noise with its decoded version. Between clips, silence is
+    pushed through the pipeline until the whole clip has come out at the other end. This
+    flushes the codec's internal buffers and keeps consecutive clips from bleeding into
+    each other.
+    """
+
+    # Read at most this many bytes at a time from the decoder
+    READ_SIZE = 65536
+
+    def __init__(
+        self,
+        codec: str,
+        bitrate: int,
+        sample_rate: int,
+        num_channels: int,
+        ffmpeg_path: str = None,
+        timeout: float = 10.0,
+    ):
+        """
+        :param codec: One of the keys in FFMPEG_CODECS, e.g. "aac" or "opus"
+        :param bitrate: Bitrate in kbps
+        :param sample_rate: Sample rate of the audio that goes in and out of the worker
+        :param num_channels: Number of channels of the audio
+        :param ffmpeg_path: Path to the ffmpeg executable. If None, look for it on PATH.
+        :param timeout: Seconds to wait for decoded audio before giving up
+        """
+        if codec not in FFMPEG_CODECS:
+            raise ValueError(
+                "codec must be one of {}".format(", ".join(sorted(FFMPEG_CODECS)))
+            )
+        self.codec = codec
+        self.bitrate = bitrate
+        self.sample_rate = sample_rate
+        self.num_channels = num_channels
+        self.timeout = timeout
+        self.frame_size = 4 * num_channels
+        self.flush_frames = max(1, sample_rate // 20)
+        # Amount of silence to write right after each clip. It grows to the amount that
+        # turned out to be needed for getting whole clips through the pipeline.
+        self.tail_frames = self.flush_frames
+
+        ffmpeg_path = find_ffmpeg(ffmpeg_path)
+        codec_spec = FFMPEG_CODECS[codec]
+        pcm_args = ["-f", "f32le", "-ar", str(sample_rate), "-ac", str(num_channels)]
+        encoder_command = (
+            [ffmpeg_path, "-nostdin", "-loglevel", "error"]
+            + FFMPEG_LOW_LATENCY_INPUT_ARGS
+            + pcm_args
+            + ["-i", "pipe:0", "-c:a", codec_spec["encoder"]]
+            + ["-b:a", "{}k".format(bitrate)]
+            + codec_spec["args"]
+            + ["-flush_packets", "1", "-f", codec_spec["muxer"], "pipe:1"]
+        )
+        decoder_command = (
+            [ffmpeg_path, "-loglevel", "error"]
+            + FFMPEG_LOW_LATENCY_INPUT_ARGS
+            + ["-f", codec_spec["demuxer"], "-i", "pipe:0"]
+            + pcm_args
+            + ["-flush_packets", "1", "pipe:1"]
+        )
+        self.encoder = subprocess.Popen(
+            encoder_command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        self.decoder = subprocess.Popen(
+            decoder_command,
+            stdin=self.encoder.stdout,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        # The decoder owns the read end of the pipe between the two processes now
+        self.encoder.stdout.close()
+
+        # Decoded bytes are collected by a background thread, so that neither process
+        # ever blocks on a full pipe
+        self._output = bytearray()
+        self._output_ready = threading.Condition()
+        self._reader = threading.Thread(target=self._read_decoder_output, daemon=True)
+        self._reader.start()
+
+        # Stream positions in frames. Output frame i corresponds to input frame i - delay.
+        self.frames_written = 0
+        self.output_start_frame = 0
+        self.delay = 0
+        self.delay = self._measure_delay()
+
+    def _read_decoder_output(self):
+        file_descriptor = self.decoder.stdout.fileno()
+        while True:
+            data = os.read(file_descriptor, self.READ_SIZE)
+            with self._output_ready:
+                if data:
+                    self._output.extend(data)
+                self._output_ready.notify_all()
+            if not data:
+                return
+
+    def _write(self, interleaved_samples: NDArray[np.float32]):
+        self.encoder.stdin.write(interleaved_samples.tobytes())
+        self.encoder.stdin.flush()
+        self.frames_written += interleaved_samples.shape[0]
+
+    def _read_frames(self, start: int, end: int) -> NDArray[np.float32]:
+        """
+        Return output frames [start, end) as an array with shape (frames, channels), and
+        drop all output before `end`. Silence is written to the encoder until the decoder
+        has produced enough frames.
+        """
+        silence = np.zeros((self.flush_frames, self.num_channels), dtype=np.float32)
+        deadline = time.monotonic() + self.timeout
+        num_output_bytes = -1
+        while True:
+            with self._output_ready:
+                num_output_frames = len(self._output) // self.frame_size
+                if self.output_start_frame + num_output_frames >= end:
+                    break
+                if self.decoder.poll() is not None or self.encoder.poll() is not None:
+                    raise RuntimeError(
+                        "The ffmpeg {} worker exited unexpectedly".format(self.codec)
+                    )
+                if time.monotonic() > deadline:
+                    raise TimeoutError(
+                        "The ffmpeg {} worker did not return audio within {} s".format(
+                            self.codec, self.timeout
+                        )
+                    )
+                # Only push more silence when the output has stalled, i.e. when the rest
+                # of the clip is stuck in the codec's buffers
+                is_stalled = len(self._output) == num_output_bytes
+                num_output_bytes = len(self._output)
+            if is_stalled:
+                self._write(silence)
+            with self._output_ready:
+                self._output_ready.wait(0.005)
+
+        with self._output_ready:
+            first_available_frame = self.output_start_frame
+            start_byte = max(0, start - first_available_frame) * self.frame_size
+            end_byte = (end - first_available_frame) * self.frame_size
+            frames = np.frombuffer(
+                bytes(self._output[start_byte:end_byte]), dtype=np.float32
+            ).reshape((-1, self.num_channels))
+            del self._output[:end_byte]
+            self.output_start_frame = end
+        if start < first_available_frame:
+            # With a negative delay, the first frames of the stream never come out
+            missing_frames = np.zeros(
+                (first_available_frame - start, self.num_channels), dtype=np.float32
+            )
+            frames = np.concatenate((missing_frames, frames))
+        return frames
+
+    def _measure_delay(self) -> int:
+        max_delay = self.sample_rate // 4
+        num_frames = self.sample_rate // 2
+        noise = np.random.RandomState(42).uniform(-0.5, 0.5, num_frames).astype(np.float32)
+        self._write(np.repeat(noise[:, np.newaxis], self.num_channels, axis=1))
+        decoded = self._read_frames(0, num_frames + max_delay)[:, 0]
+        correlation = correlate(decoded, noise, mode="full", method="fft")
+        lags = np.arange(-num_frames + 1, num_frames + max_delay)
+        is_candidate = np.abs(lags) <= max_delay
+        return int(lags[is_candidate][np.argmax(correlation[is_candidate])])
+
+    def process(self, samples: NDArray[np.float32]) -> NDArray[np.float32]:
+        """
+        Encode and decode the given audio, which has shape (channels, samples).
+        Returns the degraded audio with the same shape.
+        """
+        assert samples.shape[0] == self.num_channels
+        num_frames = samples.shape[1]
+        start_frame = self.frames_written
+        self._write(np.ascontiguousarray(samples.T, dtype=np.float32))
+        self._write(np.zeros((self.tail_frames, self.num_channels), dtype=np.float32))
+        frames = self._read_frames(
+            start_frame + self.delay, start_frame + self.delay + num_frames
+        )
+        self.tail_frames = max(
+            self.tail_frames, self.frames_written - start_frame - num_frames
+        )
+        return np.ascontiguousarray(frames.T)
+
+    def close(self):
+        try:
+            self.encoder.stdin.close()
+        except (BrokenPipeError, OSError):
+            pass
+        for process in (self.encoder, self.decoder):
+            try:
+                process.wait(timeout=1.0)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+        self.decoder.stdout.close()
@@ -0,0 +1,58 @@
+import numpy as np
+from numpy.typing import NDArray
+from scipy.signal import sosfilt, sosfilt_zi
+
+
+def get_steady_state_zi(
+    sos: NDArray[np.float64], first_samples: NDArray[np.float32]
+) -> NDArray[np.float64]:
+    """
+    Return the initial filter state for sosfilt(..., axis=-1), for signals that have been
+    equal to their first sample forever. The state has shape
+    (n_sections,) + first_samples.shape + (2,).
+    """
+    zi = sosfilt_zi(sos)
+    first_samples = np.asarray(first_samples)
+    return zi.reshape((zi.shape[0],) + (1,) * first_samples.ndim + (2,)) * first_samples[
+        np.newaxis, ..., np.newaxis
+    ]
+
+
+def sosfilt_from_steady_state(
+    sos: NDArray[np.float64], samples: NDArray[np.float32]
+) -> NDArray[np.float32]:
+    """
+    Filter the samples with the given second-order sections. The initial filter state is
+    the steady state for a signal that has been equal to the first sample forever, which
+    avoids a transient at the start of the output. Supports mono audio and multichannel
+    audio with shape (channels, samples), which is filtered along the last axis in a
+    single sosfilt call.
+
+    :param sos: Array of second-order filter coefficients with shape (n_sections, 6)
+    :param samples: The audio to filter
+    :return: The filtered audio as float32
+    """
+    processed_samples, _ = sosfilt(
+        sos, samples, axis=-1, zi=get_steady_state_zi(sos, samples[..., 0])
+    )
+    return processed_samples.astype(np.float32)
+
+
+def sosfilt_chunk(
+    sos: NDArray[np.float64], chunk: NDArray[np.float32], state: dict
+) -> NDArray[np.float32]:
+    """
+    Filter the next chunk of a stream with the given second-order sections. The filter
+    state is kept in state["zi"] between chunks, and initialized from the first chunk the
+    same way as in sosfilt_from_steady_state, so filtering a signal chunk by chunk gives
+    the same output as filtering it in one go.
+
+    :param sos: Array of second-order filter coefficients with shape (n_sections, 6)
+    :param chunk: The next samples, with shape (samples,) or (channels, samples)
+    :param state: Dict that holds the filter state of the stream
+    :return: The filtered chunk as float32
+    """
+    if "zi" not in state:
+        state["zi"] = get_steady_state_zi(sos, chunk[..., 0])
+    processed_chunk, state["zi"] = sosfilt(sos, chunk, axis=-1, zi=state["zi"])
+    return processed_chunk.astype(np.float32)
@@ -0,0 +1,141 @@
+import functools
+import warnings
+from typing import Union
+
+import numpy as np
+from numpy.typing import NDArray
+from scipy.signal import sosfilt
+
+# Gating block length and overlap, and the absolute gate, of ITU-R BS.1770-4
+BLOCK_DURATION = 0.4
+BLOCK_OVERLAP = 0.75
+ABSOLUTE_GATE_LUFS = -70.0
+# Channel weights for the channel order L, R, C, Ls, Rs. Any further channels get a
+# weight of 1.0.
+CHANNEL_WEIGHTS = (1.0, 1.0, 1.0, 1.41, 1.41)
+
+
+@functools.lru_cache(maxsize=16)
+def get_k_weighting_sos(sample_rate: int) -> NDArray[np.float64]:
+    """
+    Return the K-weighting filter of BS.1770 for the given sample rate, as two
+    second-order sections: a +4 dB high shelf at 1500 Hz and a high pass at 38 Hz. The
+    biquads are designed with the RBJ cookbook formulas, like pyloudnorm does. The
+    returned array is cached, so it must not be modified. (It can't be flagged read-only,
+    because scipy.signal.sosfilt needs a writable array.)
+    """
+
+    def normalize(b, a):
+        return np.concatenate((np.array(b) / a[0], np.array(a) / a[0]))
+
+    # High shelf, 4 dB, Q = 1 / sqrt(2), 1500 Hz
+    A = 10 ** (4.0 / 40.0)
+    w0 = 2.0 * np.pi * (1500.0 / sample_rate)
+    alpha = np.sin(w0) / (2.0 * (1 / np.sqrt(2)))
+    high_shelf = normalize(
+        [
+            A * ((A + 1) + (A - 1) * np.cos(w0) + 2 * np.sqrt(A) * alpha),
+            -2 * A * ((A - 1) + (A + 1) * np.cos(w0)),
+            A * ((A + 1) + (A - 1) * np.cos(w0) - 2 * np.sqrt(A) * alpha),
+        ],
+        [
+            (A + 1) - (A - 1) * np.cos(w0) + 2 * np.sqrt(A) * alpha,
+            2 * ((A - 1) - (A + 1) * np.cos(w0)),
+            (A + 1) - (A - 1) * np.cos(w0) - 2 * np.sqrt(A) * alpha,
+        ],
+    )
+
+    # High pass, Q = 0.5, 38 Hz
+    w0 = 2.0 * np.pi * (38.0 / sample_rate)
+    alpha = np.sin(w0) / (2.0 * 0.5)
+    high_pass = normalize(
+        [(1 + np.cos(w0)) / 2, -(1 + np.cos(w0)), (1 + np.cos(w0)) / 2],
+        [1 + alpha, -2 * np.cos(w0), 1 - alpha],
+    )
+
+    return np.stack((high_shelf, high_pass))
+
+
+def get_block_bounds(num_samples: int, sample_rate: int):
+    """
+    Return the start and end sample indices of the overlapping gating blocks, computed
+    the same way as in pyloudnorm.
+    """
+    step = 1.0 - BLOCK_OVERLAP
+    duration = num_samples / sample_rate
+    num_blocks = int(np.round((duration - BLOCK_DURATION) / (BLOCK_DURATION * step))) + 1
+    block_indices = np.arange(num_blocks)
+    starts = (BLOCK_DURATION * (block_indices * step) * sample_rate).astype(np.int64)
+    ends = (BLOCK_DURATION * (block_indices * step + 1) * sample_rate).astype(np.int64)
+    return starts, np.minimum(ends, num_samples)
+
+
+def calculate_integrated_loudness(
+    samples: NDArray[np.float32], sample_rate: int
+) -> Union[float, NDArray[np.float64]]:
+    """
+    Measure the integrated loudness in LUFS according to ITU-R BS.1770-4: K-weighting,
+    mean square energies of 400 ms blocks with 75 % overlap, then an absolute gate at
+    -70 LUFS and a relative gate 10 LU below the loudness of the blocks that passed.
+
+    All channels (and batch items) are filtered in one sosfilt call, and the block
+    energies of all blocks are summed in one pass with np.add.reduceat. The result
+    matches pyloudnorm.Meter(sample_rate).integrated_loudness() within float rounding.
+
+    :param samples: Audio with shape (samples,), (channels, samples) or
+        (batch, channels, samples)
+    :param sample_rate: The sample rate of the audio
+    :return: The loudness as a float, or an array with one loudness per batch item for
+        batched input. Digital silence gives -inf.
+    """
+    num_samples = samples.shape[-1]
+    if num_samples < BLOCK_DURATION * sample_rate:
+        raise ValueError("Audio must have length greater than the block size.")
+    if samples.ndim == 1:
+        batch = samples[np.newaxis, np.newaxis, :]
+    elif samples.ndim == 2:
+        batch = samples[np.newaxis, :, :]
+    else:
+        batch = samples
+    num_channels = batch.shape[1]
+
+    # K-weighting, from a zero initial state like in pyloudnorm
+    weighted = sosfilt(get_k_weighting_sos(sample_rate), batch, axis=-1)
+
+    # Mean square of each block, shape (batch, channels, blocks). A zero is appended, so
+    # that a block end that equals the signal length is a valid reduceat index.
+    starts, ends = get_block_bounds(num_samples, sample_rate)
+    squared = np.zeros(batch.shape[:-1] + (num_samples + 1,))
+    np.square(weighted, out=squared[..., :num_samples])
+    bounds = np.stack((starts, ends), axis=-1).reshape(-1)
+    block_energies = np.add.reduceat(squared, bounds, axis=-1)[..., ::2]
+    block_energies /= BLOCK_DURATION * sample_rate
+
+    channel_weights = np.ones(num_channels)
+    num_weighted_channels = min(num_channels, len(CHANNEL_WEIGHTS))
+    channel_weights[:num_weighted_channels] = CHANNEL_WEIGHTS[:num_weighted_channels]
+    with np.errstate(divide="ignore"):
+        block_loudness = -0.691 + 10.0 * np.log10(
+            np.einsum("c,bcj->bj", channel_weights, block_energies)
+        )
+
+    def get_gated_loudness(is_gated):
+        with warnings.catch_warnings(), np.errstate(divide="ignore", invalid="ignore"):
+            warnings.simplefilter("ignore", category=RuntimeWarning)
+            gated_energies = np.sum(
+                block_energies * is_gated[:, np.newaxis, :], axis=-1
+            ) / np.sum(is_gated, axis=-1, keepdims=True)
+            return -0.691 + 10.0 * np.log10(gated_energies @ channel_weights)
+
+    is_above_absolute_gate = block_loudness >= ABSOLUTE_GATE_LUFS
+    relative_gate = get_gated_loudness(is_above_absolute_gate) - 10.0
+    is_gated = (block_loudness > relative_gate[:, np.newaxis]) & (
+        block_loudness > ABSOLUTE_GATE_LUFS
+    )
+    loudness = get_gated_loudness(is_gated)
+    # No blocks passed the gates
+    loudness[np.isnan(loudness)] = -np.inf
+
+    if samples.ndim == 3:
+        return loudness
+    return float(loudness[0])
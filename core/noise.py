@@ -0,0 +1,109 @@
+from typing import Optional
+
+import numpy as np
+from numpy.typing import NDArray
+
+
+class GaussianNoisePool:
+    """
+    A pool of pregenerated float32 standard normal noise blocks. Noise is read from the
+    blocks at random offsets (wrapping around at the end of a block) and scaled, which
+    is bound by memory bandwidth rather than by the random number generator. The blocks are
+    generated on first use, from a fixed seed, so a pickled pool (e.g. in a worker
+    process) regenerates the same blocks instead of carrying them along.
+
+    Reads from the pool are less random than fresh draws: two reads can overlap. Make
+    the blocks considerably longer than the audio that the noise is added to.
+    """
+
+    def __init__(
+        self,
+        num_blocks: int = 4,
+        block_length: int = 2**19,
+        seed: Optional[int] = None,
+    ):
+        """
+        :param num_blocks: The number of noise blocks
+        :param block_length: The number of samples per block
+        :param seed: The seed of the blocks. By default, it is drawn from np.random.
+        """
+        self.num_blocks = num_blocks
+        self.block_length = block_length
+        self.seed = int(np.random.randint(0, 2**31)) if seed is None else seed
+        self._blocks = None
+
+    @property
+    def blocks(self) -> NDArray[np.float32]:
+        if self._blocks is None:
+            self._blocks = np.random.default_rng(self.seed).standard_normal(
+                (self.num_blocks, self.block_length), dtype=np.float32
+            )
+        return self._blocks
+
+    def draw_read_positions(self, rng: np.random.Generator, num_rows: int):
+        """Draw a random block and start offset for each of num_rows rows of noise."""
+        return (
+            rng.integers(0, self.num_blocks, size=num_rows),
+            rng.integers(0, self.block_length, size=num_rows),
+        )
+
+    def read(
+        self,
+        block_indices,
+        offsets,
+        out: NDArray[np.float32],
+        scale: float = 1.0,
+    ) -> NDArray[np.float32]:
+        """
+        Fill each row of the 2D out array with scaled noise from the given block,
+        starting at the given offset.
+        """
+        blocks = self.blocks
+        num_samples = out.shape[1]
+        for row, block_index, offset in zip(out, block_indices, offsets):
+            block = blocks[block_index]
+            position = 0
+            while position < num_samples:
+                start = (offset + position) % self.block_length
+                length = min(num_samples - position, self.block_length - start)
+                np.multiply(
+                    block[start : start + length],
+                    scale,
+                    out=row[position : position + length],
+                )
+                position += length
+        return out
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_blocks"] = None
+        return state
+
+
+def generate_gaussian_noise(
+    rng: np.random.Generator,
+    shape,
+    scale: float = 1.0,
+    pool: Optional[GaussianNoisePool] = None,
+) -> NDArray[np.float32]:
+    """
+    Generate float32 gaussian noise with the given shape, e.g. (samples,),
+    (channels, samples) or (batch, channels, samples), and standard deviation.
+
+    Without a pool, the noise is drawn from rng frame by frame (time-major), so that
+    consecutive draws from the same generator line up with one draw for the whole
+    length.
+    With a pool, each row of noise is read from the pool at a random position drawn from
+    rng.
+    """
+    shape = tuple(shape)
+    if pool is None:
+        noise = rng.standard_normal(shape[::-1], dtype=np.float32).T
+        noise *= scale
+        return noise
+
+    noise = np.empty(shape, dtype=np.float32)
+    rows = noise.reshape((-1, shape[-1]))
+    block_indices, offsets = pool.draw_read_positions(rng, rows.shape[0])
+    pool.read(block_indices, offsets, rows, scale)
+    return noise
@@ -1,10 +1,10 @@
 from typing import Callable
 
 import numpy as np
-import sys
 from numpy.typing import NDArray
 
 from CLAPForge import Normalize
+from CLAPForge.core.loudness import calculate_integrated_loudness
 from CLAPForge.core.utils import (
     calculate_rms,
     convert_decibels_to_amplitude_ratio,
@@ -62,25 +62,9 @@ class PostGain:
     def method_same_lufs(
         self, samples: NDArray[np.float32], sample_rate: int
     ) -> NDArray[np.float32]:
-        try:
-            import pyloudnorm
-        except ImportError:
-            print(
-                (
-                    "Failed to import pyloudnorm. Maybe it is not installed? "
-                    "To install the optional pyloudnorm dependency of CLAPForge,"
-                    " do `pip install CLAPForge[extras]` or simply "
-                    " `pip install pyloudnorm`"
-                ),
-                file=sys.stderr,
-            )
-            raise
-
-        meter = pyloudnorm.Meter(sample_rate)  # create BS.1770 meter
-        # transpose because pyloudnorm expects shape like (smp, chn), not (chn, smp)
-        lufs_before = meter.integrated_loudness(samples.transpose())
+        lufs_before = calculate_integrated_loudness(samples, sample_rate)
         samples = self.transform(samples, sample_rate)
-        lufs_after = meter.integrated_loudness(samples.transpose())
+        lufs_after = calculate_integrated_loudness(samples, sample_rate)
         gain_db = lufs_before - lufs_after
         samples *= convert_decibels_to_amplitude_ratio(gain_db)
         return samples
@@ -0,0 +1,132 @@
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable, Optional
+
+from CLAPForge.core.audio_cache import audio_cache, load_cached_sound_file
+
+DEFAULT_NUM_PREFETCH_WORKERS = 4
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+
+def get_prefetch_executor() -> ThreadPoolExecutor:
+    """
+    Return the process-wide thread pool that decodes prefetched audio. A forked worker
+    process (e.g. of a DataLoader) does not inherit the threads of its parent, so it
+    gets a new pool.
+    """
+    global _executor, _executor_pid
+    with _executor_lock:
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ThreadPoolExecutor(
+                max_workers=DEFAULT_NUM_PREFETCH_WORKERS,
+                thread_name_prefix="CLAPForgePrefetch",
+            )
+            _executor_pid = os.getpid()
+        return _executor
+
+
+class AudioPrefetcher:
+    """
+    Draws the next picks (e.g. noise or impulse response files) of a transform ahead of
+    time, and decodes their audio into the shared audio cache of CLAPForge.core.audio_cache
+    on a background thread pool. By the time the transform loads the audio of a pick in
+    apply(), it is then typically resident in the cache already.
+
+    The picks are drawn with the same random calls as without prefetching, but earlier,
+    so they are interleaved differently with the other random calls of the transform
+    (e.g. for a gain or an offset). A seeded run with prefetching is reproducible, but
+    gives different results than the same run without prefetching.
+
+    stats counts the loads (call load() once per pick, and get the audio straight from
+    the audio cache after that), how many of them found their audio resident in the cache
+    ("ready"), how many had to wait for a prefetch that was still decoding, and the total
+    time spent in load().
+    """
+
+    def __init__(
+        self,
+        draw_pick: Callable[[], Any],
+        num_prefetched_picks: int = 0,
+        get_file_paths: Optional[Callable[[Any], Iterable[str]]] = None,
+    ):
+        """
+        :param draw_pick: Draws one pick at random
+        :param num_prefetched_picks: How many picks to draw ahead of time. 0 disables
+            prefetching.
+        :param get_file_paths: Returns the audio file paths of a pick (None entries are
+            skipped). By default, a pick is a file path.
+        """
+        self.draw_pick = draw_pick
+        self.num_prefetched_picks = num_prefetched_picks
+        self.get_file_paths = get_file_paths
+        self.stats = {"loads": 0, "ready": 0, "waited": 0, "load_seconds": 0.0}
+        self._next_picks = deque()
+        self._pending_loads = {}
+
+    def next_pick(self, sample_rate: int, mono: bool = True):
+        """
+        Return the next pick. When prefetching is enabled, the queue of upcoming picks is
+        topped up first, and the audio of the new picks starts decoding in the background
+        at the given sample rate.
+        """
+        if self.num_prefetched_picks <= 0:
+            return self.draw_pick()
+        # Finished prefetches have put their audio in the cache
+        for key in [k for k, future in self._pending_loads.items() if future.done()]:
+            del self._pending_loads[key]
+        while len(self._next_picks) <= self.num_prefetched_picks:
+            pick = self.draw_pick()
+            self._next_picks.append(pick)
+            file_paths = [pick] if self.get_file_paths is None else self.get_file_paths(pick)
+            for file_path in file_paths:
+                key = (file_path, sample_rate, mono)
+                if file_path is not None and key not in self._pending_loads:
+                    self._pending_loads[key] = get_prefetch_executor().submit(
+                        load_cached_sound_file, file_path, sample_rate, mono
+                    )
+        return self._next_picks.popleft()
+
+    def load(self, file_path, sample_rate: int, mono: bool = True):
+        """
+        Load the audio of a pick through the audio cache, waiting for its prefetch to
+        finish if it is still decoding.
+
+        :return: A tuple of the (read-only) samples and the sample rate
+        """
+        start_time = time.perf_counter()
+        pending_load = self._pending_loads.pop((file_path, sample_rate, mono), None)
+        if pending_load is not None and not pending_load.done():
+            self.stats["waited"] += 1
+            # Errors are raised again by the load below
+            pending_load.exception()
+        elif audio_cache.contains(file_path, sample_rate, mono):
+            self.stats["ready"] += 1
+        samples, actual_sample_rate = load_cached_sound_file(
+            file_path, sample_rate, mono=mono
+        )
+        self.stats["loads"] += 1
+        self.stats["load_seconds"] += time.perf_counter() - start_time
+        return samples, actual_sample_rate
+
+    @property
+    def prefetch_accuracy(self) -> float:
+        """The fraction of loads whose audio was resident in the cache already"""
+        return self.stats["ready"] / max(self.stats["loads"], 1)
+
+    @property
+    def mean_load_latency(self) -> float:
+        """The mean time spent in load(), in seconds"""
+        return self.stats["load_seconds"] / max(self.stats["loads"], 1)
+
+    def __getstate__(self):
+        # Pending loads belong to the thread pool of this process
+        state = self.__dict__.copy()
+        state["_next_picks"] = deque()
+        state["_pending_loads"] = {}
+        return state
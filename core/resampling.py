@@ -0,0 +1,83 @@
+import functools
+import math
+
+import numpy as np
+from numpy.typing import NDArray
+from scipy.signal import firwin, resample_poly
+
+# Quality/speed tiers of the polyphase resampler: (half length of the anti-aliasing
+# filter, in periods of the lower of the two rates, Kaiser window beta). "medium" is the
+# filter that scipy.signal.resample_poly designs by default.
+POLYPHASE_QUALITIES = {
+    "fast": (4, 5.0),
+    "medium": (10, 5.0),
+    "high": (24, 8.6),
+}
+# Resampling with libsoxr (through librosa). It handles any ratio without a kernel to
+# cache, which makes it the better choice for arbitrary sample rate pairs.
+SOXR_QUALITY = "soxr_hq"
+RESAMPLING_QUALITIES = tuple(POLYPHASE_QUALITIES) + (SOXR_QUALITY,)
+
+
+@functools.lru_cache(maxsize=64)
+def get_polyphase_kernel(up: int, down: int, quality: str) -> NDArray[np.float32]:
+    """
+    Design the anti-aliasing FIR filter for resampling by the rational factor up / down.
+    Designing the filter takes about as long as resampling a second of audio, so the
+    kernels are cached per ratio and quality. The returned array is read-only.
+    """
+    half_len_factor, kaiser_beta = POLYPHASE_QUALITIES[quality]
+    max_rate = max(up, down)
+    kernel = firwin(
+        2 * half_len_factor * max_rate + 1,
+        1.0 / max_rate,
+        window=("kaiser", kaiser_beta),
+    ).astype(np.float32)
+    kernel.flags.writeable = False
+    return kernel
+
+
+def resample(
+    samples: NDArray[np.float32],
+    orig_sample_rate: int,
+    target_sample_rate: int,
+    quality: str = "medium",
+) -> NDArray[np.float32]:
+    """
+    Resample audio along the last axis, so mono, multichannel and batched
+    (batch, channels, samples) input is supported.
+
+    The polyphase tiers ("fast", "medium" and "high") use a cached kernel for the reduced
+    ratio of the two sample rates. Sample rate pairs with a large greatest common divisor
+    (e.g. 44100 -> 16000, or rates that are multiples of 100) give short kernels and are
+    fast. "soxr_hq" uses libsoxr instead.
+
+    :param samples: The audio to resample
+    :param orig_sample_rate: The sample rate of the audio
+    :param target_sample_rate: The sample rate to resample to
+    :param quality: One of RESAMPLING_QUALITIES
+    :return: float32 array with ceil(samples.shape[-1] * target / orig) samples
+    """
+    if quality not in RESAMPLING_QUALITIES:
+        raise ValueError(
+            "quality must be one of {}".format(", ".join(RESAMPLING_QUALITIES))
+        )
+    if orig_sample_rate == target_sample_rate:
+        return samples
+    if quality == SOXR_QUALITY:
+        import librosa
+
+        return librosa.resample(
+            samples,
+            orig_sr=orig_sample_rate,
+            target_sr=target_sample_rate,
+            res_type=SOXR_QUALITY,
+        )
+
+    divisor = math.gcd(int(orig_sample_rate), int(target_sample_rate))
+    up = int(target_sample_rate) // divisor
+    down = int(orig_sample_rate) // divisor
+    resampled_samples = resample_poly(
+        samples, up, down, axis=-1, window=get_polyphase_kernel(up, down, quality)
+    )
+    return resampled_samples.astype(np.float32, copy=False)
@@ -0,0 +1,61 @@
+import threading
+
+import numpy as np
+from numpy.typing import NDArray
+
+# Configured Signalsmith stretchers, per thread and keyed by (num_channels, sample_rate).
+# Setting up a stretcher allocates its FFT buffers, so they are reset and reused between
+# calls instead of being rebuilt. Forked worker processes get their own copies.
+_stretcher_pool = threading.local()
+
+
+def get_signalsmith_stretcher(num_channels: int, sample_rate: int):
+    """
+    Return a configured python_stretch.Signalsmith.Stretch for the given number of
+    channels and sample rate from the pool, creating it on first use. The stretcher is
+    reset, so it holds no audio from earlier calls.
+    """
+    import python_stretch
+
+    stretchers = getattr(_stretcher_pool, "stretchers", None)
+    if stretchers is None:
+        stretchers = _stretcher_pool.stretchers = {}
+    key = (num_channels, sample_rate)
+    stretcher = stretchers.get(key)
+    if stretcher is None:
+        stretcher = python_stretch.Signalsmith.Stretch()
+        stretcher.preset(num_channels, sample_rate)
+        stretchers[key] = stretcher
+    else:
+        stretcher.reset()
+    return stretcher
+
+
+def signalsmith_stretch(
+    samples: NDArray[np.float32],
+    sample_rate: int,
+    transpose_semitones: float = 0.0,
+    time_factor: float = 1.0,
+) -> NDArray[np.float32]:
+    """
+    Pitch shift and/or time stretch audio in a single Signalsmith Stretch pass.
+
+    :param samples: Audio with shape (samples,) or (channels, samples)
+    :param sample_rate: The sample rate of the audio
+    :param transpose_semitones: How many semitones to shift the pitch by
+    :param time_factor: Playback speed factor. Values greater than 1.0 make the audio
+        shorter, values less than 1.0 make it longer.
+    :return: The processed audio, with the same number of dimensions as the input
+    """
+    original_ndim = samples.ndim
+    if original_ndim == 1:
+        samples = samples[np.newaxis, :]
+
+    stretcher = get_signalsmith_stretcher(samples.shape[0], sample_rate)
+    stretcher.setTransposeSemitones(transpose_semitones)
+    stretcher.setTimeFactor(time_factor)
+    processed_samples = stretcher.process(samples)
+
+    if processed_samples.ndim > original_ndim:
+        processed_samples = processed_samples[0]
+    return processed_samples
@@ -3,7 +3,7 @@ from __future__ import annotations
 import inspect
 import random
 import warnings
-from typing import Any
+from typing import Any, Optional
 
 import numpy as np
 from numpy.typing import NDArray
@@ -97,24 +97,154 @@ class BaseTransform(Serializable, metaclass=CombinedMeta):
 
 
 class BaseWaveformTransform(BaseTransform):
+    # Set to True in transforms that are linear IIR filters and implement get_sos(). A
+    # compiled Compose merges consecutive transforms like that into a single filter pass.
+    supports_sos_fusion = False
+    # Set to True in transforms whose apply() takes an `out` array with the same shape as
+    # the input, which may also be the input itself, and writes the result into it. See
+    # the `out` and `inplace` arguments of __call__.
+    supports_inplace = False
+    # Set to True in transforms that can process a long recording as a sequence of
+    # chunks, with output identical to processing it in one go. See process_chunk().
+    supports_streaming = False
+
     def apply(self, samples: NDArray[np.float32], sample_rate: int):
         raise NotImplementedError
 
+    def get_sos(self, sample_rate: int) -> NDArray[np.float64]:
+        """
+        Return the second-order sections, with shape (n_sections, 6), of the filter that
+        this transform applies with its current parameters.
+        """
+        raise NotImplementedError
+
     def is_multichannel(self, samples):
         return is_waveform_multichannel(samples)
 
-    def __call__(self, samples: NDArray[np.float32], sample_rate: int) -> NDArray[np.float32]:
+    def is_channels_last(self, samples) -> bool:
+        """
+        Return whether multichannel samples look like they have the shape
+        (samples, channels) instead of (channels, samples).
+        """
+        # Note: We multiply by 8 here to allow big batches of very short audio.
+        # Batched input has the shape (batch, channels, samples).
+        return samples.shape[-2] > samples.shape[-1] * 8
+
+    def __call__(
+        self,
+        samples: NDArray[np.float32],
+        sample_rate: int,
+        out: NDArray[np.float32] = None,
+        inplace: bool = False,
+    ) -> NDArray[np.float32]:
+        """
+        :param samples: The audio to transform
+        :param sample_rate: The sample rate of the audio
+        :param out: Optional float32 array with the same shape as `samples`. If the
+            transform supports in-place operation (see `supports_inplace`), the result is
+            written into this array instead of a newly allocated one. Other transforms
+            ignore it, so always use the returned array.
+        :param inplace: If True, use `samples` itself as `out`
+        """
         if samples.dtype == np.float64:
             warnings.warn(
                 "Warning: input samples dtype is np.float64. Converting to np.float32"
             )
             samples = np.float32(samples)
+        if self.prepare(samples, sample_rate):
+            if inplace:
+                out = samples
+            if out is not None and self.supports_inplace:
+                return self.apply(samples, sample_rate, out=out)
+            return self.apply(samples, sample_rate)
+        return samples
+
+    def init_stream_state(self, sample_rate: int) -> dict:
+        """
+        Return the state for processing a new stream with process_chunk(). The state is a
+        dict that process_chunk() updates in place, so one transform instance can process
+        several streams at the same time (interleaved, not from several threads), each with
+        its own state and its own parameters.
+        """
+        return {"sample_rate": sample_rate, "should_apply": None}
+
+    def process_chunk(
+        self, chunk: NDArray[np.float32], state: dict
+    ) -> NDArray[np.float32]:
+        """
+        Process the next chunk of a stream. The parameters are randomized once, when the
+        first non-empty chunk arrives, so the whole stream gets the same treatment. The
+        concatenated output chunks (followed by the output of finish_stream()) are equal
+        to what __call__ returns for the whole recording with the same parameters.
+
+        Some transforms delay their output, so an output chunk can be shorter than the
+        input chunk.
+
+        :param chunk: The next samples of the stream, with shape (samples,) or
+            (channels, samples)
+        :param state: A dict from init_stream_state()
+        """
+        if not self.supports_streaming:
+            raise NotImplementedError(
+                "{} does not support streaming".format(self.__class__.__name__)
+            )
+        if chunk.dtype == np.float64:
+            warnings.warn(
+                "Warning: input samples dtype is np.float64. Converting to np.float32"
+            )
+            chunk = np.float32(chunk)
+        if state["should_apply"] is None:
+            if chunk.shape[-1] == 0:
+                return chunk
+            state["should_apply"] = self.prepare(chunk, state["sample_rate"])
+            # Keep the parameters of this stream, as opening another stream randomizes
+            # self.parameters again
+            state["parameters"] = dict(self.parameters)
+        if state["should_apply"]:
+            self.parameters = dict(state["parameters"])
+            return self.apply_chunk(chunk, state)
+        return chunk
+
+    def finish_stream(self, state: dict) -> Optional[NDArray[np.float32]]:
+        """
+        Signal the end of a stream. Returns the remaining output (e.g. samples held back
+        by a delay, or a reverb tail), or None if there is none.
+        """
+        if state["should_apply"]:
+            self.parameters = dict(state["parameters"])
+            return self.flush_stream(state)
+        return None
+
+    def apply_chunk(self, chunk: NDArray[np.float32], state: dict) -> NDArray[np.float32]:
+        """
+        Transform the next chunk of a stream. Implemented by streaming transforms. Linear
+        IIR filters (see `supports_sos_fusion`) are streamed here by default, by carrying
+        the filter state from one chunk to the next.
+        """
+        if self.supports_sos_fusion:
+            # Imported here, as scipy.signal is slow to import and most transforms don't
+            # need it
+            from CLAPForge.core.filter_utils import sosfilt_chunk
+
+            if "sos" not in state:
+                state["sos"] = self.get_sos(state["sample_rate"])
+            return sosfilt_chunk(state["sos"], chunk, state)
+        raise NotImplementedError
+
+    def flush_stream(self, state: dict) -> Optional[NDArray[np.float32]]:
+        """Return the remaining output at the end of a stream, if any."""
+        return None
+
+    def prepare(self, samples: NDArray[np.float32], sample_rate: int) -> bool:
+        """
+        Randomize the parameters (unless they are frozen) and check that the shape of the
+        given samples is supported. Return whether the transform should be applied.
+        """
         if not self.are_parameters_frozen or self.parameters["should_apply"] is None:
             self.randomize_parameters(samples, sample_rate)
         if self.parameters["should_apply"] and len(samples) > 0:
             if self.is_multichannel(samples):
-                # Note: We multiply by 8 here to allow big batches of very short audio
-                if samples.shape[0] > samples.shape[1] * 8:
+                if self.is_channels_last(samples):
                     raise WrongMultichannelAudioShape(
                         "Multichannel audio must have channels first, not channels"
                         " last. In other words, the shape must be (channels, samples),"
@@ -136,8 +266,8 @@ class BaseWaveformTransform(BaseTransform):
                         self.__class__.__name__
                     )
                 )
-            return self.apply(samples, sample_rate)
-        return samples
+            return True
+        return False
 
     def randomize_parameters(self, samples: NDArray[np.float32], sample_rate: int):
         self.parameters["should_apply"] = random.random() < self.p
@@ -91,10 +91,32 @@ def calculate_rms(samples):
     return np.mean(numpy_rms.rms(samples))
 
 
+def calculate_framewise_rms(
+    samples: NDArray[np.float32], frame_length: int
+) -> NDArray[np.float32]:
+    """
+    Calculate the RMS of consecutive, non-overlapping frames along the last axis, so
+    mono, multichannel and batched input is supported. The frames are a reshaped view
+    of the samples, so all of them are measured in one vectorized pass. Samples after
+    the last full frame are ignored.
+
+    :param samples: Audio with shape (..., samples)
+    :param frame_length: The number of samples per frame
+    :return: Array with shape (..., samples // frame_length)
+    """
+    num_frames = samples.shape[-1] // frame_length
+    frames = samples[..., : num_frames * frame_length].reshape(
+        samples.shape[:-1] + (num_frames, frame_length)
+    )
+    mean_squares = np.einsum("...j,...j->...", frames, frames) / frame_length
+    return np.sqrt(mean_squares)
+
+
 def calculate_rms_without_silence(samples: NDArray[np.float32], sample_rate: int):
     """
     This function returns the rms of a given noise whose silent periods have been removed. This ensures
     that the rms of the noise is not underestimated. Is most useful for short non-stationary noises.
+    Multichannel audio is measured along the last axis, like in calculate_rms.
     """
 
     window = int(0.025 * sample_rate)
@@ -102,14 +124,11 @@ def calculate_rms_without_silence(samples: NDArray[np.float32], sample_rate: int
     if samples.shape[-1] < window:
         return calculate_rms(samples)
 
-    rms_all_windows = np.zeros(samples.shape[-1] // window)
-    current_time = 0
-
-    while current_time < samples.shape[-1] - window:
-        rms_all_windows[current_time // window] += calculate_rms(
-            samples[current_time : current_time + window]
-        )
-        current_time += window
+    # The RMS of each 25 ms window, averaged over the channels
+    rms_all_windows = calculate_framewise_rms(samples, window)
+    rms_all_windows = rms_all_windows.reshape((-1, rms_all_windows.shape[-1])).mean(
+        axis=0
+    )
 
     rms_threshold = np.max(rms_all_windows) / 25
 
@@ -119,7 +138,7 @@ def calculate_rms_without_silence(samples: NDArray[np.float32], sample_rate: int
         # Beware that each window must have the same number of samples so that this calculation of the rms is valid.
         return calculate_rms(rms_all_windows)
     else:
-        # Handle edge case: No windows remain. This can happen if there was just one window before discarding.
+        # Handle edge case: No windows remain. This can happen if the noise is digital silence.
         return calculate_rms(samples)
 
 
@@ -223,7 +242,59 @@ def get_crossfade_mask_pair(
     return fade_in, fade_out
 
 
+def get_writable_copy(samples: NDArray, out: NDArray = None) -> NDArray:
+    """
+    Return an array with the same content as samples that can be modified freely. That
+    is `out` (filled with the samples, unless it already is the samples array) if given,
+    or else a new copy of the samples.
+    """
+    if out is None:
+        return np.copy(samples)
+    if out is not samples:
+        np.copyto(out, samples)
+    return out
+
+
+def pad_or_crop(samples: NDArray, num_samples: int) -> NDArray:
+    """
+    Return the samples with the last axis zero-padded at the end or cropped to the given
+    number of samples.
+    """
+    fitted_samples = np.zeros(samples.shape[:-1] + (num_samples,), dtype=samples.dtype)
+    window = samples[..., :num_samples]
+    fitted_samples[..., : window.shape[-1]] = window
+    return fitted_samples
+
+
 def get_max_abs_amplitude(samples: NDArray):
     min_amplitude, max_amplitude = numpy_minmax.minmax(samples)
     max_abs_amplitude = max(abs(min_amplitude), abs(max_amplitude))
     return max_abs_amplitude
+
+
+def interpolate_along_last_axis(
+    x: NDArray[np.float64], xp: NDArray[np.float64], fp: NDArray
+) -> NDArray[np.float64]:
+    """
+    Like np.interp(x, xp, fp), but for fp with any number of leading dimensions (e.g.
+    channels), which are all interpolated in one go. The interpolation is computed the
+    same way as in np.interp, so each row gives bit-for-bit the same result.
+
+    :param x: The x-coordinates at which to evaluate, 1D
+    :param xp: The increasing x-coordinates of the data points, 1D
+    :param fp: The y-coordinates of the data points, with shape (..., len(xp))
+    """
+    fp = np.asarray(fp, dtype=np.float64)
+    if len(xp) == 1:
+        # There is nothing to interpolate between, so np.interp returns the only point
+        return np.repeat(fp, len(x), axis=-1)
+    left_idx = np.clip(np.searchsorted(xp, x, side="right") - 1, 0, len(xp) - 2)
+    slopes = (fp[..., 1:] - fp[..., :-1]) / (xp[1:] - xp[:-1])
+    interpolated = slopes[..., left_idx] * (x - xp[left_idx]) + fp[..., left_idx]
+    # Like np.interp, return the data points themselves where x hits them, and clamp
+    # to the end values outside of xp
+    is_exact = x == xp[left_idx]
+    interpolated[..., is_exact] = fp[..., left_idx[is_exact]]
+    interpolated[..., x < xp[0]] = fp[..., :1]
+    interpolated[..., x >= xp[-1]] = fp[..., -1:]
+    return interpolated
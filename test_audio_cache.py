@@ -0,0 +1,68 @@
+import os
+import tempfile
+
+import numpy as np
+import soundfile
+
+from CLAPForge.augmentations.add_background_noise import BackgroundNoiseAugment
+from CLAPForge.augmentations.add_short_noises import ShortNoisesAugment
+from CLAPForge.augmentations.pitch_shift import PitchShiftAugment
+from CLAPForge.augmentations.time_stretch import TimeStretchAugment
+from CLAPForge.core.audio_cache import audio_cache
+from CLAPForge.core.audio_loading_utils import load_audio_duration_index
+
+sample_rate = 16000
+samples = np.random.normal(scale=0.1, size=3 * sample_rate).astype(np.float32)
+
+with tempfile.TemporaryDirectory() as noise_dir:
+    for i in range(2):
+        soundfile.write(
+            os.path.join(noise_dir, "noise{}.wav".format(i)),
+            np.random.normal(scale=0.1, size=sample_rate).astype(np.float32),
+            sample_rate,
+        )
+
+    # The cached noise is read-only, but noise transforms must still get a writable
+    # array (python_stretch rejects read-only buffers)
+    for noise_transform in (
+        PitchShiftAugment(method="signalsmith_stretch", p=1.0),
+        TimeStretchAugment(method="signalsmith_stretch", p=1.0),
+    ):
+        for augment in (
+            BackgroundNoiseAugment(noise_dir, noise_transform=noise_transform, p=1.0),
+            ShortNoisesAugment(
+                noise_dir,
+                min_time_between_sounds=0.1,
+                max_time_between_sounds=0.5,
+                noise_transform=noise_transform,
+                p=1.0,
+            ),
+        ):
+            for _ in range(3):
+                augmented_samples = augment(samples, sample_rate)
+                assert augmented_samples.shape == samples.shape
+                assert augmented_samples.dtype == np.float32
+            print(
+                type(augment).__name__,
+                "with",
+                type(noise_transform).__name__,
+                "as noise_transform: OK",
+            )
+
+    # The prefetcher counts one load per pick
+    augment = BackgroundNoiseAugment(noise_dir, num_prefetched_files=2, p=1.0)
+    for _ in range(5):
+        augment(samples, sample_rate)
+    assert augment.prefetcher.stats["loads"] == 5
+    print("Prefetch accuracy:", augment.prefetcher.prefetch_accuracy)
+
+    # The duration index is refreshed when a file changes
+    index_path = os.path.join(noise_dir, "durations.json")
+    noise_path = os.path.join(noise_dir, "noise1.wav")
+    assert load_audio_duration_index([noise_path], index_path) == {noise_path: 1.0}
+    soundfile.write(noise_path, np.zeros(sample_rate // 2, np.float32), sample_rate)
+    assert load_audio_duration_index([noise_path], index_path) == {noise_path: 0.5}
+
+    cached_noise, _ = audio_cache.load(os.path.join(noise_dir, "noise0.wav"), sample_rate)
+    assert not cached_noise.flags.writeable
+    print("Audio cache stats:", audio_cache.stats)
@@ -0,0 +1,36 @@
+import numpy as np
+from CLAPForge.augmentations.band_pass_filter import BandPassFilterAugment
+from CLAPForge.augmentations.band_stop_filter import BandStopFilterAugment
+
+sample_rate = 16000
+samples = np.random.normal(size=sample_rate).astype(np.float32)
+
+# A band narrower than the grid step must not collapse to a single frequency
+for transform_class in [BandPassFilterAugment, BandStopFilterAugment]:
+    for cutoff_freq_grid, center_freq in [("hz", 1000), ("mel", 1000), ("hz", 7990)]:
+        augment = transform_class(
+            min_center_freq=center_freq,
+            max_center_freq=center_freq,
+            min_bandwidth_fraction=0.01,
+            max_bandwidth_fraction=0.01,
+            cutoff_freq_grid=cutoff_freq_grid,
+            cutoff_freq_grid_step=50,
+            p=1.0,
+        )
+        filtered_samples = augment(samples, sample_rate)
+        assert filtered_samples.shape == samples.shape
+        assert np.all(np.isfinite(filtered_samples))
+
+# Designs that are already cached count as hits, also when another instance cached them
+first = BandPassFilterAugment(cutoff_freq_grid="hz", cutoff_freq_grid_step=500, p=1.0)
+second = BandPassFilterAugment(cutoff_freq_grid="hz", cutoff_freq_grid_step=500, p=1.0)
+first.randomize_parameters(samples, sample_rate)
+second.parameters = dict(first.parameters)
+first.get_sos(sample_rate)
+second.get_sos(sample_rate)
+second.get_sos(sample_rate)
+assert first.filter_design_cache_stats["hits"] + first.filter_design_cache_stats[
+    "misses"
+] == 1
+assert second.filter_design_cache_stats == {"hits": 2, "misses": 0}
+print("Filter design cache stats:", first.filter_design_cache_stats)
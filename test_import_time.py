@@ -0,0 +1,42 @@
+import subprocess
+import sys
+
+# Import the package in a fresh interpreter, then report how long it took and which
+# heavy dependencies it pulled in
+MEASURE_IMPORT = """
+import sys, time
+start_time = time.perf_counter()
+import CLAPForge
+import_time = time.perf_counter() - start_time
+start_time = time.perf_counter()
+for name in {names}:
+    getattr(CLAPForge, name)
+first_use_time = time.perf_counter() - start_time
+heavy_modules = ("librosa", "scipy.signal", "numba", "python_stretch", "torch", "pyroomacoustics")
+print(import_time, first_use_time, *[m for m in heavy_modules if m in sys.modules])
+"""
+
+
+def measure_import(names=()):
+    output = subprocess.run(
+        [sys.executable, "-c", MEASURE_IMPORT.format(names=tuple(names))],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout.split()
+    return float(output[0]), float(output[1]), output[2:]
+
+
+import_time, _, loaded_heavy_modules = measure_import()
+print("import CLAPForge: {:.1f} ms".format(import_time * 1000))
+assert loaded_heavy_modules == [], loaded_heavy_modules
+
+# Only the dependencies of the transforms that are used get imported
+_, first_use_time, loaded_heavy_modules = measure_import(["GainAugment"])
+print("import CLAPForge + GainAugment: {:.1f} ms".format(first_use_time * 1000))
+assert "torch" not in loaded_heavy_modules and "librosa" not in loaded_heavy_modules
+
+import CLAPForge
+
+_, first_use_time, _ = measure_import(CLAPForge.__all__)
+print("import CLAPForge + all transforms: {:.1f} ms".format(first_use_time * 1000))
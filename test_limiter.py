@@ -0,0 +1,71 @@
+import numpy as np
+from cylimiter import Limiter as CyLimiter
+from CLAPForge.augmentations.limiter import LimiterAugment
+
+sample_rate = 16000
+
+# The bundled limiter kernel must match cylimiter, which serves as the reference
+for shape in [(sample_rate,), (2, sample_rate), (4, 2, sample_rate), (2, 5)]:
+    samples = (
+        np.random.normal(size=shape) * np.linspace(0.01, 1.0, shape[-1])
+    ).astype(np.float32)
+    augment = LimiterAugment(p=1.0, threshold_mode="absolute", max_threshold_db=-6.0)
+    augment.randomize_parameters(samples, sample_rate)
+    augment.freeze_parameters()
+    limited_samples = augment(samples, sample_rate)
+
+    delay = augment.parameters["delay"]
+    reference = np.zeros(shape[:-1] + (shape[-1] + delay,), dtype=np.float32)
+    reference[..., : shape[-1]] = samples
+    for row in reference.reshape((-1, reference.shape[-1])):
+        limiter = CyLimiter(
+            attack=augment.parameters["attack"],
+            release=augment.parameters["release"],
+            delay=delay,
+            threshold=augment.parameters["threshold"],
+        )
+        limiter.limit_inplace(row)
+    reference = reference[..., delay - 1 : -1]
+    assert limited_samples.shape == samples.shape
+    assert np.allclose(limited_samples, reference, atol=1e-5)
+    print(shape, "max difference:", np.abs(limited_samples - reference).max())
+
+    if samples.ndim <= 2:
+        # Streaming in chunks gives the same result
+        state = augment.init_stream_state(sample_rate)
+        processed_chunks = [
+            augment.process_chunk(chunk, state)
+            for chunk in np.array_split(samples, 7, axis=-1)
+        ]
+        processed_chunks.append(augment.finish_stream(state))
+        assert np.allclose(np.concatenate(processed_chunks, axis=-1), limited_samples)
+
+# Interleaved streams keep their own parameters
+augment = LimiterAugment(p=1.0, threshold_mode="absolute")
+signals = [
+    np.random.normal(size=sample_rate).astype(np.float32) for _ in range(2)
+]
+states = [augment.init_stream_state(sample_rate) for _ in signals]
+streamed = [[], []]
+for chunks in zip(*(np.array_split(signal, 5) for signal in signals)):
+    for i, chunk in enumerate(chunks):
+        streamed[i].append(augment.process_chunk(chunk, states[i]))
+for i, signal in enumerate(signals):
+    streamed[i].append(augment.finish_stream(states[i]))
+    augment.parameters = dict(states[i]["parameters"])
+    augment.freeze_parameters()
+    assert np.allclose(np.concatenate(streamed[i]), augment(signal, sample_rate))
+    augment.unfreeze_parameters()
+print("interleaved streams ok")
+
+# A non-contiguous out array (here the input itself, a view with swapped batch and
+# channel axes, which can't be reshaped to rows without a copy) gets the result
+augment = LimiterAugment(p=1.0, threshold_mode="absolute", max_threshold_db=-6.0)
+buffer = np.random.normal(size=(2, 3, sample_rate)).astype(np.float32)
+strided_samples = buffer.transpose((1, 0, 2))
+expected = augment(np.ascontiguousarray(strided_samples), sample_rate)
+augment.freeze_parameters()
+result = augment(strided_samples, sample_rate, inplace=True)
+assert result is strided_samples
+assert np.array_equal(strided_samples, expected)
+print("non-contiguous out ok")
@@ -0,0 +1,31 @@
+import numpy as np
+import pyloudnorm
+from CLAPForge.augmentations.loudness_normalization import LoudnessNormAugment
+from CLAPForge.core.loudness import calculate_integrated_loudness
+
+# The built-in BS.1770 meter must agree with pyloudnorm, which serves as the reference
+for sample_rate in (16000, 22050, 44100, 48000):
+    for shape in [(3 * sample_rate + 123,), (2, int(1.55 * sample_rate)), (5, sample_rate)]:
+        # Noise with a rising level, so that the gates come into play
+        samples = (
+            np.random.normal(size=shape) * np.linspace(0.001, 0.3, shape[-1])
+        ).astype(np.float32)
+        loudness = calculate_integrated_loudness(samples, sample_rate)
+        reference_loudness = pyloudnorm.Meter(sample_rate).integrated_loudness(samples.T)
+        assert abs(loudness - reference_loudness) < 1e-4, (loudness, reference_loudness)
+        print(sample_rate, shape, "{:.4f} LUFS".format(loudness))
+
+# A batch of clips is measured in one call
+batch = np.random.normal(scale=0.1, size=(8, 2, 48000)).astype(np.float32)
+batch_loudness = calculate_integrated_loudness(batch, 48000)
+for clip, loudness in zip(batch, batch_loudness):
+    assert abs(loudness - pyloudnorm.Meter(48000).integrated_loudness(clip.T)) < 1e-4
+print("Batch loudness:", batch_loudness)
+
+# Digital silence
+assert calculate_integrated_loudness(np.zeros((2, 16000), dtype=np.float32), 16000) == -np.inf
+
+augment = LoudnessNormAugment(min_lufs=-20.0, max_lufs=-20.0, p=1.0)
+normalized = augment(batch[0], 48000)
+assert abs(calculate_integrated_loudness(normalized, 48000) + 20.0) < 1e-3
+print("LoudnessNormAugment output: -20 LUFS")
@@ -0,0 +1,33 @@
+import shutil
+import sys
+
+import numpy as np
+from scipy.signal import correlate
+
+from CLAPForge.augmentations.mp3_compression import (
+    MP3CompressionAugment,
+    measure_ffmpeg_mp3_delay,
+)
+
+ffmpeg_path = shutil.which("ffmpeg")
+if ffmpeg_path is None:
+    print("Skipping the MP3 delay test, as ffmpeg is not installed")
+    sys.exit(0)
+
+for sample_rate in [16000, 44100]:
+    delay = measure_ffmpeg_mp3_delay(ffmpeg_path, sample_rate, 128)
+    print(sample_rate, "Hz: measured MP3 delay of", delay, "samples")
+    assert 0 < delay < sample_rate // 4
+
+    # The degraded audio must be aligned with the input after trimming the delay
+    samples = np.random.RandomState(0).uniform(-0.5, 0.5, sample_rate).astype(np.float32)
+    augment = MP3CompressionAugment(
+        min_bitrate=128, max_bitrate=128, backend="pydub", p=1.0
+    )
+    degraded_samples = augment(samples, sample_rate)
+    assert degraded_samples.shape == samples.shape
+    max_lag = 100
+    correlation = correlate(degraded_samples, samples, mode="full", method="fft")
+    lags = np.arange(-samples.shape[0] + 1, samples.shape[0])
+    is_candidate = np.abs(lags) <= max_lag
+    assert lags[is_candidate][np.argmax(correlation[is_candidate])] == 0
@@ -0,0 +1,69 @@
+import numpy as np
+from CLAPForge.augmentations.aliasing import AliasingAugment
+from CLAPForge.augmentations.band_pass_filter import BandPassFilterAugment
+from CLAPForge.augmentations.high_pass_filter import HighPassFilterAugment
+from CLAPForge.augmentations.high_shelf_filter import HighShelfFilterAugment
+from CLAPForge.augmentations.limiter import LimiterAugment
+from CLAPForge.augmentations.low_shelf_filter import LowShelfFilterAugment
+from CLAPForge.augmentations.peaking_filter import PeakingFilterAugment
+from CLAPForge.augmentations.seven_band_parametric_eq import SevenBandEQAugment
+from CLAPForge.core.utils import interpolate_along_last_axis
+
+# Transforms that process all channels, and all items of a (batch, channels, samples)
+# array, in one call. The output must be bit-for-bit equal to processing the channels
+# one by one with the same parameters.
+sample_rate = 16000
+transforms = [
+    PeakingFilterAugment(p=1.0),
+    LowShelfFilterAugment(p=1.0),
+    HighShelfFilterAugment(p=1.0),
+    SevenBandEQAugment(p=1.0),
+    HighPassFilterAugment(p=1.0),
+    HighPassFilterAugment(zero_phase=True, p=1.0),
+    BandPassFilterAugment(p=1.0),
+    LimiterAugment(p=1.0),
+    AliasingAugment(p=1.0),
+]
+
+batch = np.random.uniform(-0.5, 0.5, size=(4, 2, sample_rate)).astype(np.float32)
+for transform in transforms:
+    processed_batch = transform(batch, sample_rate)
+    transform.freeze_parameters()
+    for batch_idx in range(batch.shape[0]):
+        processed_channels = transform(batch[batch_idx], sample_rate)
+        for chn_idx in range(batch.shape[1]):
+            processed_channel = transform(batch[batch_idx, chn_idx], sample_rate)
+            assert np.array_equal(processed_batch[batch_idx, chn_idx], processed_channel)
+            assert np.array_equal(processed_channels[chn_idx], processed_channel)
+    transform.unfreeze_parameters()
+    print(transform.__class__.__name__, "matches the per-channel loop")
+
+# AliasingAugment must also match the np.interp loop it replaced
+aliasing = AliasingAugment(p=1.0)
+processed_batch = aliasing(batch, sample_rate)
+n = batch.shape[-1]
+x = np.linspace(0, n, num=n)
+dwn_x = np.linspace(
+    0, n, num=round(n * float(aliasing.parameters["new_sample_rate"]) / sample_rate)
+)
+for batch_idx in range(batch.shape[0]):
+    for chn_idx in range(batch.shape[1]):
+        expected = np.interp(x, dwn_x, np.interp(dwn_x, x, batch[batch_idx, chn_idx]))
+        assert np.array_equal(processed_batch[batch_idx, chn_idx], expected.astype(np.float32))
+print("AliasingAugment matches np.interp")
+
+# Inputs so short that they are downsampled to a single sample
+short_batch = np.random.uniform(-1, 1, size=(2, 2)).astype(np.float32)
+aliasing = AliasingAugment(min_sample_rate=8000, max_sample_rate=8000, p=1.0)
+processed_batch = aliasing(short_batch, 16000)
+for chn_idx in range(short_batch.shape[0]):
+    x = np.linspace(0, 2, num=2)
+    dwn_x = np.linspace(0, 2, num=1)
+    expected = np.interp(x, dwn_x, np.interp(dwn_x, x, short_batch[chn_idx]))
+    assert np.array_equal(processed_batch[chn_idx], expected.astype(np.float32))
+x = np.linspace(0, 1, num=5)
+assert np.array_equal(
+    interpolate_along_last_axis(x, np.zeros(1), short_batch[:, :1]),
+    np.array([np.interp(x, np.zeros(1), row[:1]) for row in short_batch]),
+)
+print("AliasingAugment handles single-sample downsampling")
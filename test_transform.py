@@ -30,6 +30,7 @@ AUG_MAPPING = {
     "low_pass_filter": ("LowPassFilterAugment", "low_pass_filter"),
     "low_shelf_filter": ("LowShelfFilterAugment", "low_shelf_filter"),
     "mp3_compression": ("MP3CompressionAugment", "mp3_compression"),
+    "codec": ("CodecAugment", "codec_augment"),
     "normalize": ("NormalizeAugment", "normalize"),
     "padding": ("PaddingAugment", "padding"),
     "peaking_filter": ("PeakingFilterAugment", "peaking_filter"),
@@ -1,5 +1,5 @@
 import numpy as np
-from CLAPForge.augmentations.vtlp_augment import VTLPAugment
+from CLAPForge.augmentations.VLTPAugment import VTLPAugment, get_vtlp_warp_matrix
 
 # Assume we have a mel-spectrogram of shape (time, num_mel)
 # For example, create a dummy mel-spectrogram:
@@ -15,3 +15,52 @@ warped_melspec = vtlp_transform(mel_spectrogram, sample_rate=16000)
 
 print("Original mel-spectrogram shape:", mel_spectrogram.shape)
 print("Warped mel-spectrogram shape:", warped_melspec.shape)
+
+
+def warp_with_np_interp(melspec, alpha):
+    f_max = melspec.shape[-1] - 1
+    freq_bins = np.arange(melspec.shape[-1])
+    warped_freq = f_max * (freq_bins / f_max) ** alpha
+    rows = melspec.reshape((-1, melspec.shape[-1]))
+    return np.array(
+        [np.interp(freq_bins, warped_freq, row) for row in rows], dtype=np.float32
+    ).reshape(melspec.shape)
+
+
+assert warped_melspec.shape == mel_spectrogram.shape
+assert np.allclose(
+    warped_melspec,
+    warp_with_np_interp(mel_spectrogram, vtlp_transform.parameters["alpha"]),
+    atol=1e-6,
+)
+
+# A batch of mel-spectrograms of shape (batch, time, num_mel) is warped in one go
+mel_batch = np.random.rand(8, time_steps, num_mel).astype(np.float32)
+warped_batch = vtlp_transform(mel_batch, sample_rate=16000)
+assert warped_batch.shape == mel_batch.shape
+assert np.allclose(
+    warped_batch,
+    warp_with_np_interp(mel_batch, vtlp_transform.parameters["alpha"]),
+    atol=1e-6,
+)
+print("Warped batch shape:", warped_batch.shape, "alpha:", vtlp_transform.parameters["alpha"])
+
+# With alpha buckets, the warp matrices are cached
+bucketed_transform = VTLPAugment(alpha_min=0.9, alpha_max=1.1, alpha_step=0.01, p=1.0)
+for _ in range(50):
+    warped_melspec = bucketed_transform(mel_spectrogram, sample_rate=16000)
+    assert np.allclose(
+        warped_melspec,
+        warp_with_np_interp(mel_spectrogram, bucketed_transform.parameters["alpha"]),
+        atol=1e-6,
+    )
+assert get_vtlp_warp_matrix.cache_info().currsize <= 21
+
+# Long spectrograms have many more time frames than mel bins
+long_mel_batch = np.random.rand(8, 1000, num_mel).astype(np.float32)
+warped_long_batch = vtlp_transform(long_mel_batch, sample_rate=16000)
+assert np.allclose(
+    warped_long_batch,
+    warp_with_np_interp(long_mel_batch, vtlp_transform.parameters["alpha"]),
+    atol=1e-6,
+)